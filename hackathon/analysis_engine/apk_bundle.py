@@ -0,0 +1,173 @@
+# analysis_engine/apk_bundle.py
+
+"""
+Split APK bundles: XAPK (APKPure & co: manifest.json + base.apk +
+config.*.apk), APKS (bundletool: toc.pb + splits/*.apk) and plain zips
+of split APKs.
+
+bundle_index() recognises a bundle from its zip directory alone (no
+AndroidManifest.xml at the root, .apk members inside) and lists the
+splits largest first, so a caller fanning them out to a pool starts the
+longest job first and the whole bundle takes about as long as its
+biggest split. merge_split_reports() folds the per-split deep reports
+into one report of the same shape as a single APK's, plus a "bundle"
+section describing the splits.
+"""
+
+import io
+import os
+import zipfile
+from typing import Optional, Dict, Any, List, Tuple
+
+from .ioc_extractor import IocExtractor
+from .dex_stats import merge_dex_stats
+
+
+BUNDLE_SUFFIXES = (".xapk", ".apks", ".apkm")
+# bundles with more splits than this are rejected rather than analysed
+MAX_SPLITS = int(os.getenv("APK_BUNDLE_MAX_SPLITS", "64"))
+
+COMPONENT_KEYS = ("activities", "services", "receivers", "providers")
+
+
+def bundle_index(apk_bytes: Optional[bytes] = None,
+                 apk_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    {"format": "xapk" | "apks" | "zip", "splits": [{"name", "size"}, ...]}
+    with splits largest first, or None when the input is a plain APK
+    (or not a zip at all).
+    """
+    try:
+        zf = zipfile.ZipFile(io.BytesIO(apk_bytes) if apk_bytes is not None else apk_path)
+    except (zipfile.BadZipFile, OSError):
+        return None
+    with zf:
+        names = set(zf.namelist())
+        if "AndroidManifest.xml" in names:
+            return None
+        splits = [i for i in zf.infolist()
+                  if not i.is_dir() and i.filename.lower().endswith(".apk")]
+        # bundletool: splits/ holds the split set; standalones/ and
+        # universal.apk are alternative full builds of the same app
+        if any(i.filename.startswith("splits/") for i in splits):
+            splits = [i for i in splits if i.filename.startswith("splits/")]
+        if not splits:
+            return None
+        if "manifest.json" in names:
+            fmt = "xapk"
+        elif "toc.pb" in names:
+            fmt = "apks"
+        else:
+            fmt = "zip"
+    splits.sort(key=lambda i: i.file_size, reverse=True)
+    return {"format": fmt, "splits": [{"name": i.filename, "size": i.file_size} for i in splits]}
+
+
+def is_bundle(apk_path: str) -> bool:
+    return bundle_index(apk_path=apk_path) is not None
+
+
+def _pick_base(parts: List[Tuple[str, Dict[str, Any]]]) -> int:
+    """Index of the base split: no split attribute, preferring a base*.apk name."""
+    candidates = [i for i, (_, apk) in enumerate(parts)
+                  if (apk.get("identity") or {}).get("split") is None]
+    for i in candidates:
+        if os.path.basename(parts[i][0]).lower().startswith("base"):
+            return i
+    return candidates[0] if candidates else 0
+
+
+def _union(lists) -> List[Any]:
+    seen: Dict[Any, None] = {}
+    for values in lists:
+        for v in values or ():
+            seen.setdefault(v, None)
+    return list(seen)
+
+
+def merge_split_reports(parts: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    One deep report from the per-split "apk" reports [(member name, apk)].
+    Identity and level come from the base split, the icon from the first
+    split holding one (base first); permissions,
+    components, files, certificates and IOCs are unioned (base first),
+    dex statistics summed and fingerprints combined. "bundle" names the
+    base and flags splits signed by different keys or declaring another
+    package. Heuristics are left to the caller.
+    """
+    base = _pick_base(parts)
+    ordered = [parts[base]] + parts[:base] + parts[base + 1:]
+    apks = [apk for _, apk in ordered]
+    base_apk = apks[0]
+
+    certificates: Dict[str, Dict[str, str]] = {}
+    for apk in apks:
+        for cert in apk.get("certificates") or ():
+            certificates.setdefault(cert.get("sha256"), cert)
+
+    manifest: Dict[str, Any] = {
+        "permissions": _union((apk.get("manifest") or {}).get("permissions") for apk in apks),
+    }
+    for key in COMPONENT_KEYS:
+        manifest[key] = _union((apk.get("manifest") or {}).get(key) for apk in apks)
+    manifest["intent_filters"] = {}
+    for apk in apks:
+        for name, filters in ((apk.get("manifest") or {}).get("intent_filters") or {}).items():
+            manifest["intent_filters"].setdefault(name, filters)
+
+    files = {key: _union((apk.get("files") or {}).get(key) for apk in apks)
+             for key in ("all", "native_libs", "assets")}
+
+    iocs = None
+    if any(apk.get("iocs") for apk in apks):
+        extractor = IocExtractor()
+        for apk in apks:
+            if apk.get("iocs"):
+                extractor.merge(apk["iocs"])
+        iocs = extractor.result()
+
+    dex = [apk["dex"] for apk in apks if apk.get("dex")]
+
+    # icon from the first split that has one (densities live in config splits)
+    icon_apk = next((apk for apk in apks if apk.get("icon_hash")), base_apk)
+
+    report = dict(base_apk)
+    report.update({
+        "certificates": list(certificates.values()),
+        "manifest": manifest,
+        "icon_hash": icon_apk.get("icon_hash"),
+        "icon": icon_apk.get("icon"),
+        "urls_found": iocs["urls"] if iocs else [],
+        "iocs": iocs,
+        "files": files,
+        "dex": merge_dex_stats(dex) if dex else base_apk.get("dex"),
+    })
+
+    xrefs = [apk["xref"] for apk in apks if isinstance(apk.get("xref"), dict)
+             and "error" not in apk["xref"]]
+    if "xref" in base_apk and xrefs:
+        calls: Dict[str, List[str]] = {}
+        for x in xrefs:
+            for api, callers in (x.get("sensitive_api_calls") or {}).items():
+                calls[api] = sorted(set(calls.get(api, [])) | set(callers))[:20]
+        report["xref"] = {
+            "num_internal_classes": sum(x.get("num_internal_classes", 0) for x in xrefs),
+            "num_external_classes": sum(x.get("num_external_classes", 0) for x in xrefs),
+            "sensitive_api_calls": calls,
+        }
+
+    fingerprints = [apk["fingerprint"] for apk in apks if apk.get("fingerprint")]
+    if fingerprints:
+        from .apk_similarity import merge_fingerprints  # NumPy
+        report["fingerprint"] = merge_fingerprints(fingerprints)
+
+    # signer sets per split: an installable bundle is signed by one key
+    signers = {tuple(sorted(c.get("sha256") for c in apk.get("certificates") or ()))
+               for apk in apks}
+    packages = {(apk.get("identity") or {}).get("package") for apk in apks}
+    report["bundle"] = {
+        "base": ordered[0][0],
+        "signers_differ": len(signers) > 1,
+        "packages_differ": len(packages) > 1,
+    }
+    return report
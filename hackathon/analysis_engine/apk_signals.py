@@ -0,0 +1,172 @@
+# analysis_engine/apk_signals.py
+"""
+Deep-scan signals: scored from the APK's raw features (identity, signing
+certificates, manifest, icon hash, URLs; see reports.rescore.APK_FIELDS)
+plus the known-good stores they are checked against. Same result shape
+as the store-only checks in name_similarity: {"available", "score",
+"details"}, with score 1.0 for the strongest sign of impersonation.
+"""
+
+import re
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+from .icon_index import get_default_icon_index, HASH_BITS, DEFAULT_MATCH_RADIUS
+from .certificate_check import CertReputation
+from .name_similarity import get_brand_index
+from .manifest_parser import get_permissions_score
+
+# known icons looked at per APK (closest first)
+ICON_SIGNAL_K = 5
+
+# link shorteners hide where a URL really goes
+URL_SHORTENERS = frozenset(("bit.ly", "tinyurl.com", "t.co", "goo.gl", "is.gd", "cutt.ly",
+                            "rb.gy", "ow.ly", "shorturl.at", "tiny.cc"))
+_IP_HOST = re.compile(r"^\d{1,3}(\.\d{1,3}){3}$")
+
+# package tokens must be this close to a brand name to count as a claim
+BRAND_CLAIM_THRESHOLD = 0.8
+
+# Loaded from the fingerprint store by the backend (set_cert_reputation)
+_cert_reputation = CertReputation()
+
+
+def set_cert_reputation(reputation: CertReputation) -> None:
+    global _cert_reputation
+    _cert_reputation = reputation
+
+
+def get_cert_reputation() -> CertReputation:
+    return _cert_reputation
+
+
+def _package(apk: Dict[str, Any]) -> str:
+    return (apk.get("identity") or {}).get("package") or ""
+
+
+def known_icon_lookalikes(apk: Dict[str, Any], k: int = ICON_SIGNAL_K,
+                          radius: int = DEFAULT_MATCH_RADIUS):
+    """Known icons within `radius` bits of the APK's icon, registered under another package."""
+    if not apk.get("icon_hash"):
+        return []
+    pkg = _package(apk)
+    matches = get_default_icon_index().nearest(apk["icon_hash"], k=k, max_distance=radius)
+    return [m for m in matches if m["label"] != pkg]
+
+
+def icon_index_fingerprint() -> str:
+    return get_default_icon_index().fingerprint()
+
+
+def check_icon_similarity(apk: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    1 - (Hamming distance / 64) to the closest known icon of a different
+    package, within the match radius; 0 when no known icon is that close
+    (pHashes further apart are unrelated images, not weak look-alikes).
+    Unavailable without an icon hash or an empty icon index.
+    """
+    if not apk.get("icon_hash") or not len(get_default_icon_index()):
+        return {"available": False}
+    lookalikes = known_icon_lookalikes(apk)
+    if not lookalikes:
+        return {"available": True, "score": 0.0, "details": {"closest": None}}
+    best = min(lookalikes, key=lambda m: m["distance"])
+    return {"available": True, "score": 1.0 - best["distance"] / HASH_BITS,
+            "details": {"closest": best["label"], "distance": best["distance"],
+                        "matches": [m["label"] for m in lookalikes]}}
+
+
+def claimed_brands(apk: Dict[str, Any], icon_matches: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+    """
+    Brands an APK appears to present itself as: package-name tokens close
+    to a known brand, plus packages of known icons it closely resembles
+    (icon_matches, or looked up from the APK's icon hash when not given).
+    """
+    claimed = []
+    index = get_brand_index()
+    pkg = _package(apk)
+    for token in pkg.split("."):
+        if len(token) < 3 or token in ("com", "org", "net", "app", "android"):
+            continue
+        for m in index.query(token, k=1, min_score=BRAND_CLAIM_THRESHOLD):
+            claimed.append(m["name"])
+
+    if icon_matches is None:
+        icon_matches = known_icon_lookalikes(apk)
+    for m in icon_matches:
+        if isinstance(m, dict) and m.get("label") and m["label"] != pkg:
+            claimed.append(m["label"])
+    return list(dict.fromkeys(claimed))
+
+
+def cert_context_fingerprint() -> str:
+    """The stores check_cert_key_mismatch reads: certs, brands and known icons."""
+    return ":".join((_cert_reputation.fingerprint(), get_brand_index().fingerprint(),
+                     icon_index_fingerprint()))
+
+
+def check_cert_key_mismatch(apk: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    1.0 when a signing cert has a malicious verdict, or when the APK claims
+    a brand (see claimed_brands) whose known certs did not sign it; 0
+    otherwise. Unavailable without signing certificates.
+    """
+    shas = [c.get("sha256") for c in apk.get("certificates") or [] if isinstance(c, dict)]
+    if not any(shas):
+        return {"available": False}
+    claimed = claimed_brands(apk)
+    verdict = _cert_reputation.assess(shas, claimed)
+    flagged = verdict["malicious"] or verdict["mismatch"]
+    return {"available": True, "score": 1.0 if flagged else 0.0,
+            "details": {"claimed_brands": claimed,
+                        "mismatched": sorted(b for b, m in verdict["cert_key_mismatch"].items() if m),
+                        "malicious": verdict["malicious"],
+                        "signed_by_brands": verdict["signed_by_brands"]}}
+
+
+def check_manifest_permissions(apk: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Suspicious permissions requested (manifest_parser.SUSPICIOUS_PERMISSIONS),
+    0.1 per permission. Unavailable without a parsed manifest.
+    """
+    manifest = apk.get("manifest")
+    if not isinstance(manifest, dict) or manifest.get("permissions") is None:
+        return {"available": False}
+    perms = manifest["permissions"]
+    score = round(1.0 - get_permissions_score(perms), 2)
+    return {"available": True, "score": score,
+            "details": {"permissions": len(perms),
+                        "flagged": [p for p in perms if get_permissions_score([p]) < 1]}}
+
+
+def _suspicious_url(url: str) -> Optional[str]:
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        return "malformed"
+    if _IP_HOST.match(host):
+        return "ip_host"
+    if host in URL_SHORTENERS:
+        return "shortener"
+    if parts.scheme.lower() == "http":
+        return "cleartext"
+    return None
+
+
+def check_urls(apk: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Share of the URLs found in the APK that point at a bare IP, a link
+    shortener or a cleartext http:// endpoint. Unavailable when no URLs
+    were extracted (manifest-level scans do not look for them).
+    """
+    urls = apk.get("urls_found") or []
+    if not urls:
+        return {"available": False}
+    flagged = {}
+    for url in urls:
+        reason = _suspicious_url(url)
+        if reason:
+            flagged[url] = reason
+    return {"available": True, "score": len(flagged) / len(urls),
+            "details": {"urls": len(urls), "flagged": flagged}}
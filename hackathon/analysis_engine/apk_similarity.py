@@ -0,0 +1,373 @@
+# analysis_engine/apk_similarity.py
+
+"""
+APK family detection: MinHash fingerprints + an LSH index of past scans.
+
+Fingerprint (built in the analysis worker)
+  Each APK is reduced to a set of tokens: permissions, component names,
+  app class names, native library names and extracted URL hosts/paths.
+  Names under the app's own package are rewritten relative to it, so a
+  repackaging under a new package name keeps its tokens; framework and
+  common library classes are skipped. MinHasher folds the tokens into
+  NUM_PERM 32-bit minima in NumPy batches, so memory stays flat however
+  many classes the dex files hold.
+
+Index (in the caller's process, SQLite)
+  Signatures are cut into BANDS bands of ROWS rows; each band hashes to
+  a bucket row. A query reads the buckets it falls into, ranks the
+  colliding APKs by estimated Jaccard similarity and returns the
+  nearest. Cost depends on bucket sizes, not on the number of stored
+  scans. Each new APK joins the family (cluster) of its neighbours at or
+  above CLUSTER_THRESHOLD; families it bridges are merged.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from collections import Counter
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+import numpy as np
+
+
+DEFAULT_INDEX_PATH = os.getenv("APK_SIMILARITY_PATH", "storage/apk_similarity.sqlite3")
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# neighbours at least this similar are the same family
+CLUSTER_THRESHOLD = float(os.getenv("APK_CLUSTER_THRESHOLD", "0.6"))
+# only report neighbours at least this similar
+MIN_SIMILARITY = float(os.getenv("APK_SIMILARITY_MIN", "0.3"))
+# candidates ranked per query (those sharing the most bands first)
+MAX_CANDIDATES = 2000
+
+# classes every app ships; they say nothing about the family
+LIBRARY_PREFIXES = (
+    "Landroid/", "Landroidx/", "Ljava/", "Ljavax/", "Lkotlin/", "Lkotlinx/", "Ldalvik/",
+    "Lcom/google/", "Lokhttp3/", "Lokio/", "Lretrofit2/", "Lorg/jetbrains/", "Lorg/intellij/",
+    "Lcom/squareup/", "Lcom/facebook/", "Lio/reactivex/", "Lorg/json/",
+)
+_BATCH = 4096
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class MinHasher:
+    """
+    Streaming MinHash. Permutation i is h -> (a_i * h + b_i) mod 2**64,
+    keeping the high 32 bits; the same seed gives the same permutations
+    in every process.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rnd = np.random.RandomState(seed)
+        self._a = (rnd.randint(0, 2 ** 32, num_perm, dtype=np.uint64) << np.uint64(32)) \
+            | rnd.randint(0, 2 ** 32, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = (rnd.randint(0, 2 ** 32, num_perm, dtype=np.uint64) << np.uint64(32)) \
+            | rnd.randint(0, 2 ** 32, num_perm, dtype=np.uint64)
+        self.mins = np.full(num_perm, _MAX_HASH, dtype=np.uint32)
+        self.counts: Counter = Counter()
+        self._buf: List[int] = []
+
+    def update(self, kind: str, tokens: Iterable[Optional[str]]) -> None:
+        for t in tokens:
+            if t:
+                self._buf.append(_token_hash(f"{kind}:{t}"))
+                self.counts[kind] += 1
+                if len(self._buf) >= _BATCH:
+                    self._flush()
+
+    def _flush(self) -> None:
+        if not self._buf:
+            return
+        h = np.array(self._buf, dtype=np.uint64)
+        self._buf = []
+        with np.errstate(over="ignore"):
+            perm = (self._a[:, None] * h[None, :] + self._b[:, None]) >> np.uint64(32)
+        np.minimum(self.mins, perm.min(axis=1).astype(np.uint32), out=self.mins)
+
+    def digest(self) -> np.ndarray:
+        self._flush()
+        return self.mins.copy()
+
+    def result(self) -> Dict[str, Any]:
+        return {"minhash": self.digest().tobytes().hex(), "num_perm": len(self.mins),
+                "features": dict(self.counts)}
+
+
+def signature_from_hex(value: str) -> np.ndarray:
+    return np.frombuffer(bytes.fromhex(value), dtype=np.uint32)
+
+
+def merge_fingerprints(fingerprints: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Fingerprint of the union of several token sets (the splits of a
+    bundle): the element-wise minimum of their signatures.
+    """
+    sig = np.minimum.reduce([signature_from_hex(fp["minhash"]) for fp in fingerprints])
+    features: Counter = Counter()
+    for fp in fingerprints:
+        features.update(fp.get("features") or {})
+    return {"minhash": sig.tobytes().hex(), "num_perm": len(sig), "features": dict(features)}
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two token sets."""
+    return float(np.mean(a == b))
+
+
+# ---------------------------
+# Token extraction
+# ---------------------------
+
+def _relative(name: str, package: str) -> str:
+    if package and (name == package or name.startswith(package + ".")):
+        return "~" + name[len(package):]
+    if name.startswith("."):
+        return "~" + name
+    return name
+
+
+def package_path(package: str) -> str:
+    """"com.example.app" -> "Lcom/example/app/" (descriptor prefix)."""
+    return "L" + package.replace(".", "/") + "/" if package else ""
+
+
+def class_token(descriptor: str, package_path: str) -> Optional[str]:
+    """Class descriptor -> token, or None for framework / library classes."""
+    if descriptor.startswith(LIBRARY_PREFIXES):
+        return None
+    if package_path and descriptor.startswith(package_path):
+        return "~" + descriptor[len(package_path):]
+    return descriptor
+
+
+def report_tokens(report: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Tokens of everything but the classes, from a deep-scan report."""
+    package = (report.get("identity") or {}).get("package") or ""
+    manifest = report.get("manifest") or {}
+    components = []
+    for key in ("activities", "services", "receivers", "providers"):
+        components += [f"{key}:{_relative(c, package)}" for c in manifest.get(key) or []]
+    libs = [os.path.basename(f) for f in (report.get("files") or {}).get("native_libs") or []]
+
+    urls = []
+    for url in (report.get("iocs") or {}).get("urls") or []:
+        # host and path, without the query string
+        urls.append(url.split("?", 1)[0].split("#", 1)[0])
+    urls += (report.get("iocs") or {}).get("domains") or []
+
+    return {
+        "perm": list(manifest.get("permissions") or []),
+        "comp": components,
+        "lib": libs,
+        "url": urls,
+    }
+
+
+# ---------------------------
+# LSH index
+# ---------------------------
+
+def _band_buckets(sig: np.ndarray) -> List[Tuple[int, int]]:
+    out = []
+    for band in range(BANDS):
+        chunk = sig[band * ROWS:(band + 1) * ROWS].tobytes()
+        bucket = int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True)
+        out.append((band, bucket))
+    return out
+
+
+class SimilarityIndex:
+    """
+    Persistent LSH index of APK fingerprints and their families.
+    Safe to share between threads; each process opens its own connection.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH,
+                 cluster_threshold: float = CLUSTER_THRESHOLD):
+        self.path = path
+        self.cluster_threshold = cluster_threshold
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS apks ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " sha256 TEXT NOT NULL UNIQUE,"
+            " package TEXT,"
+            " signature BLOB NOT NULL,"
+            " cluster_id INTEGER NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_apks_cluster ON apks(cluster_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lsh ("
+            " band INTEGER NOT NULL, bucket INTEGER NOT NULL, apk_id INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON lsh(band, bucket)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS clusters ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " size INTEGER NOT NULL,"
+            " label TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM apks").fetchone()[0]
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def _candidates_locked(self, buckets: List[Tuple[int, int]]) -> List[int]:
+        # one indexed lookup per band (a row-value IN list would scan the table)
+        sql = " UNION ALL ".join(["SELECT apk_id FROM lsh WHERE band=? AND bucket=?"] * len(buckets))
+        params = [v for pair in buckets for v in pair]
+        hits = Counter(row[0] for row in self._conn.execute(sql, params))
+        return [apk_id for apk_id, _ in hits.most_common(MAX_CANDIDATES)]
+
+    def _nearest_locked(self, sig: np.ndarray, k: int, min_similarity: float,
+                        exclude_sha: Optional[str] = None) -> List[Dict[str, Any]]:
+        ids = self._candidates_locked(_band_buckets(sig))
+        if not ids:
+            return []
+        rows = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows += self._conn.execute(
+                "SELECT id, sha256, package, cluster_id, signature FROM apks"
+                f" WHERE id IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+
+        sigs = np.frombuffer(b"".join(r[4] for r in rows), dtype=np.uint32).reshape(len(rows), -1)
+        scores = (sigs == sig[None, :]).mean(axis=1)
+        out = []
+        for i in np.argsort(-scores, kind="stable"):
+            score = float(scores[i])
+            if score < min_similarity:
+                break
+            apk_id, sha, package, cluster_id, _ = rows[i]
+            if sha == exclude_sha:
+                continue
+            out.append({"sha256": sha, "package": package, "cluster_id": cluster_id,
+                        "similarity": round(score, 3)})
+            if len(out) >= k:
+                break
+        return out
+
+    def nearest(self, signature, k: int = 10,
+                min_similarity: float = MIN_SIMILARITY) -> List[Dict[str, Any]]:
+        sig = signature_from_hex(signature) if isinstance(signature, str) else signature
+        with self._lock:
+            return self._nearest_locked(sig, k, min_similarity)
+
+    def cluster(self, cluster_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._cluster_locked(cluster_id)
+
+    def _cluster_locked(self, cluster_id: int) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT id, size, label, created_at, updated_at FROM clusters WHERE id=?", (cluster_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "size": row[1], "label": row[2],
+                "first_seen": row[3], "last_seen": row[4]}
+
+    def cluster_members(self, cluster_id: int, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sha256, package, created_at FROM apks WHERE cluster_id=?"
+                " ORDER BY created_at DESC LIMIT ?", (cluster_id, limit)).fetchall()
+        return [{"sha256": s, "package": p, "created_at": c} for s, p, c in rows]
+
+    def top_clusters(self, limit: int = 20, min_size: int = 2) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM clusters WHERE size >= ? ORDER BY size DESC, updated_at DESC LIMIT ?",
+                (min_size, limit)).fetchall()
+            return [self._cluster_locked(r[0]) for r in rows]
+
+    # ---------------------------
+    # Population
+    # ---------------------------
+    def observe(self, sha256: str, package: Optional[str], signature,
+                k: int = 10, min_similarity: float = MIN_SIMILARITY) -> Dict[str, Any]:
+        """
+        Nearest previously seen APKs, then record this one and return its
+        family. Re-observing a known sha256 changes nothing.
+        """
+        sig = signature_from_hex(signature) if isinstance(signature, str) else signature
+        now = time.time()
+        with self._lock:
+            neighbors = self._nearest_locked(sig, k, min_similarity, exclude_sha=sha256)
+            row = self._conn.execute("SELECT cluster_id FROM apks WHERE sha256=?", (sha256,)).fetchone()
+            if row is not None:
+                cluster_id = row[0]
+            else:
+                cluster_id = self._assign_cluster_locked(neighbors, package, now)
+                cur = self._conn.execute(
+                    "INSERT INTO apks (sha256, package, signature, cluster_id, created_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (sha256, package, sig.astype(np.uint32).tobytes(), cluster_id, now))
+                self._conn.executemany(
+                    "INSERT INTO lsh VALUES (?, ?, ?)",
+                    [(band, bucket, cur.lastrowid) for band, bucket in _band_buckets(sig)])
+                self._conn.commit()
+            cluster = self._cluster_locked(cluster_id)
+
+        for n in neighbors:
+            n["same_family"] = n["similarity"] >= self.cluster_threshold
+        return {"neighbors": neighbors, "cluster": cluster}
+
+    def _assign_cluster_locked(self, neighbors: List[Dict[str, Any]],
+                               package: Optional[str], now: float) -> int:
+        family = {n["cluster_id"] for n in neighbors if n["similarity"] >= self.cluster_threshold}
+        if not family:
+            cur = self._conn.execute(
+                "INSERT INTO clusters (size, label, created_at, updated_at) VALUES (1, ?, ?, ?)",
+                (package, now, now))
+            return cur.lastrowid
+
+        # join the largest family; merge the others (this APK bridges them)
+        sizes = dict(self._conn.execute(
+            f"SELECT id, size FROM clusters WHERE id IN ({','.join('?' * len(family))})",
+            list(family)).fetchall())
+        target = max(sizes, key=lambda c: (sizes[c], -c))
+        others = [c for c in sizes if c != target]
+        if others:
+            marks = ",".join("?" * len(others))
+            self._conn.execute(f"UPDATE apks SET cluster_id=? WHERE cluster_id IN ({marks})",
+                               [target] + others)
+            self._conn.execute(
+                f"UPDATE clusters SET created_at=MIN(created_at,"
+                f" (SELECT MIN(created_at) FROM clusters WHERE id IN ({marks}))) WHERE id=?",
+                others + [target])
+            self._conn.execute(f"DELETE FROM clusters WHERE id IN ({marks})", others)
+        self._conn.execute("UPDATE clusters SET size=?, updated_at=? WHERE id=?",
+                           (sum(sizes.values()) + 1, now, target))
+        return target
+
+
+_default_index: Optional[SimilarityIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_default_similarity_index() -> SimilarityIndex:
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = SimilarityIndex()
+        return _default_index
@@ -0,0 +1,225 @@
+# analysis_engine/brand_index.py
+
+"""
+In-memory brand index for impersonation checks.
+
+Names are folded (Unicode NFKD, diacritics stripped, homoglyphs and
+look-alike digits mapped to ASCII letters) and split into character
+trigrams. An inverted index from trigram to brand ids narrows a query
+to the few brands sharing grams with it; only those are ranked with
+SequenceMatcher. Brands can be added and removed one by one.
+
+Recall: a brand sharing no trigram with the query can still have a
+nonzero SequenceMatcher ratio (common letters or pairs). Corpora no
+larger than the rerank shortlist are therefore always ranked in full,
+which gives the same scores as a linear scan; larger ones fall back to
+a bounded scan of the remaining brands when fewer than k share a gram,
+up to LINEAR_FALLBACK_MAX brands. Past that size, brands without a
+shared trigram are not ranked.
+"""
+
+import heapq
+import hashlib
+import threading
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+
+# Cyrillic / Greek / IPA letters that render like Latin ones, plus
+# digits commonly swapped for letters ("paypa1", "0la").
+CONFUSABLES = {
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h",
+    "о": "o", "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "ѕ": "s",
+    "і": "i", "ї": "i", "ј": "j", "ԁ": "d", "ԛ": "q", "ԝ": "w", "ӏ": "l",
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v",
+    "ο": "o", "ρ": "p", "τ": "t", "υ": "u", "χ": "x", "ω": "w",
+    "ɡ": "g", "ɑ": "a", "ı": "i", "ł": "l", "ß": "ss",
+    "0": "o", "1": "l", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b", "@": "a", "$": "s",
+}
+
+# multi-character look-alikes, applied after single characters
+CONFUSABLE_SEQUENCES = (("rn", "m"), ("vv", "w"), ("cl", "d"))
+
+NGRAM = 3
+# how many gram-overlap candidates get the (slower) SequenceMatcher rerank
+MIN_RERANK = 16
+RERANK_PER_RESULT = 4
+# largest corpus scanned in full when too few brands share a trigram with the query
+LINEAR_FALLBACK_MAX = 5000
+
+
+def fold_confusables(s: str) -> str:
+    """
+    Canonical skeleton of a name: "PаyPa1 ™" (Cyrillic а) -> "paypal".
+    """
+    s = unicodedata.normalize("NFKD", (s or "").lower())
+    out = []
+    for ch in s:
+        if unicodedata.combining(ch):
+            continue
+        ch = CONFUSABLES.get(ch, ch)
+        if ch.isascii() and ch.isalnum():
+            out.append(ch)
+    folded = "".join(out)
+    for seq, repl in CONFUSABLE_SEQUENCES:
+        folded = folded.replace(seq, repl)
+    return folded
+
+
+def ngrams(key: str, n: int = NGRAM) -> set:
+    padded = f"^{key}$"
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class BrandIndex:
+    """
+    Trigram inverted index over folded brand names.
+    Thread-safe: add/remove take a lock, queries read a consistent view.
+    """
+
+    def __init__(self, brands: Optional[Iterable[Any]] = None):
+        self._brands: Dict[Any, Dict[str, Any]] = {}
+        self._postings: Dict[str, set] = {}
+        self._next_id = 0
+        self._generation = 0
+        self._fingerprint = (None, None)
+        self._lock = threading.Lock()
+
+        for b in brands or []:
+            if isinstance(b, str):
+                self.add(b)
+            else:
+                self.add(**b)
+
+    def __len__(self):
+        return len(self._brands)
+
+    def __contains__(self, brand_id):
+        return brand_id in self._brands
+
+    # ---------------------------
+    # Incremental maintenance
+    # ---------------------------
+    def add(self, name: str, brand_id: Any = None, **meta) -> Any:
+        key = fold_confusables(name)
+        if not key:
+            raise ValueError(f"Brand name has no indexable characters: {name!r}")
+
+        with self._lock:
+            if brand_id is None:
+                brand_id = self._next_id
+                self._next_id += 1
+            if brand_id in self._brands:
+                self._unindex_locked(brand_id)
+
+            grams = ngrams(key)
+            self._generation += 1
+            self._brands[brand_id] = {"name": name, "key": key, "grams": grams, "meta": meta}
+            for g in grams:
+                self._postings.setdefault(g, set()).add(brand_id)
+        return brand_id
+
+    def remove(self, brand_id: Any) -> bool:
+        with self._lock:
+            if brand_id not in self._brands:
+                return False
+            self._unindex_locked(brand_id)
+            self._generation += 1
+            return True
+
+    def _unindex_locked(self, brand_id: Any) -> None:
+        entry = self._brands.pop(brand_id)
+        for g in entry["grams"]:
+            ids = self._postings.get(g)
+            if ids is not None:
+                ids.discard(brand_id)
+                if not ids:
+                    del self._postings[g]
+
+    def fingerprint(self) -> str:
+        """
+        Digest of the indexed (folded) brand names. Equal corpora give equal
+        fingerprints across restarts, so stored brand-match scores can tell
+        whether they are still current.
+        """
+        with self._lock:
+            generation, digest = self._fingerprint
+            if generation != self._generation:
+                h = hashlib.sha256()
+                for key in sorted(e["key"] for e in self._brands.values()):
+                    h.update(key.encode())
+                    h.update(b"\n")
+                digest = h.hexdigest()
+                self._fingerprint = (self._generation, digest)
+            return digest
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def query(self, text: str, k: int = 5, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Top-k brands for `text`, best first:
+        [{"brand_id", "name", "score", "meta"}, ...]
+        score is the SequenceMatcher ratio of the folded names (0..1).
+        """
+        key = fold_confusables(text)
+        if not key:
+            return []
+        grams = ngrams(key)
+
+        with self._lock:
+            overlap = Counter()
+            for g in grams:
+                ids = self._postings.get(g)
+                if ids:
+                    overlap.update(ids)
+
+            # Dice coefficient on gram sets -> cheap pre-ranking
+            def dice(item: Tuple[Any, int]) -> float:
+                bid, shared = item
+                return 2.0 * shared / (len(grams) + len(self._brands[bid]["grams"]))
+
+            limit = max(MIN_RERANK, k * RERANK_PER_RESULT)
+            rest = []
+            if len(self._brands) <= limit:
+                candidates = list(self._brands.items())
+            else:
+                shortlist = heapq.nlargest(limit, overlap.items(), key=dice)
+                candidates = [(bid, self._brands[bid]) for bid, _ in shortlist]
+                if len(candidates) < k and len(self._brands) <= LINEAR_FALLBACK_MAX:
+                    picked = {bid for bid, _ in candidates}
+                    rest = [(bid, e) for bid, e in self._brands.items() if bid not in picked]
+
+        scored = []
+        for bid, entry in candidates:
+            score = SequenceMatcher(None, key, entry["key"]).ratio()
+            if score >= min_score:
+                scored.append((score, bid, entry))
+
+        if rest:
+            # quick_ratio() bounds ratio() from above: stop once the bound
+            # cannot beat the current k-th best score
+            top = heapq.nlargest(k, (t[0] for t in scored))
+            heapq.heapify(top)
+            bounded = []
+            for bid, entry in rest:
+                sm = SequenceMatcher(None, key, entry["key"])
+                bounded.append((sm.quick_ratio(), bid, entry, sm))
+            bounded.sort(key=lambda t: t[0], reverse=True)
+            for bound, bid, entry, sm in bounded:
+                if bound < min_score or (len(top) >= k and bound <= top[0]):
+                    break
+                score = sm.ratio()
+                if score >= min_score:
+                    scored.append((score, bid, entry))
+                    heapq.heappush(top, score)
+                    if len(top) > k:
+                        heapq.heappop(top)
+
+        best = heapq.nlargest(k, scored, key=lambda t: t[0])
+        return [{"brand_id": bid, "name": entry["name"], "score": score, "meta": entry["meta"]}
+                for score, bid, entry in best]
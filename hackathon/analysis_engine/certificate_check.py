@@ -1,2 +1,91 @@
+import json
+import hashlib
+
+
 def verify_certificate(fake_hash, real_hash):
     return 1 if fake_hash == real_hash else 0
+
+
+# ============================================================
+# Certificate reputation (cert SHA-256 -> publisher / brand / verdicts)
+# ============================================================
+
+def _record_digest(record):
+    payload = json.dumps(record, sort_keys=True, default=str).encode()
+    return int.from_bytes(hashlib.sha256(payload).digest(), "big")
+
+
+class CertReputation:
+    """
+    In-memory view of the certificate fingerprint store.
+    Lookups are dict hits; brand (name or package) -> fingerprints is kept
+    alongside so a signing cert can be checked against every claimed
+    brand at once.
+    """
+
+    def __init__(self, records=None):
+        self._by_sha256 = {}
+        self._by_brand = {}
+        # order-independent sum of per-record digests, kept up to date on load()
+        self._digest = 0
+        self.load(records or [])
+
+    def __len__(self):
+        return len(self._by_sha256)
+
+    def load(self, records):
+        """
+        records: iterable of dicts with at least "sha256"; optional
+        "publisher", "brand", "package", "verdict", "legit_count",
+        "malicious_count".
+        """
+        for r in records:
+            sha = r["sha256"].lower()
+            old = self._by_sha256.get(sha)
+            if old:
+                self._digest -= _record_digest(old)
+                for key in (old.get("brand"), old.get("package")):
+                    self._by_brand.get(key, set()).discard(sha)
+            self._by_sha256[sha] = r
+            self._digest += _record_digest(r)
+            # only certs vouched for as legit define what a brand signs with
+            if r.get("verdict") != "malicious":
+                for key in (r.get("brand"), r.get("package")):
+                    if key:
+                        self._by_brand.setdefault(key, set()).add(sha)
+
+    def fingerprint(self):
+        """Changes whenever a record is added or replaced; for rescoring."""
+        return f"{self._digest % (1 << 256):064x}"
+
+    def lookup(self, sha256):
+        return self._by_sha256.get((sha256 or "").lower())
+
+    def brand_certs(self, brand):
+        return self._by_brand.get(brand, set())
+
+    def assess(self, cert_sha256s, claimed_brands=()):
+        """
+        Score an APK's signing certs against the store:
+        - known: store records for the APK's certs
+        - malicious: any cert with a malicious verdict
+        - cert_key_mismatch: per claimed brand, True when the brand has
+          known certs and none of them signed this APK
+        """
+        shas = {s.lower() for s in cert_sha256s if s}
+        known = [dict(self._by_sha256[s]) for s in shas if s in self._by_sha256]
+
+        mismatch = {}
+        for brand in claimed_brands:
+            brand_certs = self._by_brand.get(brand)
+            if brand_certs:
+                mismatch[brand] = not (brand_certs & shas)
+
+        return {
+            "known": known,
+            "unknown": len(shas) - len(known),
+            "signed_by_brands": sorted({k["brand"] for k in known if k.get("brand")}),
+            "malicious": any(k.get("verdict") == "malicious" for k in known),
+            "cert_key_mismatch": mismatch,
+            "mismatch": any(mismatch.values()),
+        }
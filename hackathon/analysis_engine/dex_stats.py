@@ -0,0 +1,330 @@
+# analysis_engine/dex_stats.py
+
+"""
+Single-pass DEX statistics straight from the dex bytes.
+
+Reads the header, the id tables and each class's class_data with
+struct, one dex file at a time, keeping only counters: no
+DalvikVMFormat objects, no class or method lists. Memory is bounded by
+the dex being read plus the per-package counters (capped at
+MAX_PACKAGES, the rest folded into OTHER_PACKAGE).
+"""
+
+import struct
+from bisect import bisect_left
+from typing import Dict, Any, Iterable, Iterator, Optional, List, Tuple
+
+
+MAX_PACKAGES = 5000
+OTHER_PACKAGE = "(other)"
+TOP_PACKAGES = 20
+CLASSES_SAMPLE = 20
+# class / method names of at most this many characters look minified
+OBFUSCATED_NAME_LEN = 2
+# generated classes with legitimately short names
+_SHORT_NAME_ALLOWED = {"R", "BuildConfig"}
+
+REFLECTION_APIS = {
+    "Ljava/lang/Class;": ("forName", "getMethod", "getDeclaredMethod", "getField",
+                          "getDeclaredField", "getConstructor", "getDeclaredConstructor",
+                          "newInstance"),
+    "Ljava/lang/reflect/Method;": ("invoke",),
+    "Ljava/lang/reflect/Constructor;": ("newInstance",),
+    "Ljava/lang/reflect/Field;": ("get", "set"),
+    "Ljava/lang/reflect/AccessibleObject;": ("setAccessible",),
+}
+
+DYNAMIC_LOADING_APIS = {
+    "Ldalvik/system/DexClassLoader;": ("<init>",),
+    "Ldalvik/system/PathClassLoader;": ("<init>",),
+    "Ldalvik/system/InMemoryDexClassLoader;": ("<init>",),
+    "Ldalvik/system/DexFile;": ("<init>", "loadDex", "loadClass"),
+    "Ljava/lang/ClassLoader;": ("loadClass",),
+    "Ljava/lang/System;": ("load", "loadLibrary"),
+    "Ljava/lang/Runtime;": ("load", "loadLibrary"),
+}
+
+_HEADER = struct.Struct("<20I")
+_METHOD_ID = struct.Struct("<HHI")
+_CLASS_DEF = struct.Struct("<8I")
+_NO_INDEX = 0xFFFFFFFF
+
+
+def _uleb128(buf, off: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        b = buf[off]
+        off += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, off
+        shift += 7
+
+
+class _Dex:
+    """Random access to one dex file's id tables (no up-front parsing)."""
+
+    def __init__(self, data: bytes):
+        if data[:3] != b"dex":
+            raise ValueError("not a dex file")
+        self.buf = memoryview(data)
+        (_, _, _, _, _, _,
+         self.string_ids_size, self.string_ids_off,
+         self.type_ids_size, self.type_ids_off,
+         _, _, _, _,
+         self.method_ids_size, self.method_ids_off,
+         self.class_defs_size, self.class_defs_off,
+         _, _) = _HEADER.unpack_from(self.buf, 32)
+
+    def string_off(self, idx: int) -> int:
+        return struct.unpack_from("<I", self.buf, self.string_ids_off + 4 * idx)[0]
+
+    def string(self, idx: int) -> str:
+        _, start = _uleb128(self.buf, self.string_off(idx))
+        end = start
+        while self.buf[end]:
+            end += 1
+        return bytes(self.buf[start:end]).decode("utf-8", "replace")
+
+    def string_len(self, idx: int) -> int:
+        # UTF-16 length prefix: enough to tell short names without decoding
+        return _uleb128(self.buf, self.string_off(idx))[0]
+
+    def type_string_idx(self, type_idx: int) -> int:
+        return struct.unpack_from("<I", self.buf, self.type_ids_off + 4 * type_idx)[0]
+
+    def find_string(self, s: str) -> Optional[int]:
+        # string_ids are sorted; ASCII descriptors/names sort as plain strings
+        idx = bisect_left(_LazySeq(self.string, self.string_ids_size), s)
+        if idx < self.string_ids_size and self.string(idx) == s:
+            return idx
+        return None
+
+    def find_type(self, descriptor: str) -> Optional[int]:
+        sidx = self.find_string(descriptor)
+        if sidx is None:
+            return None
+        # type_ids are sorted by string index
+        idx = bisect_left(_LazySeq(self.type_string_idx, self.type_ids_size), sidx)
+        if idx < self.type_ids_size and self.type_string_idx(idx) == sidx:
+            return idx
+        return None
+
+
+class _LazySeq:
+    """Indexable view for bisect without materialising the table."""
+
+    def __init__(self, getter, size):
+        self._getter = getter
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i):
+        return self._getter(i)
+
+
+def _short_name(name: str) -> bool:
+    parts = [p for p in name.split("$") if p and not p.isdigit()]
+    if not parts or parts[0] in _SHORT_NAME_ALLOWED:
+        return False
+    return all(len(p) <= OBFUSCATED_NAME_LEN for p in parts)
+
+
+class DexStats:
+    """
+    Accumulates statistics over the dex files of one APK:
+
+        stats = DexStats()
+        for data in apk.get_all_dex():
+            stats.feed(data)
+        stats.result()
+    """
+
+    def __init__(self):
+        self.num_dex = 0
+        self.num_classes = 0
+        self.num_methods = 0
+        self.num_method_refs = 0
+        self.num_strings = 0
+        self.obfuscated_classes = 0
+        self.obfuscated_methods = 0
+        self.packages: Dict[str, List[int]] = {}
+        self.classes_sample: List[str] = []
+        self.reflection: Dict[str, int] = {}
+        self.dynamic_loading: Dict[str, int] = {}
+        self.errors: List[str] = []
+
+    def feed(self, data: bytes) -> None:
+        self.num_dex += 1
+        try:
+            dex = _Dex(data)
+            self.num_strings += dex.string_ids_size
+            self.num_method_refs += dex.method_ids_size
+            self._api_refs(dex, REFLECTION_APIS, self.reflection)
+            self._api_refs(dex, DYNAMIC_LOADING_APIS, self.dynamic_loading)
+            self._classes(dex)
+        except (ValueError, IndexError, struct.error) as e:
+            self.errors.append(f"dex #{self.num_dex}: {e}")
+
+    def _package_counts(self, package: str) -> List[int]:
+        counts = self.packages.get(package)
+        if counts is None:
+            if len(self.packages) >= MAX_PACKAGES:
+                package = OTHER_PACKAGE
+            counts = self.packages.setdefault(package, [0, 0])
+        return counts
+
+    def _classes(self, dex: _Dex) -> None:
+        buf = dex.buf
+        for i in range(dex.class_defs_size):
+            class_idx, _, _, _, _, _, class_data_off, _ = _CLASS_DEF.unpack_from(
+                buf, dex.class_defs_off + 32 * i)
+            descriptor = dex.string(dex.type_string_idx(class_idx))
+            name = descriptor[1:-1] if descriptor.startswith("L") else descriptor
+            package, _, simple = name.rpartition("/")
+
+            self.num_classes += 1
+            if len(self.classes_sample) < CLASSES_SAMPLE:
+                self.classes_sample.append(descriptor)
+            if _short_name(simple):
+                self.obfuscated_classes += 1
+
+            methods = 0
+            if class_data_off:
+                off = class_data_off
+                sfields, off = _uleb128(buf, off)
+                ifields, off = _uleb128(buf, off)
+                direct, off = _uleb128(buf, off)
+                virtual, off = _uleb128(buf, off)
+                for _ in range(2 * (sfields + ifields)):
+                    _, off = _uleb128(buf, off)
+                for count in (direct, virtual):
+                    method_idx = 0
+                    for _ in range(count):
+                        diff, off = _uleb128(buf, off)
+                        _, off = _uleb128(buf, off)   # access_flags
+                        _, off = _uleb128(buf, off)   # code_off
+                        method_idx += diff
+                        name_idx = _METHOD_ID.unpack_from(
+                            buf, dex.method_ids_off + 8 * method_idx)[2]
+                        if dex.string_len(name_idx) <= OBFUSCATED_NAME_LEN:
+                            self.obfuscated_methods += 1
+                methods = direct + virtual
+
+            self.num_methods += methods
+            counts = self._package_counts(package.replace("/", ".") or "(default)")
+            counts[0] += 1
+            counts[1] += methods
+
+    @staticmethod
+    def _api_refs(dex: _Dex, apis: Dict[str, Tuple[str, ...]], out: Dict[str, int]) -> None:
+        """
+        Count method references (method_ids entries) to each API. A
+        reference means the dex calls it somewhere; caller lists come
+        from the xref stage.
+        """
+        wanted = {}
+        for cls, names in apis.items():
+            type_idx = dex.find_type(cls)
+            if type_idx is None:
+                continue
+            name_idxs = {}
+            for n in names:
+                sidx = dex.find_string(n)
+                if sidx is not None:
+                    name_idxs[sidx] = f"{cls}->{n}"
+            if name_idxs:
+                wanted[type_idx] = name_idxs
+        if not wanted:
+            return
+
+        # method_ids are sorted by defining class: only scan the wanted runs
+        class_of = lambda i: _METHOD_ID.unpack_from(dex.buf, dex.method_ids_off + 8 * i)[0]
+        methods = _LazySeq(class_of, dex.method_ids_size)
+        for type_idx, name_idxs in wanted.items():
+            i = bisect_left(methods, type_idx)
+            while i < dex.method_ids_size:
+                cls, _, name_idx = _METHOD_ID.unpack_from(dex.buf, dex.method_ids_off + 8 * i)
+                if cls != type_idx:
+                    break
+                key = name_idxs.get(name_idx)
+                if key:
+                    out[key] = out.get(key, 0) + 1
+                i += 1
+
+    def result(self) -> Dict[str, Any]:
+        top = sorted(self.packages.items(), key=lambda kv: kv[1][1], reverse=True)[:TOP_PACKAGES]
+        return {
+            "num_dex": self.num_dex,
+            "num_classes": self.num_classes,
+            "num_methods": self.num_methods,
+            "num_method_refs": self.num_method_refs,
+            "num_strings": self.num_strings,
+            "num_packages": len(self.packages),
+            "top_packages": [{"package": p, "classes": c, "methods": m} for p, (c, m) in top],
+            "obfuscation_ratio": round(self.obfuscated_classes / self.num_classes, 3)
+            if self.num_classes else 0.0,
+            "obfuscated_method_ratio": round(self.obfuscated_methods / self.num_methods, 3)
+            if self.num_methods else 0.0,
+            "reflection_refs": dict(sorted(self.reflection.items())),
+            "reflection_ref_count": sum(self.reflection.values()),
+            "dynamic_loading_refs": dict(sorted(self.dynamic_loading.items())),
+            "dynamic_loading_ref_count": sum(self.dynamic_loading.values()),
+            "classes_sample": self.classes_sample,
+            "errors": self.errors,
+        }
+
+
+def merge_dex_stats(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine the result() of several DexStats (the splits of a bundle).
+    Counts are summed and ratios re-weighted; num_packages is the sum
+    per split (feature splits do not share packages), top_packages is
+    re-ranked from the per-split top lists.
+    """
+    out: Dict[str, Any] = {k: sum(r.get(k, 0) for r in results)
+                           for k in ("num_dex", "num_classes", "num_methods", "num_method_refs",
+                                     "num_strings", "num_packages", "reflection_ref_count",
+                                     "dynamic_loading_ref_count")}
+    packages: Dict[str, List[int]] = {}
+    for r in results:
+        for p in r.get("top_packages") or ():
+            counts = packages.setdefault(p["package"], [0, 0])
+            counts[0] += p["classes"]
+            counts[1] += p["methods"]
+    top = sorted(packages.items(), key=lambda kv: kv[1][1], reverse=True)[:TOP_PACKAGES]
+    out["top_packages"] = [{"package": p, "classes": c, "methods": m} for p, (c, m) in top]
+
+    for ratio, total in (("obfuscation_ratio", "num_classes"),
+                         ("obfuscated_method_ratio", "num_methods")):
+        weighted = sum(r.get(ratio, 0.0) * r.get(total, 0) for r in results)
+        out[ratio] = round(weighted / out[total], 3) if out[total] else 0.0
+    for key in ("reflection_refs", "dynamic_loading_refs"):
+        refs: Dict[str, int] = {}
+        for r in results:
+            for api, n in (r.get(key) or {}).items():
+                refs[api] = refs.get(api, 0) + n
+        out[key] = dict(sorted(refs.items()))
+    out["classes_sample"] = [c for r in results for c in r.get("classes_sample") or ()][:CLASSES_SAMPLE]
+    out["errors"] = [e for r in results for e in r.get("errors") or ()]
+    return out
+
+
+def class_descriptors(data: bytes) -> Iterator[str]:
+    """Descriptors of the classes defined in one dex file (no method parsing)."""
+    try:
+        dex = _Dex(data)
+        for i in range(dex.class_defs_size):
+            class_idx = struct.unpack_from("<I", dex.buf, dex.class_defs_off + 32 * i)[0]
+            yield dex.string(dex.type_string_idx(class_idx))
+    except (ValueError, IndexError, struct.error):
+        return
+
+
+def dex_stats(dex_files: Iterable[bytes]) -> Dict[str, Any]:
+    stats = DexStats()
+    for data in dex_files:
+        stats.feed(data)
+    return stats.result()
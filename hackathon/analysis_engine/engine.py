@@ -5,52 +5,113 @@ Central analysis engine.
 Handles:
 1. Store-only scoring (metadata from Play Store only)
 2. Deep APK scoring (manifest, certs, URLs, icon hash, etc.)
+
+Androguard, PIL / imagehash and NumPy are imported on first use, not at
+module import: store-only workers never load them. APK workers can pay
+the cost up front with warmup().
 """
 
 import os
 import io
 import re
+import sys
+import zipfile
 import json
 import time
 import hashlib
-import tempfile
 from pathlib import Path
-from typing import Optional, Dict, Any, List
-
-from PIL import Image
-from imagehash import phash
-from androguard.misc import AnalyzeAPK
+from typing import Optional, Dict, Any, List, Callable, TYPE_CHECKING
 
 # Store-only report builder
 from .reports.json_report import build_store_report
-from .reports.score_weights import WEIGHTS
+from .score_weights import get_profile
+from .result_cache import get_default_cache, sha256_of_bytes, sha256_of_file
+from .icon_index import get_default_icon_index, DEFAULT_MATCH_RADIUS
+from .apk_signals import set_cert_reputation, get_cert_reputation, claimed_brands
+from .dex_stats import DexStats, class_descriptors
+from .ioc_extractor import IocExtractor
+from .apk_bundle import bundle_index, merge_split_reports, MAX_SPLITS
+from .icon_pipeline import extract_icon, hash_icon
+from .metrics import StageTimer, time_into
+
+if TYPE_CHECKING:
+    from androguard.core.bytecodes.apk import APK
+    from androguard.core.bytecodes.dvm import DalvikVMFormat
+
+
+# Bump whenever the shape or content of the deep report changes:
+# cached results written by another version are treated as misses.
+ENGINE_VERSION = "1.7.0"
+
+# Analysis tiers, cheapest first. Each level includes everything below it:
+# - manifest:  APK object only (identity, certs, components, file list)
+# - resources: + IOCs from resource strings, dex string pools and text
+#                assets, the launcher icon (pHash / dHash / aHash + colour
+#                histogram, see icon_pipeline.py) and the similarity
+#                fingerprint (MinHash, see apk_similarity.py)
+# - full:      + dex statistics (streamed from the dex bytes)
+ANALYSIS_LEVELS = ("manifest", "resources", "full")
+
+# Framework APIs whose callers are reported by the on-demand xref stage
+SENSITIVE_APIS = [
+    ("Landroid/telephony/SmsManager;", "sendTextMessage"),
+    ("Landroid/telephony/TelephonyManager;", "getDeviceId"),
+    ("Ldalvik/system/DexClassLoader;", "<init>"),
+    ("Ljava/lang/Runtime;", "exec"),
+    ("Landroid/app/admin/DevicePolicyManager;", "lockNow"),
+    ("Landroid/view/WindowManager;", "addView"),
+]
 
 
 # ============================================================
 # 1. STORE-ONLY ANALYSIS (Play Store metadata only)
 # ============================================================
 
-def analyze_store_only(play_data):
+def analyze_store_only(play_data, profile: Optional[str] = None,
+                       apk: Optional[Dict[str, Any]] = None):
     """
     Orchestrates store-only checks and returns:
     - per-signal results (pkg/title, reviews, installs, developer)
     - risk_score (0..100)
+    `profile` names a weight profile (None -> "default"); KeyError if unknown.
+    `apk`: a deep scan's raw features (rescore.extract_apk_features), which
+    adds the APK signals (icon similarity, cert mismatch, permissions,
+    URLs) to the report and the score.
     """
-    report = build_store_report(play_data, WEIGHTS)
+    report = build_store_report(play_data, get_profile(profile), apk=apk)
     return report
 
 
+def analyze_store_batch(table, profile: Optional[str] = None):
+    """
+    Columnar version of analyze_store_only for re-scoring a whole catalogue:
+    takes columns (dict / pyarrow Table) or a list of play_data dicts and
+    returns per-app signal arrays and risk_score, identical to the
+    per-app path.
+    """
+    from .reports.batch_report import build_store_reports_batch  # NumPy
+    return build_store_reports_batch(table, get_profile(profile))
+
+
 
 # ============================================================
 # 2. APK FULL DEEP ANALYSIS (icon, certs, manifest, URLs, etc.)
 # ============================================================
 
-def _safe_phash(img_bytes: bytes) -> str | None:
-    try:
-        img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-        return str(phash(img))
-    except Exception:
-        return None
+def warmup() -> None:
+    """
+    Import the APK stack (Androguard, PIL, imagehash) and hash one small
+    image, so the first real analysis in this process does not pay for
+    it. Used as the APK pool's worker initializer.
+    """
+    from androguard.core.bytecodes.apk import APK  # noqa: F401
+    from androguard.core.bytecodes.dvm import DalvikVMFormat  # noqa: F401
+    from PIL import Image
+    from . import apk_similarity  # noqa: F401  (NumPy)
+
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 32)).save(buf, format="PNG")
+    hash_icon(buf.getvalue(), use_cache=False)
 
 
 def _sha1_hex(data: bytes) -> str:
@@ -61,191 +122,528 @@ def _sha256_hex(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
-def _extract_urls(resource_strings) -> list:
+def cache_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters and size of the APK result cache (all processes).
+    """
+    stats = get_default_cache().stats()
+    stats["engine_version"] = ENGINE_VERSION
+    return stats
+
+
+def match_known_icons(apk_result: Dict[str, Any], k: int = 5,
+                      radius: int = DEFAULT_MATCH_RADIUS) -> Dict[str, Any]:
+    """
+    Look the report's icon pHash up in the known-icon index and attach
+    the closest known-good icons (within `radius` bits) as "icon_matches".
+    Runs in the caller's process, so the index is loaded once, not per job.
+    """
+    apk = apk_result.get("apk") if apk_result.get("success") else None
+    if not apk or not apk.get("icon_hash"):
+        return apk_result
+
     try:
-        blob = str(resource_strings)
-        found = re.findall(r"https?://[^\s\"'<>()]+", blob)
-        return list(dict.fromkeys(found))
-    except:
-        return []
+        with time_into(apk_result.get("timings"), "icon_match"):
+            apk["icon_matches"] = get_default_icon_index().nearest(apk["icon_hash"], k=k,
+                                                                   max_distance=radius)
+    except Exception as e:
+        apk["icon_matches"] = {"error": str(e)}
+    return apk_result
+
+
+def find_similar_apks(apk_result: Dict[str, Any], k: int = 10) -> Dict[str, Any]:
+    """
+    Look the report's fingerprint up in the index of previously scanned
+    APKs, record this APK, and attach its nearest neighbours and family
+    as "similar_apks". Runs in the caller's process, like match_known_icons.
+    """
+    apk = apk_result.get("apk") if apk_result.get("success") else None
+    fingerprint = (apk or {}).get("fingerprint")
+    if not fingerprint or not apk.get("sha256"):
+        return apk_result
+
+    from .apk_similarity import get_default_similarity_index
+    try:
+        with time_into(apk_result.get("timings"), "similarity"):
+            apk["similar_apks"] = get_default_similarity_index().observe(
+                apk["sha256"], (apk.get("identity") or {}).get("package"),
+                fingerprint["minhash"], k=k)
+    except Exception as e:
+        apk["similar_apks"] = {"error": str(e)}
+    return apk_result
+
+
+def check_cert_reputation(apk_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Look every signing cert of the report up in the fingerprint store and
+    check it against all brands the APK claims, in one pass. Attaches
+    "cert_reputation". Run after match_known_icons so icon look-alikes
+    count as claims.
+    """
+    apk = apk_result.get("apk") if apk_result.get("success") else None
+    if not apk:
+        return apk_result
+
+    shas = [c.get("sha256") for c in apk.get("certificates") or []]
+    with time_into(apk_result.get("timings"), "cert_reputation"):
+        claimed = claimed_brands(apk, apk.get("icon_matches") or [])
+        apk["cert_reputation"] = get_cert_reputation().assess(shas, claimed)
+    apk["cert_reputation"]["claimed_brands"] = claimed
+    return apk_result
 
 
 def analyze_apk_full(apk_bytes: Optional[bytes] = None,
                      apk_path: Optional[str] = None,
-                     keep_temp: bool = False) -> Dict[str, Any]:
+                     keep_temp: bool = False,
+                     use_cache: bool = True,
+                     level: str = "full",
+                     xref: bool = False,
+                     apk_sha256: Optional[str] = None,
+                     split_map: Optional[Callable] = None) -> Dict[str, Any]:
     """
-    Full APK analysis using Androguard:
-    - identity info
-    - manifest + components
-    - certificates (sha1/sha256)
-    - icon perceptual hash
-    - extracted URLs
-    - native libs, assets, dex stats
+    Tiered APK analysis using Androguard:
+    - identity info, manifest + components, certificates (sha1/sha256),
+      native libs / assets                              -> level "manifest"
+    - icon perceptual hash, IOCs (URLs, domains, IPs,
+      e-mails, UPI handles)                            -> level "resources"
+    - dex stats (classes, methods, packages,
+      obfuscation, reflection / dynamic loading)       -> level "full"
+    - callers of sensitive framework APIs              -> xref=True (implies "full")
+
+    Split bundles (XAPK / APKS, see apk_bundle.py) are accepted too: each
+    split is analysed on its own and the reports merged into one, with a
+    "bundle" section listing the splits. split_map(fn, calls) runs
+    fn(**kwargs) for each kwargs dict in calls and returns the results in
+    order; pass a pool-backed one (analysis_pool.map_in_pool) to analyse
+    the splits in parallel. The default runs them one after another.
+
+    Only the `APK` object is opened for every level; dex statistics are
+    streamed from the raw dex bytes. DalvikVMFormat objects are built
+    only for the xref stage.
+
+    Results are cached by APK SHA-256 + ENGINE_VERSION + level, so a
+    re-upload of the same file returns without re-running Androguard.
+    Every result carries a per-stage timing breakdown under "timings"
+    (never cached: a cache hit reports the hash + lookup time only).
+    Pass apk_sha256 when the caller already hashed the file while
+    receiving it. Prefer apk_path over apk_bytes for large uploads: the
+    file is opened in place, no temp copy is made. keep_temp is kept for
+    backwards compatibility only (bytes are no longer spilled to disk).
     """
 
-    tmp_file = None
-
     # Must have bytes or valid path
     if apk_bytes is None and apk_path is None:
         return {"success": False, "error": "No APK source provided"}
 
-    try:
-        # Write bytes to temp
-        if apk_bytes is not None:
-            t = tempfile.NamedTemporaryFile(delete=False, suffix=".apk")
-            t.write(apk_bytes)
-            t.flush()
-            t.close()
-            tmp_file = t.name
-            apk_to_open = tmp_file
-        else:
-            apk_to_open = apk_path
+    if level not in ANALYSIS_LEVELS:
+        return {"success": False, "error": f"Unknown analysis level: {level}"}
+    if xref:
+        level = "full"
+    variant = level + ("+xref" if xref else "")
 
-        # Sanity check
-        if not apk_to_open or not os.path.exists(apk_to_open):
-            return {"success": False, "error": f"APK not found: {apk_to_open}"}
+    timer = StageTimer()
+    if not use_cache:
+        result = _analyze(apk_bytes, apk_path, level, xref, timer, split_map)
+        result["timings"] = timer.result()
+        return result
+
+    try:
+        with timer.stage("hash"):
+            if apk_sha256:
+                sha256 = apk_sha256
+            elif apk_bytes is not None:
+                sha256 = sha256_of_bytes(apk_bytes)
+            else:
+                sha256 = sha256_of_file(apk_path)
+    except OSError:
+        return {"success": False, "error": f"APK not found: {apk_path}"}
+
+    cache = get_default_cache()
+    with timer.stage("cache_lookup"):
+        cached = cache.get(sha256, ENGINE_VERSION, variant)
+    if cached is not None:
+        cached["cache_hit"] = True
+        cached["timings"] = timer.result()
+        return cached
+
+    result = _analyze(apk_bytes, apk_path, level, xref, timer, split_map)
+    if result.get("success"):
+        result["apk"]["sha256"] = sha256
+        with timer.stage("cache_store"):
+            cache.put(sha256, ENGINE_VERSION, result, variant)
+    result["cache_hit"] = False
+    result["timings"] = timer.result()
+    return result
+
+
+# ---------------------------
+# Stage 1: manifest (APK object only)
+# ---------------------------
+
+def _identity(a: "APK") -> Dict[str, Any]:
+    return {
+        "package": a.get_package(),
+        "versionName": a.get_androidversion_name(),
+        "versionCode": a.get_androidversion_code(),
+        "minSdk": a.get_min_sdk_version(),
+        "targetSdk": a.get_target_sdk_version(),
+        # config / feature splits name themselves; None for a base or full APK
+        "split": _split_name(a),
+    }
+
+
+def _split_name(a: "APK") -> Optional[str]:
+    try:
+        return a.get_android_manifest_xml().get("split")
+    except Exception:
+        return None
 
-        # Run Androguard
-        try:
-            a, d, dx = AnalyzeAPK(apk_to_open)
-        except Exception as e:
-            return {"success": False, "error": f"Androguard failed: {e}"}
 
-        # ---------------------------
-        # Identity
-        # ---------------------------
-        identity = {
-            "package": a.get_package(),
-            "versionName": a.get_androidversion_name(),
-            "versionCode": a.get_androidversion_code(),
-            "minSdk": a.get_min_sdk_version(),
-            "targetSdk": a.get_target_sdk_version(),
-        }
-
-        # ---------------------------
-        # Certificates
-        # ---------------------------
+def _certificates(a: "APK") -> List[Dict[str, str]]:
+    certificates = []
+    try:
+        certs = a.get_certificates() or []
+        for c in certs:
+            if isinstance(c, (bytes, bytearray)):
+                der = bytes(c)
+            elif hasattr(c, "dump"):
+                der = c.dump()  # asn1crypto certificate -> DER
+            else:
+                der = str(c).encode()
+
+            certificates.append({
+                "sha1": _sha1_hex(der),
+                "sha256": _sha256_hex(der),
+            })
+    except:
         certificates = []
-        try:
-            certs = a.get_certificates() or []
-            for c in certs:
-                if isinstance(c, (bytes, bytearray)):
-                    der = bytes(c)
-                else:
-                    der = getattr(c, "original", None) or str(c).encode()
-
-                certificates.append({
-                    "sha1": _sha1_hex(der),
-                    "sha256": _sha256_hex(der),
-                })
-        except:
-            certificates = []
-
-        # ---------------------------
-        # Manifest components
-        # ---------------------------
-        manifest = {
-            "permissions": a.get_permissions() or [],
-            "activities": a.get_activities() or [],
-            "services": a.get_services() or [],
-            "receivers": a.get_receivers() or [],
-            "providers": a.get_providers() or [],
-            "intent_filters": a.get_intent_filters() or {}
-        }
-
-        # ---------------------------
-        # Icon pHash
-        # ---------------------------
-        icon_hash = None
-        try:
-            icon_dat = a.get_app_icon()
-            if isinstance(icon_dat, (bytes, bytearray)):
-                icon_hash = _safe_phash(icon_dat)
-            elif isinstance(icon_dat, str) and os.path.exists(icon_dat):
-                with open(icon_dat, "rb") as f:
-                    icon_hash = _safe_phash(f.read())
-        except:
-            icon_hash = None
-
-        # ---------------------------
-        # Extract URLs from resources
-        # ---------------------------
-        urls_found = []
-        try:
-            res = a.get_android_resources()
-            if res:
-                strings = res.get_strings()
-                urls_found = _extract_urls(strings)
-        except:
-            pass
-
-        # ---------------------------
-        # Files list metadata
-        # ---------------------------
+    return certificates
+
+
+def _interned(values) -> List[str]:
+    # component / file names repeat across lists, intent filters and
+    # reports: one str object each (also shrinks the pickle sent back
+    # from the pool worker)
+    return [sys.intern(v) if type(v) is str else v for v in values or ()]
+
+
+def _manifest(a: "APK") -> Dict[str, Any]:
+    manifest = {
+        "permissions": _interned(a.get_permissions()),
+        "activities": _interned(a.get_activities()),
+        "services": _interned(a.get_services()),
+        "receivers": _interned(a.get_receivers()),
+        "providers": _interned(a.get_providers()),
+        "intent_filters": {}
+    }
+
+    # intent filters are looked up per component
+    for itemtype, key in (("activity", "activities"),
+                          ("service", "services"),
+                          ("receiver", "receivers")):
+        for name in manifest[key]:
+            try:
+                filters = a.get_intent_filters(itemtype, name)
+            except Exception:
+                filters = None
+            if filters:
+                manifest["intent_filters"][name] = filters
+
+    return manifest
+
+
+def _files(a: "APK") -> Dict[str, List[str]]:
+    try:
+        files = _interned(a.get_files())
+    except:
         files = []
-        try:
-            files = list(a.get_files() or [])
-        except:
-            files = []
-
-        native_libs = [f for f in files if f.endswith(".so")]
-        assets = [f for f in files if f.startswith("assets/")]
-
-        # ---------------------------
-        # Simple DEX stats
-        # ---------------------------
-        dex_stats = {
-            "num_classes": None,
-            "num_methods": None,
-            "classes_sample": []
-        }
 
+    return {
+        "all": files,
+        "native_libs": [f for f in files if f.endswith(".so")],
+        "assets": [f for f in files if f.startswith("assets/")],
+    }
+
+
+# ---------------------------
+# Stage 2: resources (arsc strings + icon)
+# ---------------------------
+
+def _resource_strings(a: "APK"):
+    try:
+        res = a.get_android_resources()
+        if res and res.stringpool_main:
+            return iter(res.stringpool_main)
+    except Exception:
+        pass
+    return iter(())
+
+
+# ---------------------------
+# Stage 3: dex (+ optional cross-references)
+# ---------------------------
+
+def _load_dex(a: "APK") -> List["DalvikVMFormat"]:
+    from androguard.core.bytecodes.dvm import DalvikVMFormat
+
+    api = a.get_target_sdk_version()
+    return [DalvikVMFormat(dex, using_api=api) for dex in a.get_all_dex()]
+
+
+def _xref_stats(dex_files: List["DalvikVMFormat"]) -> Dict[str, Any]:
+    """
+    Second dex stage: builds the Analysis object and its cross-references,
+    which is the most expensive part of Androguard. Only run on request.
+    """
+    from androguard.core.analysis.analysis import Analysis
+
+    dx = Analysis()
+    for df in dex_files:
+        dx.add(df)
+    dx.create_xref()
+
+    sensitive_calls = {}
+    for classname, methodname in SENSITIVE_APIS:
+        callers = set()
+        for m in dx.find_methods(classname=re.escape(classname), methodname=re.escape(methodname) + "$"):
+            for _, caller, _ in m.get_xref_from():
+                callers.add(f"{caller.get_class_name()}->{caller.get_name()}")
+        if callers:
+            sensitive_calls[f"{classname}->{methodname}"] = sorted(callers)[:20]
+
+    return {
+        "num_internal_classes": sum(1 for c in dx.get_classes() if not c.is_external()),
+        "num_external_classes": sum(1 for c in dx.get_classes() if c.is_external()),
+        "sensitive_api_calls": sensitive_calls,
+    }
+
+
+def _heuristics(manifest: Dict[str, Any], files: Dict[str, List[str]]) -> Dict[str, Any]:
+    perms = manifest["permissions"]
+    return {
+        "has_overlay": any("SYSTEM_ALERT_WINDOW" in p for p in perms),
+        "has_native_libs": len(files["native_libs"]) > 0,
+        "asset_count": len(files["assets"]),
+    }
+
+
+def _analyze_apk_uncached(apk_bytes: Optional[bytes],
+                          apk_path: Optional[str],
+                          level: str = "full",
+                          xref: bool = False,
+                          timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+    depth = ANALYSIS_LEVELS.index(level)
+    timer = timer or StageTimer()
+
+    # Sanity check
+    if apk_bytes is None and (not apk_path or not os.path.exists(apk_path)):
+        return {"success": False, "error": f"APK not found: {apk_path}"}
+
+    # Open the APK only: zip directory + binary manifest.
+    # Bytes are parsed in memory; nothing is written to disk.
+    try:
+        from androguard.core.bytecodes.apk import APK
+        with timer.stage("open"):
+            if apk_bytes is not None:
+                a = APK(apk_bytes, raw=True)
+            else:
+                a = APK(apk_path)
+    except Exception as e:
+        return {"success": False, "error": f"Androguard failed: {e}"}
+
+    # ---------------------------
+    # Level "manifest"
+    # ---------------------------
+    with timer.stage("identity"):
+        identity = _identity(a)
+    with timer.stage("certificates"):
+        certificates = _certificates(a)
+    with timer.stage("manifest"):
+        manifest = _manifest(a)
+    with timer.stage("files"):
+        files = _files(a)
+
+    # ---------------------------
+    # Level "resources"
+    # ---------------------------
+    icon = None
+    iocs = None
+    dex_stats = None
+    hasher = None
+    if depth >= ANALYSIS_LEVELS.index("resources"):
+        from .apk_similarity import MinHasher, class_token, package_path, report_tokens
+
+        with timer.stage("icon"):
+            icon = extract_icon(a)
+
+        extractor = IocExtractor()
+        with timer.stage("resources"):
+            extractor.feed_strings(_resource_strings(a))
+        with timer.stage("assets"):
+            extractor.feed_zip_assets(a.zip)
+        # Level "full": dex stats share the single read of each dex file
+        dex_acc = DexStats() if depth >= ANALYSIS_LEVELS.index("full") else None
+        hasher = MinHasher()
+        prefix = package_path(identity.get("package") or "")
         try:
-            classes = dx.get_classes_names() or []
-            dex_stats["num_classes"] = len(classes)
-            dex_stats["classes_sample"] = classes[:20]
-
-            methods = list(dx.get_methods())
-            dex_stats["num_methods"] = len(methods)
-
-        except:
-            pass
-
-        # ---------------------------
-        # Heuristics (useful for scoring)
-        # ---------------------------
-        perms = manifest["permissions"]
-        heuristics = {
-            "has_overlay": any("SYSTEM_ALERT_WINDOW" in p for p in perms),
-            "has_native_libs": len(native_libs) > 0,
-            "asset_count": len(assets),
-        }
-
-        # ---------------------------
-        # Build final response
-        # ---------------------------
-        report = {
-            "identity": identity,
-            "certificates": certificates,
-            "manifest": manifest,
-            "icon_hash": icon_hash,
-            "urls_found": urls_found,
-            "files": {
-                "all": files,
-                "native_libs": native_libs,
-                "assets": assets
-            },
-            "dex": dex_stats,
-            "heuristics": heuristics,
-            "analysis_generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-        }
-
-        return {"success": True, "apk": report}
-
-    finally:
-        # Cleanup temporary file
-        if (apk_bytes is not None) and (tmp_file is not None) and (not keep_temp):
+            # one dex file in memory at a time
+            with timer.stage("dex"):
+                for data in a.get_all_dex():
+                    extractor.feed_dex(data)
+                    hasher.update("class", (class_token(d, prefix) for d in class_descriptors(data)))
+                    if dex_acc is not None:
+                        dex_acc.feed(data)
+        except Exception as e:
+            return {"success": False, "error": f"Androguard failed: {e}"}
+        iocs = extractor.result()
+        if dex_acc is not None:
+            dex_stats = dex_acc.result()
+
+    # ---------------------------
+    # xref on demand
+    # ---------------------------
+    xref_stats = None
+    if depth >= ANALYSIS_LEVELS.index("full"):
+        if xref:
             try:
-                os.remove(tmp_file)
-            except:
-                pass
+                with timer.stage("xref"):
+                    xref_stats = _xref_stats(_load_dex(a))
+            except Exception as e:
+                xref_stats = {"error": str(e)}
+
+    # ---------------------------
+    # Heuristics (useful for scoring)
+    # ---------------------------
+    heuristics = _heuristics(manifest, files)
+
+    # ---------------------------
+    # Build final response
+    # ---------------------------
+    report = {
+        "analysis_level": level,
+        "identity": identity,
+        "certificates": certificates,
+        "manifest": manifest,
+        # pHash of the launcher icon (icon index key); all hashes under "icon"
+        "icon_hash": icon["phash"] if icon else None,
+        "icon": icon,
+        "urls_found": iocs["urls"] if iocs else [],
+        "iocs": iocs,
+        "files": files,
+        "dex": dex_stats,
+        "heuristics": heuristics,
+        "analysis_generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+    if xref:
+        report["xref"] = xref_stats
+    if hasher is not None:
+        with timer.stage("fingerprint"):
+            for kind, tokens in report_tokens(report).items():
+                hasher.update(kind, tokens)
+            report["fingerprint"] = hasher.result()
+
+    return {"success": True, "apk": report}
+
+
+# ---------------------------
+# Split bundles (XAPK / APKS)
+# ---------------------------
+
+def _analyze(apk_bytes: Optional[bytes],
+             apk_path: Optional[str],
+             level: str,
+             xref: bool,
+             timer: StageTimer,
+             split_map: Optional[Callable] = None) -> Dict[str, Any]:
+    with timer.stage("bundle_index"):
+        index = bundle_index(apk_bytes, apk_path)
+    if index is None:
+        return _analyze_apk_uncached(apk_bytes, apk_path, level, xref, timer)
+    return _analyze_bundle(index, apk_bytes, apk_path, level, xref, timer, split_map)
+
+
+def _map_local(fn, calls):
+    return [fn(**kwargs) for kwargs in calls]
+
+
+def analyze_split(apk_path: Optional[str] = None,
+                  member: Optional[str] = None,
+                  split_bytes: Optional[bytes] = None,
+                  level: str = "full",
+                  xref: bool = False) -> Dict[str, Any]:
+    """
+    Deep analysis of one split of a bundle: the zip member `member` of
+    the bundle at apk_path (read in the worker, so only the path crosses
+    the process boundary), or split_bytes. Never cached on its own.
+    """
+    timer = StageTimer()
+    if split_bytes is None:
+        try:
+            with timer.stage("unpack"):
+                with zipfile.ZipFile(apk_path) as zf:
+                    split_bytes = zf.read(member)
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            return {"success": False, "error": f"Cannot read split {member}: {e}",
+                    "timings": timer.result()}
+    result = _analyze_apk_uncached(split_bytes, None, level, xref, timer)
+    if result.get("success"):
+        result["apk"]["sha256"] = sha256_of_bytes(split_bytes)
+    result["timings"] = timer.result()
+    return result
+
+
+def _analyze_bundle(index: Dict[str, Any],
+                    apk_bytes: Optional[bytes],
+                    apk_path: Optional[str],
+                    level: str,
+                    xref: bool,
+                    timer: StageTimer,
+                    split_map: Optional[Callable] = None) -> Dict[str, Any]:
+    splits = index["splits"]
+    if len(splits) > MAX_SPLITS:
+        return {"success": False, "error": f"Bundle has {len(splits)} splits (max {MAX_SPLITS})"}
+
+    # largest first (bundle_index order): the longest split starts first
+    if apk_bytes is not None:
+        with zipfile.ZipFile(io.BytesIO(apk_bytes)) as zf:
+            calls = [{"split_bytes": zf.read(s["name"]), "member": s["name"],
+                      "level": level, "xref": xref} for s in splits]
+    else:
+        calls = [{"apk_path": apk_path, "member": s["name"], "level": level, "xref": xref}
+                 for s in splits]
+    with timer.stage("splits"):
+        results = (split_map or _map_local)(analyze_split, calls)
+
+    parts = []
+    summary = []
+    for split, result in zip(splits, results):
+        timings = result.get("timings") or {}
+        entry = {"name": split["name"], "size": split["size"], "success": bool(result.get("success")),
+                 "seconds": timings.get("total_seconds")}
+        if result.get("success"):
+            apk = result["apk"]
+            entry.update(split=(apk.get("identity") or {}).get("split"),
+                         package=(apk.get("identity") or {}).get("package"),
+                         sha256=apk.get("sha256"))
+            parts.append((split["name"], apk))
+        else:
+            entry["error"] = result.get("error")
+        summary.append(entry)
+
+    if not parts:
+        return {"success": False, "error": "No split of the bundle could be analysed",
+                "bundle": {"format": index["format"], "splits": summary}}
+
+    with timer.stage("merge"):
+        report = merge_split_reports(parts)
+        # every analysed split is a config split: the base failed or is missing
+        base_missing = all(s.get("split") is not None for s in summary if s["success"])
+        report["bundle"].update(format=index["format"], base_missing=base_missing,
+                                splits=summary)
+        report["heuristics"] = _heuristics(report["manifest"], report["files"])
+        report["heuristics"].update(
+            split_count=len(splits),
+            split_signers_differ=report["bundle"]["signers_differ"],
+            split_packages_differ=report["bundle"]["packages_differ"],
+        )
+    return {"success": True, "apk": report}
@@ -1,10 +1,28 @@
-from PIL import Image
-import imagehash
+from .icon_pipeline import hash_icon, compare_icons
 
-def compute_icon_similarity(fake_icon_path, original_icon_path):
-    fake_hash = imagehash.average_hash(Image.open(fake_icon_path))
-    orig_hash = imagehash.average_hash(Image.open(original_icon_path))
 
-    diff = fake_hash - orig_hash
-    score = 1 - (diff / 64)  # normalize
-    return round(score, 2)
+def _icon_hashes(icon):
+    # encoded bytes or a file path; hashes are cached by content digest
+    if not isinstance(icon, (bytes, bytearray)):
+        with open(icon, "rb") as f:
+            icon = f.read()
+    return hash_icon(bytes(icon))
+
+
+def compute_icon_similarity(fake_icon, original_icon):
+    fake = _icon_hashes(fake_icon)
+    orig = _icon_hashes(original_icon)
+    if fake is None or orig is None:
+        return 0.0
+
+    # aHash distance, normalized (see icon_index.icon_similarity)
+    return compare_icons(fake, orig)["ahash"]
+
+
+def compare_icon_files(fake_icon, original_icon):
+    """pHash / dHash / aHash similarity and colour overlap of two icons (bytes or paths)."""
+    fake = _icon_hashes(fake_icon)
+    orig = _icon_hashes(original_icon)
+    if fake is None or orig is None:
+        return None
+    return compare_icons(fake, orig)
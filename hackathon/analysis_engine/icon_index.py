@@ -0,0 +1,256 @@
+# analysis_engine/icon_index.py
+
+"""
+Nearest-neighbour index over 64-bit perceptual icon hashes.
+
+Multi-index hashing over 16-bit substrings answers "which known icons are
+within r bits of this one" and "the k closest known icons" by probing a
+few hash tables instead of comparing against every entry. Entries are
+persisted in a small SQLite file and the tables are rebuilt on load.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+
+DEFAULT_INDEX_PATH = os.getenv("ICON_INDEX_PATH", "storage/icon_index.sqlite3")
+# pHash bits two icons may differ by and still count as "the same icon"
+DEFAULT_MATCH_RADIUS = int(os.getenv("ICON_MATCH_RADIUS", "12"))
+HASH_BITS = 64
+
+
+def _entry_digest(h: str, label: str) -> int:
+    return int.from_bytes(hashlib.sha256(f"{h}\0{label}".encode()).digest(), "big")
+
+
+def hash_to_int(h) -> int:
+    """imagehash objects, hex strings and ints all become a 64-bit int."""
+    if isinstance(h, int):
+        return h
+    return int(str(h), 16)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def icon_similarity(distance: int) -> float:
+    # same normalisation as icon_compare.compute_icon_similarity
+    return round(1 - distance / HASH_BITS, 2)
+
+
+class MultiIndexHash:
+    """
+    Multi-index hashing: the 64-bit hash is cut into CHUNKS substrings and
+    each substring gets its own exact-lookup table. By the pigeonhole
+    principle, any hash within r bits of the query differs by at most
+    r // CHUNKS bits in at least one substring, so probing every
+    substring value within that many bits finds all candidates; each is
+    then checked against the full distance.
+    """
+
+    CHUNKS = 4
+    CHUNK_BITS = HASH_BITS // CHUNKS
+    # beyond this many flipped bits per chunk, probing costs more than a scan
+    MAX_PROBE_BITS = 4
+
+    def __init__(self):
+        self._tables = [dict() for _ in range(self.CHUNKS)]
+        self._hashes: Dict[Any, int] = {}
+        self._masks = {}
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _chunks(self, h: int):
+        mask = (1 << self.CHUNK_BITS) - 1
+        return [(h >> (i * self.CHUNK_BITS)) & mask for i in range(self.CHUNKS)]
+
+    def _flip_masks(self, bits: int) -> List[int]:
+        # every CHUNK_BITS-wide mask with at most `bits` bits set
+        if bits not in self._masks:
+            masks = [0]
+            for _ in range(bits):
+                masks = list({m | (1 << b) for m in masks for b in range(self.CHUNK_BITS)} | set(masks))
+            self._masks[bits] = masks
+        return self._masks[bits]
+
+    def add(self, h: int, item_id: Any) -> None:
+        self._hashes[item_id] = h
+        for table, c in zip(self._tables, self._chunks(h)):
+            table.setdefault(c, set()).add(item_id)
+
+    def remove(self, item_id: Any) -> bool:
+        h = self._hashes.pop(item_id, None)
+        if h is None:
+            return False
+        for table, c in zip(self._tables, self._chunks(h)):
+            bucket = table.get(c)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del table[c]
+        return True
+
+    def within(self, h: int, radius: int) -> List[Tuple[int, Any]]:
+        probe_bits = radius // self.CHUNKS
+        if probe_bits > self.MAX_PROBE_BITS:
+            candidates = self._hashes.keys()
+        else:
+            candidates = set()
+            masks = self._flip_masks(probe_bits)
+            for table, c in zip(self._tables, self._chunks(h)):
+                for m in masks:
+                    bucket = table.get(c ^ m)
+                    if bucket:
+                        candidates |= bucket
+
+        out = []
+        for item_id in candidates:
+            d = hamming(h, self._hashes[item_id])
+            if d <= radius:
+                out.append((d, item_id))
+        out.sort(key=lambda t: t[0])
+        return out
+
+    def nearest(self, h: int, k: int, max_distance: int = HASH_BITS) -> List[Tuple[int, Any]]:
+        """
+        k closest items: widen the radius one probe level at a time until
+        k items are found (results within the radius are complete).
+        """
+        if k <= 0 or not self._hashes:
+            return []
+
+        radius = self.CHUNKS - 1
+        while True:
+            radius = min(radius, max_distance)
+            found = self.within(h, radius)
+            if len(found) >= k or radius >= max_distance:
+                return found[:k]
+            radius += self.CHUNKS
+
+
+class IconIndex:
+    """
+    Persistent icon-hash index: SQLite holds the entries, in-memory
+    multi-index hash tables answer the queries.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self._tree = MultiIndexHash()
+        self._items: Dict[int, Dict[str, Any]] = {}
+        # order-independent digest of the entries (sum of per-entry hashes)
+        self._digest = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS icons ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " hash TEXT NOT NULL,"
+            " label TEXT NOT NULL,"
+            " meta TEXT)"
+        )
+        self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_icons_hash_label ON icons(hash, label)")
+        self._conn.commit()
+        self._load()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _load(self) -> None:
+        for item_id, h, label, meta in self._conn.execute("SELECT id, hash, label, meta FROM icons"):
+            hv = hash_to_int(h)
+            self._items[item_id] = {"hash": h, "label": label, "meta": json.loads(meta) if meta else {}}
+            self._tree.add(hv, item_id)
+            self._digest += _entry_digest(h, label)
+
+    # ---------------------------
+    # Population
+    # ---------------------------
+    def add(self, icon_hash, label: str, meta: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """
+        Register a known-good icon. Returns its id, or None if the same
+        (hash, label) pair is already indexed.
+        """
+        return self.add_many([(icon_hash, label, meta)])[0]
+
+    def add_many(self, entries) -> List[Optional[int]]:
+        ids = []
+        with self._lock:
+            for icon_hash, label, meta in entries:
+                hv = hash_to_int(icon_hash)
+                h = f"{hv:016x}"
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO icons (hash, label, meta) VALUES (?, ?, ?)",
+                    (h, label, json.dumps(meta or {})),
+                )
+                if cur.rowcount == 0:
+                    ids.append(None)
+                    continue
+                item_id = cur.lastrowid
+                self._items[item_id] = {"hash": h, "label": label, "meta": meta or {}}
+                self._tree.add(hv, item_id)
+                self._digest += _entry_digest(h, label)
+                ids.append(item_id)
+            self._conn.commit()
+        return ids
+
+    def remove(self, item_id: int) -> bool:
+        with self._lock:
+            item = self._items.pop(item_id, None)
+            if item is None:
+                return False
+            self._digest -= _entry_digest(item["hash"], item["label"])
+            self._tree.remove(item_id)
+            self._conn.execute("DELETE FROM icons WHERE id=?", (item_id,))
+            self._conn.commit()
+        return True
+
+    def fingerprint(self) -> str:
+        """
+        Digest of the indexed (hash, label) pairs, equal for equal contents
+        across restarts, so stored icon scores can tell whether they are
+        still current. Kept up to date on add / remove.
+        """
+        with self._lock:
+            return f"{self._digest % (1 << 256):064x}"
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def _describe(self, matches: List[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+        out = []
+        for d, item_id in matches:
+            item = self._items[item_id]
+            out.append({"id": item_id, "label": item["label"], "hash": item["hash"],
+                        "distance": d, "similarity": icon_similarity(d), "meta": item["meta"]})
+        return out
+
+    def within(self, icon_hash, radius: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._describe(self._tree.within(hash_to_int(icon_hash), radius))
+
+    def nearest(self, icon_hash, k: int = 5, max_distance: int = HASH_BITS) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._describe(self._tree.nearest(hash_to_int(icon_hash), k, max_distance))
+
+
+_default_index: Optional[IconIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_default_icon_index() -> IconIndex:
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = IconIndex()
+        return _default_index
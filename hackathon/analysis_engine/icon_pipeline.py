@@ -0,0 +1,345 @@
+# analysis_engine/icon_pipeline.py
+
+"""
+Launcher icon extraction and hashing, in memory.
+
+Selection (select_launcher_icon)
+  The icon the launcher would show at the highest density:
+  - the raster icon Androguard resolves for the application / main
+    activity, preferring the densest bucket (xxxhdpi > ... > mdpi);
+  - an adaptive icon (mipmap-anydpi-v26/*.xml) is composited from its
+    background (raster or colour) and foreground layers and cropped to
+    the visible 72dp of the 108dp canvas;
+  - whichever of the two has more pixels wins (the raster on a tie);
+  - without a resource table, res/{mipmap,drawable}-*/ic_launcher.* by
+    density.
+
+Hashing (hash_icon)
+  The image is decoded once; pHash, dHash and aHash (64-bit, imagehash)
+  and a 64-bin RGB colour histogram are computed from that one decode.
+  pHash is computed exactly as before (RGB -> L), so it stays comparable
+  with the icon index. Results are cached in an in-process LRU keyed by
+  the SHA-256 of the icon bytes: repackaged apps usually ship the very
+  same icon file. Nothing is written to disk.
+"""
+
+import io
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Callable, Tuple, TYPE_CHECKING
+
+from .icon_index import hamming, hash_to_int, icon_similarity
+
+if TYPE_CHECKING:
+    from androguard.core.bytecodes.apk import APK
+    from PIL.Image import Image
+
+
+ICON_CACHE_MAX_ENTRIES = int(os.getenv("ICON_CACHE_MAX_ENTRIES", "4096"))
+# levels per channel of the colour histogram (HIST_LEVELS ** 3 bins)
+HIST_LEVELS = 4
+# histogram bins are integers summing to about HIST_SCALE
+HIST_SCALE = 1000
+_HIST_SIDE = 32
+
+RASTER_EXTENSIONS = (".png", ".webp", ".jpg", ".jpeg")
+ANDROID_NS = "{http://schemas.android.com/apk/res/android}"
+DENSITIES = {"ldpi": 120, "mdpi": 160, "tvdpi": 213, "hdpi": 240, "xhdpi": 320,
+             "xxhdpi": 480, "xxxhdpi": 640, "nodpi": 1}
+# largest density Androguard may pick that is still a bitmap bucket
+# (anydpi / nodpi hold the adaptive / vector variants)
+_MAX_RASTER_DPI = 65533
+_LAUNCHER_FILE = re.compile(r"^res/(?:mipmap|drawable)(?:-[^/]+)?/ic_launcher\.(?:png|webp|jpe?g)$")
+
+
+def _density(path: str) -> int:
+    directory = path.rsplit("/", 2)[-2] if path.count("/") >= 2 else ""
+    for qualifier in directory.split("-")[1:]:
+        if qualifier in DENSITIES:
+            return DENSITIES[qualifier]
+        if qualifier.endswith("dpi") and qualifier[:-3].isdigit():
+            return int(qualifier[:-3])
+    return 0
+
+
+def _is_raster(path: Optional[str]) -> bool:
+    return bool(path) and path.lower().endswith(RASTER_EXTENSIONS)
+
+
+# ---------------------------
+# Hashing
+# ---------------------------
+
+class _LRU:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._items), "hits": self.hits, "misses": self.misses}
+
+
+_cache = _LRU(ICON_CACHE_MAX_ENTRIES)
+
+
+def _color_histogram(rgb: "Image") -> List[int]:
+    import numpy as np
+    from PIL import Image
+
+    small = np.asarray(rgb.resize((_HIST_SIDE, _HIST_SIDE), Image.BILINEAR), dtype=np.uint8)
+    q = small // (256 // HIST_LEVELS)
+    idx = (q[..., 0].astype(np.int32) * HIST_LEVELS + q[..., 1]) * HIST_LEVELS + q[..., 2]
+    counts = np.bincount(idx.ravel(), minlength=HIST_LEVELS ** 3)
+    return [int(round(c)) for c in counts * HIST_SCALE / idx.size]
+
+
+def _hash_image(img: "Image") -> Dict[str, Any]:
+    from imagehash import phash, dhash, average_hash
+
+    rgb = img.convert("RGB")
+    gray = rgb.convert("L")
+    return {
+        "width": img.width,
+        "height": img.height,
+        "phash": str(phash(gray)),
+        "dhash": str(dhash(gray)),
+        "ahash": str(average_hash(gray)),
+        "color_hist": _color_histogram(rgb),
+    }
+
+
+def _cached(key: str, load: Callable[[], "Image"], use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    if use_cache:
+        hit = _cache.get(key)
+        if hit is not None:
+            return dict(hit)
+    try:
+        result = _hash_image(load())
+    except Exception:
+        return None
+    result["sha256"] = key
+    if use_cache:
+        _cache.put(key, result)
+    return dict(result)
+
+
+def _decode(data: bytes) -> "Image":
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+
+def hash_icon(data: bytes, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    {"width", "height", "phash", "dhash", "ahash", "color_hist", "sha256"}
+    for encoded image bytes, or None if they cannot be decoded.
+    """
+    if not data:
+        return None
+    return _cached(hashlib.sha256(data).hexdigest(), lambda: _decode(data), use_cache)
+
+
+def compare_icons(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, float]:
+    """Per-hash similarity (0..1, see icon_index.icon_similarity) and colour-histogram overlap."""
+    out = {k: icon_similarity(hamming(hash_to_int(a[k]), hash_to_int(b[k])))
+           for k in ("phash", "dhash", "ahash") if a.get(k) and b.get(k)}
+    if a.get("color_hist") and b.get("color_hist"):
+        overlap = sum(min(x, y) for x, y in zip(a["color_hist"], b["color_hist"]))
+        out["color"] = round(min(1.0, overlap / HIST_SCALE), 2)
+    return out
+
+
+def cache_stats() -> Dict[str, int]:
+    return _cache.stats()
+
+
+# ---------------------------
+# Selection
+# ---------------------------
+
+def _read(a: "APK", path: str) -> Optional[bytes]:
+    try:
+        return a.get_file(path)
+    except Exception:
+        return None
+
+
+def _resolve_drawable(a: "APK", ref: Optional[str]) -> Optional[Tuple[str, Any]]:
+    """
+    An adaptive-icon layer reference -> ("file", path) of its densest
+    raster, ("color", "#aarrggbb"), or None (vector, inline, unresolved).
+    """
+    if not ref or not ref.startswith("@"):
+        return None
+    try:
+        res_id = int(ref[1:].split(":")[-1], 16)   # "@7F080001", "@android:01080000"
+        configs = a.get_android_resources().get_resolved_res_configs(res_id)
+    except Exception:
+        return None
+    best, best_dpi = None, -1
+    for config, value in configs:
+        if isinstance(value, str) and value.startswith("#"):
+            return "color", value
+        if not _is_raster(value):
+            continue
+        try:
+            dpi = config.get_density()
+        except Exception:
+            dpi = _density(value)
+        if dpi > best_dpi:
+            best, best_dpi = value, dpi
+    return ("file", best) if best else None
+
+
+def _parse_color(value: str) -> Tuple[int, int, int, int]:
+    digits = value.lstrip("#")
+    if len(digits) in (3, 4):
+        digits = "".join(c * 2 for c in digits)
+    if len(digits) == 6:
+        digits = "ff" + digits
+    argb = int(digits, 16)
+    return (argb >> 16) & 0xFF, (argb >> 8) & 0xFF, argb & 0xFF, (argb >> 24) & 0xFF
+
+
+def _adaptive_icon(a: "APK", xml_path: str) -> Optional[Dict[str, Any]]:
+    """Layers of an <adaptive-icon>, if the foreground is a raster."""
+    from androguard.core.bytecodes.axml import AXMLPrinter
+
+    data = _read(a, xml_path)
+    if not data:
+        return None
+    try:
+        root = AXMLPrinter(data).get_xml_obj()
+    except Exception:
+        return None
+    if root is None or root.tag != "adaptive-icon":
+        return None
+
+    layers = {}
+    for name in ("background", "foreground"):
+        el = root.find(name)
+        layers[name] = _resolve_drawable(a, el.get(ANDROID_NS + "drawable") if el is not None else None)
+    fg = layers["foreground"]
+    if not fg or fg[0] != "file":
+        return None
+    fg_bytes = _read(a, fg[1])
+    if not fg_bytes:
+        return None
+    bg = layers["background"]
+    bg_value = _read(a, bg[1]) if bg and bg[0] == "file" else (bg[1] if bg else None)
+    return {"path": xml_path, "foreground": fg_bytes, "background": bg_value}
+
+
+def _composite(fg_bytes: bytes, background) -> "Image":
+    from PIL import Image
+
+    fg = _decode(fg_bytes).convert("RGBA")
+    if isinstance(background, bytes):
+        canvas = _decode(background).convert("RGBA").resize(fg.size)
+    elif isinstance(background, str):
+        canvas = Image.new("RGBA", fg.size, _parse_color(background))
+    else:
+        canvas = Image.new("RGBA", fg.size, (255, 255, 255, 255))
+    canvas.alpha_composite(fg)
+    # layers are 108dp; launchers show the central 72dp
+    w, h = canvas.size
+    return canvas.crop((w // 6, h // 6, w - w // 6, h - h // 6))
+
+
+def _pixels(data: bytes) -> int:
+    from PIL import Image
+
+    try:
+        w, h = Image.open(io.BytesIO(data)).size   # header only
+        return w * h
+    except Exception:
+        return 0
+
+
+def _app_icon_path(a: "APK", max_dpi: int = 65536) -> Optional[str]:
+    try:
+        icon = a.get_app_icon(max_dpi=max_dpi)
+    except Exception:
+        return None
+    return icon if isinstance(icon, str) else None
+
+
+def select_launcher_icon(a: "APK") -> Optional[Dict[str, Any]]:
+    """
+    The launcher icon to hash: {"source", "kind": "raster", "data"} or
+    {"source", "kind": "adaptive", "foreground", "background"}.
+    """
+    candidates = []
+
+    preferred = _app_icon_path(a)
+    raster = preferred if _is_raster(preferred) else _app_icon_path(a, _MAX_RASTER_DPI)
+    if not _is_raster(raster):
+        try:
+            files = [f for f in a.get_files() or () if _LAUNCHER_FILE.match(f)]
+        except Exception:
+            files = []
+        raster = max(files, key=_density, default=None)
+    if _is_raster(raster):
+        data = _read(a, raster)
+        if data:
+            candidates.append((_pixels(data), 1, {"source": raster, "kind": "raster", "data": data}))
+
+    if preferred and preferred.endswith(".xml"):
+        adaptive = _adaptive_icon(a, preferred)
+        if adaptive:
+            # only the central two thirds of each side are shown
+            pixels = _pixels(adaptive["foreground"]) * 4 // 9
+            candidates.append((pixels, 0, {"source": adaptive["path"], "kind": "adaptive",
+                                           "foreground": adaptive["foreground"],
+                                           "background": adaptive["background"]}))
+
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: (c[0], c[1]))[2]
+
+
+def extract_icon(a: "APK", use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    select_launcher_icon() + its hashes: {"source", "kind", "width",
+    "height", "phash", "dhash", "ahash", "color_hist", "sha256"}.
+    For adaptive icons sha256 covers both layers.
+    """
+    src = select_launcher_icon(a)
+    if src is None:
+        return None
+    if src["kind"] == "raster":
+        result = hash_icon(src["data"], use_cache)
+    else:
+        digest = hashlib.sha256(src["foreground"])
+        bg = src["background"]
+        digest.update(b"\0" + (bg if isinstance(bg, bytes) else str(bg).encode()))
+        result = _cached(digest.hexdigest(), lambda: _composite(src["foreground"], bg), use_cache)
+    if result is None:
+        return None
+    return {"source": src["source"], "kind": src["kind"], **result}
@@ -0,0 +1,244 @@
+# analysis_engine/ioc_extractor.py
+
+"""
+Indicator-of-compromise extraction for deep scans.
+
+One precompiled alternation matches URLs, e-mails, UPI handles, IPv4
+addresses and bare domains in a single left-to-right pass. The same
+pattern is compiled for str (resource strings) and bytes (dex string
+data, text assets), so binary sources are never decoded or joined into
+one big string: each resource string / dex string is matched on its own
+and assets are streamed in chunks. Results are deduplicated per type,
+in first-seen order, and capped at MAX_PER_TYPE.
+"""
+
+import os
+import re
+import struct
+from urllib.parse import urlsplit
+from typing import Dict, Any, Iterable, Optional
+
+from .dex_stats import _Dex, _uleb128
+
+
+IOC_TYPES = ("urls", "domains", "ips", "emails", "upi")
+MAX_PER_TYPE = int(os.getenv("IOC_MAX_PER_TYPE", "500"))
+
+TEXT_ASSET_PREFIXES = ("assets/", "res/raw/")
+TEXT_ASSET_MAX_BYTES = 8 * 1024 * 1024
+ASSET_CHUNK_BYTES = 1024 * 1024
+# a match never spans more than this across a chunk boundary
+MAX_CARRY = 4096
+_BINARY_SNIFF = 1024
+
+# common + abuse-heavy TLDs; bare domains need one of these so that file
+# names and class names ("config.json", "R.string") are not reported
+TLDS = (
+    "com", "net", "org", "info", "biz", "io", "co", "me", "app", "dev", "xyz", "top", "site",
+    "online", "club", "live", "shop", "store", "tech", "cloud", "link", "click", "pw", "cc",
+    "tk", "ml", "ga", "cf", "gq", "su", "ru", "cn", "in", "uk", "us", "de", "fr", "br", "id",
+    "pk", "bd", "ng", "vn", "ir", "tr", "ua", "kz", "eu", "asia", "gov", "edu", "mobi", "pro",
+    "win", "bid", "vip", "work", "buzz", "icu", "fun", "space", "website", "host", "today",
+)
+# first labels that mark reverse-DNS package / class names ("android.app", "com.foo")
+_REVERSE_DNS_ROOTS = frozenset(TLDS) | {"android", "androidx", "java", "javax", "kotlin",
+                                        "kotlinx", "dalvik", "okhttp3", "retrofit2"}
+
+_LABEL = r"[a-z0-9](?:[a-z0-9\-]{0,61}[a-z0-9])?"
+_OCTET = r"(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+
+IOC_PATTERN = "|".join((
+    r"(?P<url>\b(?:https?|ftp|wss?|upi)://[^\s\"'<>()\[\]{}\\^`|\x00]{3,2048})",
+    r"(?P<email>(?<![\w.%+\-])[a-z0-9._%+\-]{1,64}@(?:" + _LABEL + r"\.)+[a-z]{2,24}\b)",
+    r"(?P<upi>(?<![\w.\-])[a-z0-9._\-]{2,256}@[a-z][a-z0-9]{1,63}\b(?![.@\-]\w))",
+    r"(?P<ip>(?<![\w.])" + _OCTET + r"(?:\." + _OCTET + r"){3}(?![\w.]))",
+    r"(?P<domain>(?<![\w.@\-])(?:" + _LABEL + r"\.)+(?:" + "|".join(TLDS) + r")(?![\w\-]|\.\w))",
+))
+
+_IOC_STR = re.compile(IOC_PATTERN, re.IGNORECASE)
+_IOC_BYTES = re.compile(IOC_PATTERN.encode(), re.IGNORECASE)
+# cheap first pass: runs of non-delimiters holding a "." or "@"; only
+# those spans are handed to the full alternation
+_TOKEN = r"[^\s\"'<>()\[\]{}\\^`|\x00]"
+_CANDIDATE_STR = re.compile(r"(?<!" + _TOKEN + r")" + _TOKEN + r"*?[.@]" + _TOKEN + r"*")
+_CANDIDATE_BYTES = re.compile(_CANDIDATE_STR.pattern.encode())
+_GROUP_TYPE = {"url": "urls", "email": "emails", "upi": "upi", "ip": "ips", "domain": "domains"}
+_IP_RE = re.compile(r"^" + _OCTET + r"(?:\." + _OCTET + r"){3}$")
+_TRAILING = ".,;:!?'\"*"
+# URL schemes whose host is a network name (upi://pay is not)
+_NETWORK_SCHEMES = ("http", "https", "ftp", "ws", "wss")
+# "icon@2x.png" looks like an e-mail address
+_FILE_EXTENSIONS = frozenset(("png", "jpg", "jpeg", "gif", "webp", "svg", "xml", "json",
+                              "js", "css", "html", "txt", "so", "dex", "jar"))
+_DELIMITERS = (b"\n", b"\0", b" ", b'"', b"<", b">")
+
+
+class IocExtractor:
+    """
+    Incremental extractor: feed it strings, dex files and asset streams,
+    then read result(). Not thread-safe; use one per scan.
+    """
+
+    def __init__(self, max_per_type: int = MAX_PER_TYPE):
+        self.max_per_type = max_per_type
+        self.found: Dict[str, Dict[str, None]] = {t: {} for t in IOC_TYPES}
+        self.hits: Dict[str, int] = {t: 0 for t in IOC_TYPES}
+        self.sources: Dict[str, int] = {"resource_strings": 0, "dex_strings": 0, "assets": 0}
+
+    # ---------------------------
+    # Matching
+    # ---------------------------
+    def _add(self, ioc_type: str, value: str) -> None:
+        self.hits[ioc_type] += 1
+        seen = self.found[ioc_type]
+        if value not in seen and len(seen) < self.max_per_type:
+            seen[value] = None
+
+    def _add_url(self, url: str) -> None:
+        url = url.rstrip(_TRAILING)
+        self._add("urls", url)
+        try:
+            parts = urlsplit(url)
+            host = parts.hostname if parts.scheme.lower() in _NETWORK_SCHEMES else None
+        except ValueError:
+            host = None
+        if host and "." in host:
+            self._add("ips" if _IP_RE.match(host) else "domains", host)
+        # upi://pay?pa=someone@bank, mailto-style parameters
+        if "@" in url:
+            rest = url.split("://", 1)[1]
+            for m in _IOC_STR.finditer(rest):
+                if m.lastgroup in ("email", "upi"):
+                    self._dispatch(m.lastgroup, m.group())
+
+    def _dispatch(self, kind: str, value: str) -> None:
+        if kind == "url":
+            self._add_url(value)
+        elif kind == "domain":
+            value = value.lower()
+            if value.split(".", 1)[0] not in _REVERSE_DNS_ROOTS:
+                self._add("domains", value)
+        elif kind == "ip":
+            if not value.startswith("0."):
+                self._add("ips", value)
+        elif kind == "email":
+            value = value.lower()
+            if value.rsplit(".", 1)[1] not in _FILE_EXTENSIONS:
+                self._add("emails", value)
+        else:
+            self._add(_GROUP_TYPE[kind], value.lower())
+
+    def feed_text(self, text: str) -> None:
+        for c in _CANDIDATE_STR.finditer(text):
+            for m in _IOC_STR.finditer(text, c.start(), c.end()):
+                self._dispatch(m.lastgroup, m.group())
+
+    def feed_bytes(self, data) -> None:
+        for c in _CANDIDATE_BYTES.finditer(data):
+            for m in _IOC_BYTES.finditer(data, c.start(), c.end()):
+                self._dispatch(m.lastgroup, m.group().decode("ascii", "replace"))
+
+    # ---------------------------
+    # Sources
+    # ---------------------------
+    def feed_strings(self, strings: Iterable[str]) -> None:
+        """Resource strings (resources.arsc string pool), one at a time."""
+        for s in strings:
+            if s:
+                self.sources["resource_strings"] += 1
+                self.feed_text(s)
+
+    def feed_dex(self, data: bytes) -> None:
+        """Every string in a dex string pool, matched in place."""
+        try:
+            dex = _Dex(data)
+        except (ValueError, struct.error):
+            return
+        buf = dex.buf
+        for off in struct.unpack_from(f"<{dex.string_ids_size}I", buf, dex.string_ids_off):
+            try:
+                _, start = _uleb128(buf, off)
+            except IndexError:
+                continue
+            end = data.find(b"\0", start)
+            if end < 0:
+                end = len(data)
+            if end - start >= 4:
+                self.feed_bytes(buf[start:end])
+        self.sources["dex_strings"] += dex.string_ids_size
+
+    def feed_stream(self, chunks: Iterable[bytes]) -> None:
+        """
+        Chunked bytes (e.g. a zip member being decompressed). Each chunk is
+        cut at the last delimiter; the remainder is carried into the next
+        so no match is split across chunks.
+        """
+        carry = b""
+        for chunk in chunks:
+            buf = carry + chunk
+            cut = max(buf.rfind(d) for d in _DELIMITERS)
+            if cut < 0 or len(buf) - cut > MAX_CARRY:
+                cut = len(buf) - 1
+            self.feed_bytes(buf[:cut + 1])
+            carry = buf[cut + 1:]
+        if carry:
+            self.feed_bytes(carry)
+
+    def feed_zip_assets(self, zf) -> None:
+        """Text files under assets/ and res/raw/, streamed from the zip."""
+        for info in zf.infolist():
+            if info.is_dir() or not info.filename.startswith(TEXT_ASSET_PREFIXES):
+                continue
+            if info.file_size > TEXT_ASSET_MAX_BYTES:
+                continue
+            try:
+                with zf.open(info) as f:
+                    head = f.read(_BINARY_SNIFF)
+                    if b"\0" in head:
+                        continue
+                    self.sources["assets"] += 1
+                    self.feed_stream(_chunks(f, head))
+            except Exception:
+                continue
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """Fold in another extractor's result() (e.g. one split of a bundle)."""
+        for t in IOC_TYPES:
+            seen = self.found[t]
+            for value in other.get(t) or ():
+                if len(seen) >= self.max_per_type:
+                    break
+                seen.setdefault(value, None)
+            self.hits[t] += (other.get("hits") or {}).get(t, 0)
+        for source, n in (other.get("sources") or {}).items():
+            self.sources[source] = self.sources.get(source, 0) + n
+
+    def result(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {t: list(self.found[t]) for t in IOC_TYPES}
+        out["counts"] = {t: len(self.found[t]) for t in IOC_TYPES}
+        out["hits"] = dict(self.hits)
+        out["truncated"] = [t for t in IOC_TYPES if len(self.found[t]) >= self.max_per_type]
+        out["sources"] = dict(self.sources)
+        return out
+
+
+def _chunks(f, head: bytes):
+    yield head
+    while True:
+        chunk = f.read(ASSET_CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+def extract_iocs(strings: Optional[Iterable[str]] = None,
+                 dex_files: Iterable[bytes] = (),
+                 zf=None) -> Dict[str, Any]:
+    ex = IocExtractor()
+    if strings is not None:
+        ex.feed_strings(strings)
+    for data in dex_files:
+        ex.feed_dex(data)
+    if zf is not None:
+        ex.feed_zip_assets(zf)
+    return ex.result()
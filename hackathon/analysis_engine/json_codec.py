@@ -0,0 +1,59 @@
+# analysis_engine/json_codec.py
+"""
+Compact JSON encoding shared by the API responses and the on-disk stores
+(result cache, job results, evidence kits, Play metadata cache).
+
+orjson is used when installed (several times faster than json.dumps on
+large reports and encodes straight to bytes); otherwise the stdlib with
+compact separators. Both produce the same documents: sets become lists,
+bytes are decoded, objects with to_dict() are expanded, and anything
+else falls back to str(), like json.dumps(default=str) did.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+_ORJSON_OPTIONS = 0
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(o: Any) -> Any:
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if isinstance(o, (bytes, bytearray)):
+        return bytes(o).decode("utf-8", "replace")
+    if hasattr(o, "to_dict"):
+        return o.to_dict()
+    return str(o)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass   # e.g. ints beyond 64 bits: let the stdlib handle it
+    return json.dumps(obj, default=_default, separators=(",", ":"),
+                      ensure_ascii=False).encode("utf-8")
+
+
+def dumps_text(obj: Any) -> str:
+    """dumps() as str, for TEXT columns."""
+    return dumps(obj).decode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def backend() -> str:
+    return "orjson" if orjson is not None else "json"
@@ -0,0 +1,263 @@
+# analysis_engine/metrics.py
+
+"""
+Stage timing and Prometheus-style metrics, without external dependencies.
+
+- StageTimer: per-run span recorder. The engine times each stage of an
+  analysis with it and returns the breakdown with the result, so timings
+  survive the trip back from a process-pool worker.
+- Counter / Histogram: process-wide, thread-safe, labelled metrics held
+  in REGISTRY and rendered in the Prometheus text format by
+  render_prometheus() (served on /metrics by the backend).
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Tuple, Optional, Iterable
+
+
+# seconds; covers a cached lookup (~ms) up to a full xref run (minutes)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class StageTimer:
+    """
+    Records how long each named stage of one run took:
+
+        timer = StageTimer()
+        with timer.stage("manifest"):
+            ...
+        timer.result() -> {"stages": {"manifest": 0.012}, "total_seconds": 0.013}
+    """
+
+    __slots__ = ("stages", "_started")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+        }
+
+
+@contextmanager
+def time_into(timings: Optional[Dict[str, Any]], name: str):
+    """
+    Add a stage to an existing breakdown (a StageTimer.result() dict),
+    e.g. for post-processing done after the result came back from a worker.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            stages = timings.setdefault("stages", {})
+            stages[name] = round(stages.get(name, 0.0) + time.perf_counter() - start, 6)
+
+
+def _label_key(labelnames: Tuple[str, ...], labels: Dict[str, Any]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(n, "")) for n in labelnames)
+
+
+def format_value(value: float) -> str:
+    # %g would round large counters ("1.23457e+06")
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = []
+    for n, v in zip(labelnames, values):
+        v = v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{n}="{v}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {format_value(value)}"
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {",".join(k): v for k, v in self._values.items()}
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            else:
+                row[len(self.buckets)] += 1
+            row[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, row in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                le = 'le="%g"' % bound
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            cumulative += row[len(self.buckets)]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {row[-1]:.6f}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {",".join(k): {"count": sum(v[:-1]), "sum": round(v[-1], 6)}
+                    for k, v in self._values.items()}
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, doc, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, doc, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name!r} already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, doc: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, doc, tuple(labelnames))
+
+    def histogram(self, name: str, doc: str, labelnames: Iterable[str] = (),
+                  buckets: Optional[Tuple[float, ...]] = None) -> Histogram:
+        return self._get_or_create(Histogram, name, doc, tuple(labelnames),
+                                   buckets=buckets or DEFAULT_BUCKETS)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.doc}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: m.snapshot() for m in metrics}
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "analysis_stage_seconds", "Time spent in each analysis stage", ("pipeline", "stage"))
+ANALYSIS_TOTAL = REGISTRY.counter(
+    "analysis_total", "Analyses finished, by pipeline and outcome", ("pipeline", "outcome"))
+PLAYSTORE_FETCH_SECONDS = REGISTRY.histogram(
+    "playstore_fetch_seconds", "Play Store metadata requests that went to the network", ("outcome",))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds", "API request latency", ("method", "route", "status"))
+
+
+def observe_timings(pipeline: str, timings: Optional[Dict[str, Any]]) -> None:
+    """Feed a StageTimer.result() breakdown into the stage histograms."""
+    if not timings:
+        return
+    for stage, seconds in timings.get("stages", {}).items():
+        STAGE_SECONDS.observe(seconds, pipeline=pipeline, stage=stage)
+    if "total_seconds" in timings:
+        STAGE_SECONDS.observe(timings["total_seconds"], pipeline=pipeline, stage="total")
+
+
+def record_analysis(pipeline: str, result: Dict[str, Any],
+                    wall_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Count a finished analysis and observe its stage breakdown; pops and
+    returns result["timings"], whose total becomes the sum of all its
+    stages. wall_seconds (measured by the caller
+    around a process-pool round trip) adds a "queue" stage: the time not
+    spent inside the engine.
+    """
+    timings = result.pop("timings", None)
+    if timings is not None:
+        stages = timings.setdefault("stages", {})
+        if wall_seconds is not None:
+            inside = timings.get("total_seconds", 0.0)
+            stages["queue"] = round(max(0.0, wall_seconds - inside), 6)
+        # stages added after the run (time_into) count towards the total
+        timings["total_seconds"] = round(sum(stages.values()), 6)
+
+    if not result.get("success", True):
+        outcome = "error"
+    elif result.get("cache_hit"):
+        outcome = "cache_hit"
+    else:
+        outcome = "ok"
+    ANALYSIS_TOTAL.inc(pipeline=pipeline, outcome=outcome)
+    observe_timings(pipeline, timings)
+    return timings
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
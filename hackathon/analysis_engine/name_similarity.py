@@ -8,21 +8,39 @@ def normalize_text(s: str):
 def similarity_ratio(a: str, b: str):
     return SequenceMatcher(None, a, b).ratio() if a and b else 0.0
 
-def check_package_label_similarity(play_data):
+# seed brands used until a corpus is loaded from the DB (set_brand_index)
+KNOWN = ["phonepe","paytm","gpay","upi","sbi","icici","hdfc","paypal"]
+# seed ids live in their own namespace so DB ids (1, 2, ...) never collide with them
+SEED_ID_PREFIX = "seed:"
+
+_brand_index = None
+
+def get_brand_index():
+    global _brand_index
+    if _brand_index is None:
+        from .brand_index import BrandIndex
+        _brand_index = BrandIndex([{"name": b, "brand_id": SEED_ID_PREFIX + b} for b in KNOWN])
+    return _brand_index
+
+def has_seed_brands(index):
+    return any(SEED_ID_PREFIX + b in index for b in KNOWN)
+
+def set_brand_index(index):
+    global _brand_index
+    _brand_index = index
+
+def check_package_label_similarity(play_data, brand_index=None):
     pkg = play_data.get("appId") or play_data.get("appId") or ""
     title = play_data.get("title") or ""
     pkg_n = normalize_text(pkg)
     title_n = normalize_text(title)
     sim = similarity_ratio(pkg_n, title_n)
-    # simplistic brand match using small brand list (extend in DB)
-    KNOWN = ["phonepe","paytm","gpay","upi","sbi","icici","hdfc","paypal"]
-    best_brand = None
-    best_score = 0.0
-    for b in KNOWN:
-        s = similarity_ratio(title_n, normalize_text(b))
-        if s > best_score:
-            best_score, best_brand = s, b
-    return {"available": True, "score": (sim*0.6 + best_score*0.4), "details": {"package": pkg, "title": title, "pkg_title_similarity": round(sim,3), "best_brand": best_brand, "best_brand_score": round(best_score,3)}}
+    # nearest brands via the trigram index (homoglyph-folded)
+    index = brand_index or get_brand_index()
+    matches = index.query(title, k=3)
+    best_brand = matches[0]["name"] if matches else None
+    best_score = matches[0]["score"] if matches else 0.0
+    return {"available": True, "score": (sim*0.6 + best_score*0.4), "details": {"package": pkg, "title": title, "pkg_title_similarity": round(sim,3), "best_brand": best_brand, "best_brand_score": round(best_score,3), "brand_candidates": [{"brand": m["name"], "score": round(m["score"],3)} for m in matches]}}
 
 def check_reviews_histogram(play):
     hist = play.get("histogram")
@@ -0,0 +1,102 @@
+# analysis_engine/reports/apk_report.py
+"""
+Views of the APK report built by engine.analyze_apk_full().
+
+The engine, the scoring connector and the result cache all work on the
+plain dict; a view is only applied where a report is returned by the API
+or stored as a job result:
+
+- "full": the report exactly as the engine produced it;
+- "summary": the same top-level keys, with the file list, component
+  names, intent filters, IOC lists and xref callers reduced to counts
+  and a short sample. Typically 10-100x smaller for large apps.
+"""
+
+from typing import Any, Dict
+
+VIEWS = ("summary", "full")
+# items of each long list kept by the summary view
+SAMPLE_SIZE = 20
+
+COMPONENT_KEYS = ("activities", "services", "receivers", "providers")
+
+# report keys in the engine's order; the summary view keeps this order
+REPORT_KEYS = ("analysis_level", "identity", "certificates", "manifest", "icon_hash",
+               "urls_found", "iocs", "files", "dex", "heuristics", "analysis_generated_at",
+               "xref", "fingerprint")
+
+
+def _summarize_manifest(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "permissions": list(manifest.get("permissions") or ()),
+        "components": {key: len(manifest.get(key) or ()) for key in COMPONENT_KEYS},
+        "intent_filters": len(manifest.get("intent_filters") or {}),
+    }
+
+
+def _summarize_files(files: Dict[str, Any]) -> Dict[str, Any]:
+    assets = list(files.get("assets") or ())
+    return {
+        "count": len(files.get("all") or ()),
+        "native_libs": list(files.get("native_libs") or ()),
+        "asset_count": len(assets),
+        "assets": assets[:SAMPLE_SIZE],
+    }
+
+
+def _summarize_iocs(iocs: Dict[str, Any]) -> Dict[str, Any]:
+    out = {}
+    for key, value in iocs.items():
+        if key == "sources":
+            continue
+        out[key] = value[:SAMPLE_SIZE] if isinstance(value, list) and key != "truncated" else value
+    return out
+
+
+def _summarize_xref(xref: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(xref)
+    calls = xref.get("sensitive_api_calls")
+    if isinstance(calls, dict):
+        out["sensitive_api_calls"] = {api: len(callers) for api, callers in calls.items()}
+    return out
+
+
+def summarize_apk_report(apk: Dict[str, Any]) -> Dict[str, Any]:
+    """The summary view of an analyze_apk_full() "apk" report."""
+    out: Dict[str, Any] = {}
+    for key in REPORT_KEYS:
+        value = apk.get(key)
+        if value is None and key in ("xref", "fingerprint"):
+            continue   # only present when that stage ran
+        if key == "urls_found":
+            value = list(value or ())[:SAMPLE_SIZE]
+        elif isinstance(value, dict):
+            if key == "manifest":
+                value = _summarize_manifest(value)
+            elif key == "files":
+                value = _summarize_files(value)
+            elif key == "iocs":
+                value = _summarize_iocs(value)
+            elif key == "xref":
+                value = _summarize_xref(value)
+            elif key == "fingerprint":
+                value = {k: v for k, v in value.items() if k != "minhash"}
+        out[key] = value
+    out.update((k, v) for k, v in apk.items() if k not in REPORT_KEYS)
+    return out
+
+
+def project_apk_result(apk_result: Dict[str, Any], view: str = "full") -> Dict[str, Any]:
+    """
+    analyze_apk_full()'s result with its "apk" report rendered in `view`.
+    The full view returns the result untouched.
+    """
+    if view not in VIEWS:
+        raise ValueError(f"Unknown report view: {view}")
+    apk = apk_result.get("apk")
+    if view == "full" or not isinstance(apk, dict):
+        return apk_result
+    out = dict(apk_result)
+    out["apk"] = summarize_apk_report(apk)
+    out["view"] = view
+    return out
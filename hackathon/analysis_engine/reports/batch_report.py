@@ -0,0 +1,137 @@
+# analysis_engine/reports/batch_report.py
+"""
+Columnar batch scoring for the store-only report.
+
+build_store_reports_batch() takes a whole catalogue as columns (dict of
+lists / NumPy arrays, a pyarrow Table, or a list of play_data dicts) and
+computes every signal plus the aggregate risk_score in one vectorised
+pass. Results match build_store_report() exactly, row for row:
+
+- the same float64 operations are applied in the same order;
+- log1p goes through math.log1p on the distinct values (NumPy's SIMD
+  log1p can differ from libm in the last bit);
+- the string signal (package / title / brand similarity) still runs the
+  per-app function, once per distinct (appId, title) pair.
+"""
+
+import re
+import math
+from typing import Dict, Any, List, Union
+
+import numpy as np
+
+from ..name_similarity import check_package_label_similarity
+from ..score_weights import compile_weights
+
+
+_INSTALLS_RE = re.compile(r"([\d,]+)")
+
+COLUMNS = ("appId", "title", "installs", "ratings", "histogram", "developer")
+
+
+def columns_from_records(records: List[Dict[str, Any]]) -> Dict[str, list]:
+    return {c: [r.get(c) for r in records] for c in COLUMNS}
+
+
+def _as_columns(table) -> Dict[str, list]:
+    if isinstance(table, list):
+        return columns_from_records(table)
+    if hasattr(table, "to_pydict"):  # pyarrow.Table / RecordBatch
+        table = table.to_pydict()
+    n = len(next(iter(table.values())))
+    return {c: list(table[c]) if c in table else [None] * n for c in COLUMNS}
+
+
+def _exact_log1p(values: np.ndarray) -> np.ndarray:
+    uniq, inverse = np.unique(values, return_inverse=True)
+    logs = np.array([math.log1p(u) for u in uniq.tolist()], dtype=np.float64)
+    return logs[inverse]
+
+
+# ---------------------------
+# Signals (vectorised)
+# ---------------------------
+
+def _package_label_signal(app_ids: list, titles: list) -> np.ndarray:
+    memo = {}
+    out = np.empty(len(app_ids), dtype=np.float64)
+    for i, key in enumerate(zip(app_ids, titles)):
+        if key not in memo:
+            res = check_package_label_similarity({"appId": key[0], "title": key[1]})
+            memo[key] = res.get("score", 0.5) if res.get("available") else 0.5
+        out[i] = memo[key]
+    return out
+
+
+def _reviews_signal(histograms: list) -> np.ndarray:
+    n = len(histograms)
+    available = np.array([bool(h) for h in histograms])
+    hist = np.zeros((n, 5), dtype=np.int64)
+    if available.any():
+        hist[available] = np.array([h for h in histograms if h], dtype=np.int64)
+
+    total = hist.sum(axis=1)
+    total[total == 0] = 1
+    five_pct = hist[:, 4] / total
+    score = np.maximum(0.0, np.minimum(1.0, 1.0 - np.abs(five_pct - 0.2)))
+    return np.where(available, score, 0.5)
+
+
+def _installs_signal(installs_raw: list, ratings_raw: list) -> np.ndarray:
+    n = len(installs_raw)
+    available = np.zeros(n, dtype=bool)
+    installs = np.zeros(n, dtype=np.int64)
+    for i, raw in enumerate(installs_raw):
+        m = _INSTALLS_RE.search(raw or "")
+        if m:
+            available[i] = True
+            installs[i] = int(m.group(1).replace(",", ""))
+    ratings = np.array([r or 0 for r in ratings_raw], dtype=np.int64)
+
+    score = np.maximum(0.0, np.minimum(1.0, 1.0 - (
+        _exact_log1p((ratings + 1).astype(np.float64)) /
+        (_exact_log1p((installs + 1).astype(np.float64)) + 1e-6)) * 0.5))
+    suspicious = (installs < 1000) & (ratings > 10000)
+    score = np.where(suspicious, 0.0, score)
+    return np.where(available, score, 0.5)
+
+
+def _developer_signal(developers: list) -> np.ndarray:
+    return np.array([1.0 if d else 0.5 for d in developers], dtype=np.float64)
+
+
+# ---------------------------
+# Batch report
+# ---------------------------
+
+def build_store_reports_batch(table: Union[Dict[str, Any], List[Dict[str, Any]]],
+                              weights) -> Dict[str, Any]:
+    """
+    Score a whole catalogue at once with a WeightProfile (or weights dict).
+    Returns columns:
+    {"appId": [...], "signals": {name: float64[N]}, "aggregate": float64[N],
+     "risk_score": int64[N], "weights_profile": name}
+    """
+    profile = compile_weights(weights)
+    cols = _as_columns(table)
+
+    signals = {
+        "package_label": _package_label_signal(cols["appId"], cols["title"]),
+        "reviews": _reviews_signal(cols["histogram"]),
+        "installs_vs_reviews": _installs_signal(cols["installs"], cols["ratings"]),
+        "developer": _developer_signal(cols["developer"]),
+    }
+
+    # same compiled profile (and evaluation order) as build_store_report
+    aggregate = profile.aggregate(signals)
+
+    # np.rint rounds half to even, like round()
+    risk_score = np.rint(aggregate * 100).astype(np.int64)
+
+    return {
+        "appId": cols["appId"],
+        "signals": signals,
+        "aggregate": aggregate,
+        "risk_score": risk_score,
+        "weights_profile": profile.name,
+    }
@@ -1,15 +1,19 @@
 # analysis_engine/reports/json_report.py
-from .name_similarity import check_package_label_similarity
-from .name_similarity import normalize_text
-from .name_similarity import check_brand_match
-from .certificate_check import ( )  # placeholder: certificate check needs APK
+from ..name_similarity import check_package_label_similarity
+from ..name_similarity import normalize_text
+from ..score_weights import compile_weights
+from ..apk_signals import (check_icon_similarity, check_cert_key_mismatch,
+                           check_manifest_permissions, check_urls)
 from datetime import datetime
 
-def build_store_report(play_data, weights):
+def build_store_report(play_data, weights, apk=None):
+    # weights: a compiled WeightProfile, or a raw weights dict (compiled here)
+    # apk: a deep scan's raw features (rescore.extract_apk_features) -> APK signals too
+    profile = compile_weights(weights)
     # run available store-only checks
     pkg_label = check_package_label_similarity(play_data)
     # review/checks - placeholder functions included below or imported
-    from .name_similarity import check_reviews_histogram, check_installs_vs_reviews, developer_presence
+    from ..name_similarity import check_reviews_histogram, check_installs_vs_reviews, developer_presence
     reviews = check_reviews_histogram(play_data)
     installs = check_installs_vs_reviews(play_data)
     dev = developer_presence(play_data)
@@ -21,28 +25,30 @@ def build_store_report(play_data, weights):
         "installs_vs_reviews": installs.get("score", 0.5) if installs.get("available") else 0.5,
         "developer": dev.get("score", 0.5) if dev.get("available") else 0.5,
     }
+    results = {
+        "package_label": pkg_label,
+        "reviews": reviews,
+        "installs_vs_reviews": installs,
+        "developer": dev
+    }
+    if apk is not None:
+        for name, check in (("icon_similarity", check_icon_similarity),
+                            ("cert_key_mismatch", check_cert_key_mismatch),
+                            ("manifest_permissions", check_manifest_permissions),
+                            ("urls", check_urls)):
+            result = check(apk)
+            signals[name] = result.get("score", 0.5) if result.get("available") else 0.5
+            results[name] = result
 
-    total_w = sum([weights.get('name_package_similarity',0.2),
-                   weights.get('review_patterns',0.1),
-                   weights.get('publisher_history',0.1)])
-    # map weights to our signals (example mapping)
+    # map weights to our signals (see score_weights.STORE_SIGNAL_WEIGHTS)
     weighted = {}
-    weighted['aggregate'] = (
-        signals['package_label'] * weights.get('name_package_similarity', 0.2) +
-        signals['reviews'] * weights.get('review_patterns', 0.1) +
-        signals['developer'] * weights.get('publisher_history', 0.1) +
-        signals['installs_vs_reviews'] * 0.1
-    ) / (weights.get('name_package_similarity',0.2)+weights.get('review_patterns',0.1)+weights.get('publisher_history',0.1)+0.1)
+    weighted['aggregate'] = profile.aggregate(signals)
 
     risk_score = int(round(weighted['aggregate'] * 100))
     report = {
         "generated_at": datetime.utcnow().isoformat()+"Z",
-        "signals": {
-            "package_label": pkg_label,
-            "reviews": reviews,
-            "installs_vs_reviews": installs,
-            "developer": dev
-        },
-        "risk_score": risk_score
+        "signals": results,
+        "risk_score": risk_score,
+        "weights_profile": profile.name
     }
     return report
@@ -0,0 +1,173 @@
+# analysis_engine/reports/rescore.py
+"""
+Replayable scoring.
+
+Every signal declares the raw fields it reads and a version that is
+bumped whenever its heuristic changes. A signal's input digest hashes the
+version, those fields and any outside state it depends on (the brand
+corpus for package_label, the known-icon index for icon_similarity, the
+certificate store for cert_key_mismatch).
+Store signals read Play Store fields; APK signals read the deep scan's
+raw features (APK_FIELDS) and only exist for APK scans. Scans keep the
+raw features plus each signal's digest and result; replay_store_report()
+recomputes only the signals whose digest changed, reuses the rest, and
+re-aggregates with the current weight profile. Nothing is fetched or
+re-analysed.
+"""
+
+import json
+import hashlib
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Tuple
+
+from ..name_similarity import (check_package_label_similarity, check_reviews_histogram,
+                               check_installs_vs_reviews, developer_presence, get_brand_index)
+from ..apk_signals import (check_icon_similarity, icon_index_fingerprint,
+                           check_cert_key_mismatch, cert_context_fingerprint,
+                           check_manifest_permissions, check_urls)
+from ..score_weights import compile_weights
+
+
+class StoreSignal:
+    __slots__ = ("name", "fn", "inputs", "version", "context")
+
+    def __init__(self, name: str, fn: Callable, inputs: Tuple[str, ...], version: str,
+                 context: Optional[Callable[[], str]] = None):
+        self.name = name
+        self.fn = fn
+        self.inputs = inputs
+        self.version = version
+        self.context = context
+
+    def digest(self, features: Dict[str, Any]) -> str:
+        payload = {
+            "version": self.version,
+            "inputs": {k: features.get(k) for k in self.inputs},
+            "context": self.context() if self.context else None,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _brand_corpus() -> str:
+    return get_brand_index().fingerprint()
+
+
+# bump a version when the matching check_* function changes
+STORE_SIGNALS = (
+    StoreSignal("package_label", check_package_label_similarity, ("appId", "title"), "1", _brand_corpus),
+    StoreSignal("reviews", check_reviews_histogram, ("histogram",), "1"),
+    StoreSignal("installs_vs_reviews", check_installs_vs_reviews, ("installs", "ratings"), "1"),
+    StoreSignal("developer", developer_presence, ("developer", "developerEmail"), "1"),
+)
+
+# raw Play Store fields kept with a scan: signal inputs plus context for
+# signals that do not exist yet
+STORE_FIELDS = tuple(dict.fromkeys(
+    [f for s in STORE_SIGNALS for f in s.inputs] +
+    ["developerId", "developerWebsite", "score", "reviews", "released", "updated",
+     "version", "genreId", "icon", "contentRating", "free", "url"]
+))
+
+# bump a version when the matching apk_signals.check_* function changes
+APK_SIGNALS = (
+    StoreSignal("icon_similarity", check_icon_similarity, ("icon_hash", "identity"), "1",
+                icon_index_fingerprint),
+    StoreSignal("cert_key_mismatch", check_cert_key_mismatch, ("certificates", "identity", "icon_hash"), "1",
+                cert_context_fingerprint),
+    StoreSignal("manifest_permissions", check_manifest_permissions, ("manifest",), "1"),
+    StoreSignal("urls", check_urls, ("urls_found",), "1"),
+)
+
+# raw deep-scan features kept with an APK scan
+APK_FIELDS = ("identity", "certificates", "manifest", "icon_hash", "urls_found")
+
+
+def extract_store_features(play_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: play_data.get(k) for k in STORE_FIELDS if play_data.get(k) is not None}
+
+
+def apk_store_features(apk_features: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Store features of an APK scan that was not looked up on the Play
+    Store: only the package name, from the APK's own manifest.
+    """
+    pkg = (apk_features.get("identity") or {}).get("package")
+    return {"appId": pkg} if pkg else {}
+
+
+def extract_apk_features(apk: Dict[str, Any]) -> Dict[str, Any]:
+    """The APK_FIELDS of an analyze_apk_full() "apk" section."""
+    return {k: apk.get(k) for k in APK_FIELDS}
+
+
+def _signals(apk_features: Optional[Dict[str, Any]]):
+    # (signal, the features it reads from)
+    for signal in STORE_SIGNALS:
+        yield signal, False
+    if apk_features is not None:
+        for signal in APK_SIGNALS:
+            yield signal, True
+
+
+def signal_value(result: Dict[str, Any]) -> float:
+    # same fallback as build_store_report
+    return result.get("score", 0.5) if result.get("available") else 0.5
+
+
+def compute_signal(signal: StoreSignal, features: Dict[str, Any],
+                   digest: Optional[str] = None) -> Dict[str, Any]:
+    result = signal.fn(features)
+    return {"version": signal.version, "digest": digest or signal.digest(features),
+            "value": signal_value(result), "result": result}
+
+
+def replay_store_report(features: Dict[str, Any],
+                        previous: Optional[Dict[str, Dict[str, Any]]],
+                        weights,
+                        apk_features: Optional[Dict[str, Any]] = None,
+                        ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]], list]:
+    """
+    Rebuild a report from stored raw features: store features, plus the
+    APK features of a deep scan (which adds the APK signals).
+
+    previous: {signal: {"digest", "value", "result", ...}} from the last
+    scoring run (None -> score everything).
+    Returns (report, signal_states, recomputed signal names).
+    """
+    profile = compile_weights(weights)
+    previous = previous or {}
+
+    states, recomputed = {}, []
+    for signal, on_apk in _signals(apk_features):
+        inputs = apk_features if on_apk else features
+        digest = signal.digest(inputs)
+        prior = previous.get(signal.name)
+        if prior and prior.get("digest") == digest:
+            states[signal.name] = prior
+        else:
+            states[signal.name] = compute_signal(signal, inputs, digest)
+            recomputed.append(signal.name)
+
+    aggregate = profile.aggregate({name: st["value"] for name, st in states.items()})
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "signals": {name: st["result"] for name, st in states.items()},
+        "risk_score": int(round(aggregate * 100)),
+        "weights_profile": profile.name,
+    }
+    return report, states, recomputed
+
+
+def signal_states(features: Dict[str, Any], report: Dict[str, Any],
+                  apk_features: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Signal states for a report that build_store_report just produced, so
+    a fresh scan can be stored without scoring it twice.
+    """
+    states = {}
+    for signal, on_apk in _signals(apk_features):
+        result = report["signals"][signal.name]
+        inputs = apk_features if on_apk else features
+        states[signal.name] = {"version": signal.version, "digest": signal.digest(inputs),
+                               "value": signal_value(result), "result": result}
+    return states
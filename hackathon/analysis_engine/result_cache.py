@@ -0,0 +1,217 @@
+# analysis_engine/result_cache.py
+
+"""
+Persistent, content-addressed cache for APK analysis results.
+
+Entries are keyed by the APK's SHA-256 and the analysis variant (level),
+and tagged with the engine version,
+so a repeat upload of the same file skips Androguard entirely and an engine
+upgrade silently invalidates everything written by the old code.
+Eviction is size-based (oldest-accessed first) and age-based (TTL).
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from . import json_codec
+
+
+DEFAULT_CACHE_PATH = os.getenv("APK_CACHE_PATH", "storage/cache/apk_results.sqlite3")
+DEFAULT_MAX_BYTES = int(os.getenv("APK_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+DEFAULT_MAX_AGE = int(os.getenv("APK_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
+_CHUNK = 1024 * 1024
+# PRAGMA user_version of the cache file; older files are rebuilt on open
+# (1: keyed by sha256 + engine_version, 2: + variant)
+SCHEMA_VERSION = 2
+
+
+def sha256_of_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_of_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-backed cache: one row per (sha256, engine_version, variant).
+    Safe to share between threads; each process opens its own connection.
+    Hit/miss counters live in the database too, so they add up across the
+    worker processes that analyse APKs.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age: int = DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed_at)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0)"
+        )
+        self._conn.commit()
+
+    def _migrate(self) -> None:
+        """
+        Create the results table, dropping one written by an older schema.
+        Cached results are disposable (and tagged with an engine version
+        that has moved on since), so there is nothing to carry over.
+        """
+        # IMMEDIATE: worker processes opening the same file migrate it once
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS results")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " sha256 TEXT NOT NULL,"
+                " engine_version TEXT NOT NULL,"
+                " variant TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " PRIMARY KEY (sha256, engine_version, variant))"
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+
+    def _bump_locked(self, name: str) -> None:
+        self._conn.execute("UPDATE counters SET value = value + 1 WHERE name=?", (name,))
+
+    # ---------------------------
+    # Lookups
+    # ---------------------------
+    def get(self, sha256: str, engine_version: str,
+            variant: str = "full") -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, payload FROM results"
+                " WHERE sha256=? AND engine_version=? AND variant=?",
+                (sha256, engine_version, variant),
+            ).fetchone()
+
+            if row is None or (self.max_age and now - row[0] > self.max_age):
+                self._bump_locked("misses")
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE results SET accessed_at=?"
+                " WHERE sha256=? AND engine_version=? AND variant=?",
+                (now, sha256, engine_version, variant),
+            )
+            self._bump_locked("hits")
+            self._conn.commit()
+
+        return json_codec.loads(row[1])
+
+    def put(self, sha256: str, engine_version: str, result: Dict[str, Any],
+            variant: str = "full") -> None:
+        payload = json_codec.dumps_text(result)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (sha256, engine_version, variant, now, now, len(payload), payload),
+            )
+            self._conn.commit()
+            self._evict_locked(engine_version)
+
+    # ---------------------------
+    # Eviction
+    # ---------------------------
+    def _evict_locked(self, engine_version: str) -> None:
+        now = time.time()
+
+        # stale engine versions and expired rows go first
+        self._conn.execute("DELETE FROM results WHERE engine_version != ?", (engine_version,))
+        if self.max_age:
+            self._conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.max_age,))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if self.max_bytes and total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT sha256, engine_version, variant, size FROM results"
+                " ORDER BY accessed_at ASC"
+            ).fetchall()
+            doomed = []
+            for sha, ver, variant, size in rows:
+                if total <= self.max_bytes:
+                    break
+                doomed.append((sha, ver, variant))
+                total -= size
+            self._conn.executemany(
+                "DELETE FROM results WHERE sha256=? AND engine_version=? AND variant=?",
+                doomed
+            )
+
+        self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.execute("UPDATE counters SET value = 0")
+            self._conn.commit()
+
+    # ---------------------------
+    # Stats
+    # ---------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "max_age": self.max_age,
+        }
+
+
+_default_cache: Optional[ResultCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> ResultCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
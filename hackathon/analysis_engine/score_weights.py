@@ -1,5 +1,12 @@
 # analysis_engine/reports/score_weights.py
 # Single source of truth for heuristic weights used by the store-only engine
+import os
+import json
+import math
+import time
+import threading
+from pathlib import Path
+
 WEIGHTS = {
     'icon_similarity': 0.30,
     'name_package_similarity': 0.25,
@@ -7,3 +14,166 @@ WEIGHTS = {
     'publisher_history': 0.10,
     'review_patterns': 0.15
 }
+
+# store-only signal -> (weight key, fallback weight)
+STORE_SIGNAL_WEIGHTS = (
+    ("package_label", "name_package_similarity", 0.2),
+    ("reviews", "review_patterns", 0.1),
+    ("developer", "publisher_history", 0.1),
+    ("installs_vs_reviews", "installs_vs_reviews", 0.1),
+)
+
+# deep-scan signal -> (weight key, fallback weight); only scored when
+# the report has that signal, i.e. for APK scans
+APK_SIGNAL_WEIGHTS = (
+    ("icon_similarity", "icon_similarity", 0.3),
+    ("cert_key_mismatch", "cert_key_mismatch", 0.2),
+    ("manifest_permissions", "manifest_permissions", 0.1),
+    ("urls", "suspicious_urls", 0.1),
+)
+
+KNOWN_WEIGHT_KEYS = set(WEIGHTS) | {key for _, key, _ in STORE_SIGNAL_WEIGHTS + APK_SIGNAL_WEIGHTS}
+
+PROFILES_PATH = os.getenv("WEIGHT_PROFILES_PATH",
+                          str(Path(__file__).with_name("weight_profiles.json")))
+# how often (seconds) get_profile() checks the file for changes
+PROFILES_RELOAD_INTERVAL = float(os.getenv("WEIGHT_PROFILES_RELOAD_INTERVAL", "2"))
+DEFAULT_PROFILE = "default"
+
+
+class WeightProfile:
+    """
+    A validated weight set, compiled once: the store-only signals' weights
+    in a fixed order plus their sum, so scoring is a dot product and a
+    division instead of repeated dict lookups. The APK signals' weights
+    are added on top when a deep-scan report carries them.
+    """
+    __slots__ = ("name", "weights", "signals", "vector", "denominator", "normalized",
+                 "apk_signals", "apk_vector")
+
+    def __init__(self, name, weights):
+        validate_weights(weights, name)
+        self.name = name
+        self.weights = dict(weights)
+        self.signals = tuple(signal for signal, _, _ in STORE_SIGNAL_WEIGHTS)
+        self.vector = tuple(weights.get(key, fallback) for _, key, fallback in STORE_SIGNAL_WEIGHTS)
+        denominator = 0.0
+        for w in self.vector:
+            denominator += w
+        if denominator <= 0:
+            raise ValueError(f"profile {name!r}: store-only weights sum to zero")
+        self.denominator = denominator
+        self.normalized = tuple(w / denominator for w in self.vector)
+        self.apk_signals = tuple(signal for signal, _, _ in APK_SIGNAL_WEIGHTS)
+        self.apk_vector = tuple(weights.get(key, fallback) for _, key, fallback in APK_SIGNAL_WEIGHTS)
+
+    def aggregate(self, signal_scores):
+        """
+        Weighted mean of the signal scores (dict by signal name or anything
+        indexable the same way, e.g. NumPy column arrays). Store-only
+        signals are required; APK signals count when present.
+        """
+        total = signal_scores[self.signals[0]] * self.vector[0]
+        for signal, w in zip(self.signals[1:], self.vector[1:]):
+            total = total + signal_scores[signal] * w
+        denominator = self.denominator
+        for signal, w in zip(self.apk_signals, self.apk_vector):
+            if signal in signal_scores:
+                total = total + signal_scores[signal] * w
+                denominator += w
+        return total / denominator
+
+    def describe(self):
+        return {"name": self.name, "weights": self.weights,
+                "normalized": dict(zip(self.signals, self.normalized)),
+                "apk_weights": dict(zip(self.apk_signals, self.apk_vector))}
+
+
+def validate_weights(weights, name="<inline>"):
+    if not isinstance(weights, dict) or not weights:
+        raise ValueError(f"profile {name!r}: weights must be a non-empty object")
+    for key, value in weights.items():
+        if key not in KNOWN_WEIGHT_KEYS:
+            raise ValueError(f"profile {name!r}: unknown weight {key!r}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) \
+                or not math.isfinite(value) or value < 0:
+            raise ValueError(f"profile {name!r}: weight {key!r} must be a finite number >= 0")
+
+
+def compile_weights(weights):
+    """
+    dict -> WeightProfile (profiles pass through untouched).
+    """
+    if isinstance(weights, WeightProfile):
+        return weights
+    return WeightProfile("<inline>", weights)
+
+
+# ============================================================
+# Profile registry (hot-reloaded from PROFILES_PATH)
+# ============================================================
+
+_profiles = {DEFAULT_PROFILE: WeightProfile(DEFAULT_PROFILE, WEIGHTS)}
+_state = {"mtime": None, "checked_at": 0.0, "error": None}
+_lock = threading.Lock()
+
+
+def load_profiles(path=None):
+    """
+    Parse, validate and compile every profile in a JSON file:
+    {"default": {"name_package_similarity": 0.25, ...}, "strict": {...}}
+    All-or-nothing: one invalid profile rejects the whole file.
+    """
+    with open(path or PROFILES_PATH, encoding="utf-8") as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict) or not raw:
+        raise ValueError("weight profile file must map profile names to weights")
+    profiles = {name: WeightProfile(name, weights) for name, weights in raw.items()}
+    profiles.setdefault(DEFAULT_PROFILE, WeightProfile(DEFAULT_PROFILE, WEIGHTS))
+    return profiles
+
+
+def reload_profiles(force=False):
+    """
+    Swap in the profiles file if it changed since the last load. A broken
+    file keeps the previous profiles active and is reported in status().
+    """
+    global _profiles
+    with _lock:
+        _state["checked_at"] = time.time()
+        try:
+            mtime = os.path.getmtime(PROFILES_PATH)
+        except OSError:
+            return False
+        if not force and mtime == _state["mtime"]:
+            return False
+
+        try:
+            profiles = load_profiles()
+        except Exception as e:
+            _state["error"] = f"{type(e).__name__}: {e}"
+            _state["mtime"] = mtime
+            return False
+
+        _profiles = profiles
+        _state["mtime"] = mtime
+        _state["error"] = None
+        return True
+
+
+def get_profile(name=None):
+    """
+    Compiled profile by name (None -> default). Raises KeyError if unknown.
+    """
+    if time.time() - _state["checked_at"] >= PROFILES_RELOAD_INTERVAL:
+        reload_profiles()
+    profiles = _profiles
+    return profiles[name or DEFAULT_PROFILE]
+
+
+def profiles_status():
+    return {
+        "path": PROFILES_PATH,
+        "profiles": {name: p.describe() for name, p in _profiles.items()},
+        "last_error": _state["error"],
+    }
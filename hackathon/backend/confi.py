@@ -0,0 +1,92 @@
+# backend/confi.py
+"""
+Runtime settings for the API, read from the environment (or a .env file).
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# ---------------------------
+# APK analysis process pool
+# ---------------------------
+APK_WORKERS = int(os.getenv("APK_WORKERS", str(os.cpu_count() or 2)))
+APK_JOB_TIMEOUT = float(os.getenv("APK_JOB_TIMEOUT", "120"))
+APK_MAX_QUEUE = int(os.getenv("APK_MAX_QUEUE", "16"))
+# import Androguard / PIL in each pool worker as it starts, not on its first job
+APK_WORKER_WARMUP = os.getenv("APK_WORKER_WARMUP", "1") == "1"
+# start (and warm) all pool workers at app startup instead of on first upload
+APK_POOL_PRESTART = os.getenv("APK_POOL_PRESTART", "0") == "1"
+# report view returned / stored when a scan does not ask for one:
+# "full" (everything the engine found) or "summary" (counts + samples)
+APK_REPORT_VIEW = os.getenv("APK_REPORT_VIEW", "full")
+
+
+# ---------------------------
+# Background scan jobs
+# ---------------------------
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "storage/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(APK_WORKERS)))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "2"))
+# a running job whose worker has not renewed its lease for this long is
+# assumed dead and re-queued (workers renew every third of it)
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "storage/uploads")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(300 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+
+
+# ---------------------------
+# Play Store metadata cache
+# ---------------------------
+PLAY_LANG = os.getenv("PLAY_LANG", "en")
+PLAY_COUNTRY = os.getenv("PLAY_COUNTRY", "in")
+PLAY_CACHE_TTL = float(os.getenv("PLAY_CACHE_TTL", str(6 * 3600)))
+PLAY_CACHE_STALE = float(os.getenv("PLAY_CACHE_STALE", str(24 * 3600)))
+PLAY_CACHE_MAX_ENTRIES = int(os.getenv("PLAY_CACHE_MAX_ENTRIES", "10000"))
+# empty string disables the on-disk layer
+PLAY_CACHE_PATH = os.getenv("PLAY_CACHE_PATH", "storage/cache/play_metadata.sqlite3")
+
+# async fetcher (see services/play_client.py); point PLAY_BASE_URL at
+# scripts/play_stub.py to test without the real store
+PLAY_BASE_URL = os.getenv("PLAY_BASE_URL", "https://play.google.com")
+PLAY_HTTP_MAX_CONNECTIONS = int(os.getenv("PLAY_HTTP_MAX_CONNECTIONS", "64"))
+PLAY_HTTP_PER_HOST = int(os.getenv("PLAY_HTTP_PER_HOST", "16"))
+PLAY_HTTP_TIMEOUT = float(os.getenv("PLAY_HTTP_TIMEOUT", "10"))
+PLAY_HTTP_RETRIES = int(os.getenv("PLAY_HTTP_RETRIES", "3"))
+PLAY_HTTP_BACKOFF = float(os.getenv("PLAY_HTTP_BACKOFF", "0.5"))
+# requests per second per host (0: unlimited), each slot jittered by up to
+# PLAY_RATE_JITTER of the interval
+PLAY_RATE_LIMIT = float(os.getenv("PLAY_RATE_LIMIT", "20"))
+PLAY_RATE_JITTER = float(os.getenv("PLAY_RATE_JITTER", "0.5"))
+
+
+# ---------------------------
+# Batch store scans
+# ---------------------------
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "64"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "10000"))
+
+
+# ---------------------------
+# Evidence kits
+# ---------------------------
+EVIDENCE_DIR = os.getenv("EVIDENCE_DIR", "storage/evidence_kits")
+# "segment" (append-only segment files + index) or "file" (one compressed file per kit)
+EVIDENCE_FORMAT = os.getenv("EVIDENCE_FORMAT", "segment")
+EVIDENCE_BATCH_SIZE = int(os.getenv("EVIDENCE_BATCH_SIZE", "256"))
+# seconds the writer waits to fill a batch
+EVIDENCE_FLUSH_INTERVAL = float(os.getenv("EVIDENCE_FLUSH_INTERVAL", "0.02"))
+EVIDENCE_SEGMENT_BYTES = int(os.getenv("EVIDENCE_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+EVIDENCE_FSYNC = os.getenv("EVIDENCE_FSYNC", "0") == "1"
+
+
+# ---------------------------
+# Database
+# ---------------------------
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///storage/app.db")
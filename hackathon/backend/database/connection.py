@@ -0,0 +1,29 @@
+# backend/database/connection.py
+"""
+SQLAlchemy engine / session factory shared by the models and db_service.
+"""
+
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, declarative_base
+
+from backend.confi import DATABASE_URL
+
+
+if DATABASE_URL.startswith("sqlite:///"):
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+else:
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+
+SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+Base = declarative_base()
+
+
+def init_db():
+    """Create all tables (idempotent), and a SQLite file's directory."""
+    if DATABASE_URL.startswith("sqlite:///"):
+        Path(DATABASE_URL[len("sqlite:///"):]).parent.mkdir(parents=True, exist_ok=True)
+    # importing the models registers them on Base.metadata
+    from backend.database.models import brand, scan  # noqa: F401
+    Base.metadata.create_all(bind=engine)
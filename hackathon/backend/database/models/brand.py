@@ -0,0 +1,42 @@
+# backend/database/models/brand.py
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+
+from backend.database.connection import Base
+
+
+class Brand(Base):
+    """
+    A legitimate brand that fake apps may impersonate.
+    `normalized` is the homoglyph-folded name used by the brand index.
+    """
+    __tablename__ = "brands"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False, unique=True)
+    normalized = Column(String(255), nullable=False, index=True)
+    package_name = Column(String(255), nullable=True)
+    developer = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CertificateFingerprint(Base):
+    """
+    Reputation of a signing certificate, keyed by its SHA-256.
+    verdict is the current call ("legit" / "malicious" / "unknown");
+    the counters keep the history of verdicts recorded against it.
+    """
+    __tablename__ = "certificate_fingerprints"
+
+    sha256 = Column(String(64), primary_key=True)
+    sha1 = Column(String(40), nullable=True)
+    publisher = Column(String(255), nullable=True)
+    brand_id = Column(Integer, ForeignKey("brands.id", ondelete="SET NULL"), nullable=True, index=True)
+    package_name = Column(String(255), nullable=True)
+    verdict = Column(String(16), nullable=False, default="unknown")
+    legit_count = Column(Integer, nullable=False, default=0)
+    malicious_count = Column(Integer, nullable=False, default=0)
+    first_seen = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_seen = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,52 @@
+# backend/database/models/scan.py
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
+from backend.database.connection import Base
+
+
+class Scan(Base):
+    """
+    One scan's raw extracted features, kept apart from the derived scores
+    so heuristics can be re-run without refetching or re-analysing.
+    features: {"store": {...Play fields...}, "apk": {identity, certificates,
+    manifest, icon_hash, urls_found} | None}
+    """
+    __tablename__ = "scans"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(16), nullable=False)  # "url" / "apk"
+    package_name = Column(String(255), nullable=True, index=True)
+    apk_sha256 = Column(String(64), nullable=True, index=True)
+    features = Column(JSON, nullable=False)
+    weights_profile = Column(String(64), nullable=False, default="default")
+    aggregate = Column(Float, nullable=True)  # weighted signal mean, 0..1
+    risk_score = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    scored_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    signals = relationship("SignalScore", back_populates="scan",
+                           cascade="all, delete-orphan", lazy="selectin")
+
+
+class SignalScore(Base):
+    """
+    A signal's sub-score for a scan. input_digest covers the signal
+    version, its raw inputs and outside state (e.g. the brand corpus);
+    rescoring only recomputes rows whose digest no longer matches.
+    """
+    __tablename__ = "scan_signals"
+    __table_args__ = (Index("idx_scan_signals_signal_version", "signal", "version"),)
+
+    scan_id = Column(Integer, ForeignKey("scans.id", ondelete="CASCADE"), primary_key=True)
+    signal = Column(String(64), primary_key=True)
+    version = Column(String(16), nullable=False)
+    input_digest = Column(String(64), nullable=False)
+    value = Column(Float, nullable=False)
+    result = Column(JSON, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    scan = relationship("Scan", back_populates="signals")
@@ -1,9 +1,71 @@
 # backend/main.py
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
+from analysis_engine.metrics import HTTP_REQUEST_SECONDS
 from backend.routes.scan_url import router as scan_url_router
+from backend.routes.scan_apk import router as scan_apk_router
+from backend.routes.scan_batch import router as scan_batch_router
+from backend.routes.jobs import router as jobs_router
+from backend.routes.brands import router as brands_router
+from backend.routes.score import router as score_router
+from backend.routes.metrics import router as metrics_router
+from backend.routes.evidence import router as evidence_router
+from backend.database.connection import init_db
+from backend.services.db_service import install_brand_index, install_cert_reputation
+from backend.services.analysis_pool import prestart as prestart_pool, shutdown_pool
+from backend.services.play_client import close_play_client
+from backend.services.evidence_store import close_evidence_store
+from backend.services.json_response import FastJSONResponse
+from backend.tasks.workers import start_workers, stop_workers
 
-app = FastAPI(title="Fake App Detection API")
+app = FastAPI(title="Fake App Detection API", default_response_class=FastJSONResponse)
 app.include_router(scan_url_router, prefix="/api")
+app.include_router(scan_apk_router, prefix="/api")
+app.include_router(scan_batch_router, prefix="/api")
+app.include_router(jobs_router, prefix="/api")
+app.include_router(brands_router, prefix="/api")
+app.include_router(score_router, prefix="/api")
+app.include_router(evidence_router, prefix="/api")
+# scraped by Prometheus at the conventional path, outside /api
+app.include_router(metrics_router)
+
+
+@app.middleware("http")
+async def _time_requests(request: Request, call_next):
+    # streamed responses (NDJSON batch) are timed to the first byte
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method,
+                                     route=getattr(route, "path", "unmatched"), status=status)
+
+
+@app.on_event("startup")
+def _start_scan_workers():
+    init_db()
+    install_brand_index()
+    install_cert_reputation()
+    start_workers()
+    prestart_pool()
+
+
+@app.on_event("shutdown")
+def _shutdown_workers():
+    stop_workers()
+    shutdown_pool()
+    close_evidence_store()
+
+
+@app.on_event("shutdown")
+async def _close_http_clients():
+    await close_play_client()
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,70 @@
+# backend/routes/brands.py
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+
+from analysis_engine.name_similarity import get_brand_index
+from analysis_engine.engine import get_cert_reputation
+from backend.services.db_service import add_brand, remove_brand, record_cert_verdict
+
+router = APIRouter()
+
+
+class CertVerdictRequest(BaseModel):
+    verdict: str
+    publisher: Optional[str] = None
+
+
+class BrandRequest(BaseModel):
+    name: str
+    package_name: Optional[str] = None
+    developer: Optional[str] = None
+
+
+# The write routes are plain functions: FastAPI runs them in its thread
+# pool, so their database commits do not block the event loop.
+# They update this process's brand index and cert reputation store only;
+# other server processes pick the change up on their next restart.
+
+@router.post("/brands")
+def create_brand(req: BrandRequest):
+    try:
+        return add_brand(req.name, req.package_name, req.developer)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    except IntegrityError:
+        raise HTTPException(409, f"Brand {req.name!r} already exists")
+
+
+@router.delete("/brands/{brand_id}")
+def delete_brand(brand_id: int):
+    if not remove_brand(brand_id):
+        raise HTTPException(404, "Brand not found")
+    return {"status": "deleted", "id": brand_id}
+
+
+@router.get("/brands/match")
+async def match_brand(q: str, k: int = Query(5, ge=1, le=50)):
+    """
+    Nearest brands for a title / package name.
+    """
+    return {"query": q, "matches": get_brand_index().query(q, k=k)}
+
+
+@router.get("/certificates/{sha256}")
+async def get_certificate(sha256: str):
+    record = get_cert_reputation().lookup(sha256)
+    if record is None:
+        raise HTTPException(404, "Certificate not in reputation store")
+    return record
+
+
+@router.post("/certificates/{sha256}/verdict")
+def post_certificate_verdict(sha256: str, req: CertVerdictRequest):
+    try:
+        return record_cert_verdict(sha256, req.verdict, req.publisher)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
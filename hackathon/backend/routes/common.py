@@ -0,0 +1,16 @@
+# backend/routes/common.py
+"""
+Request validation shared by several routers.
+"""
+
+from fastapi import HTTPException
+
+from analysis_engine.score_weights import get_profile
+
+
+def check_profile(name):
+    """400 unless `name` is a known weight profile (None: the default one)."""
+    try:
+        get_profile(name)
+    except KeyError:
+        raise HTTPException(400, f"Unknown weight profile: {name}")
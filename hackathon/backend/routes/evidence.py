@@ -1,34 +1,50 @@
 # backend/routes/evidence.py
 
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
-import json
-from pathlib import Path
+import asyncio
 
-router = APIRouter()
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.services.evidence_store import get_evidence_store
 
-EVIDENCE_DIR = Path("storage/evidence_kits")
-EVIDENCE_DIR.mkdir(parents=True, exist_ok=True)
+router = APIRouter()
 
 
 @router.post("/evidence")
 async def generate_evidence(report: dict):
     """
-    Accepts the final risk-score JSON and creates an evidence kit file.
+    Accepts the final risk-score JSON and stores it as an evidence kit.
+    Returns once the kit is on disk (writes are batched off the event loop).
     """
+    store = get_evidence_store()
     try:
-        package = report.get("package", "unknown")
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        filename = f"evidence_{package}_{timestamp}.json"
+        kit_id, fut = store.put(report)
+        await asyncio.wrap_future(fut)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        file_path = EVIDENCE_DIR / filename
-        file_path.write_text(json.dumps(report, indent=4))
+    return {
+        "status": "success",
+        "kit_id": kit_id,
+        "package": report.get("package", "unknown"),
+    }
 
-        return {
-            "status": "success",
-            "file": filename,
-            "path": str(file_path)
-        }
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@router.get("/evidence/stats")
+async def evidence_stats():
+    return get_evidence_store().snapshot()
+
+
+@router.get("/evidence")
+async def list_evidence(package: str = Query(...), limit: int = Query(100, ge=1, le=1000)):
+    """
+    Kits stored for a package, newest first.
+    """
+    return await asyncio.to_thread(get_evidence_store().list_package, package, limit)
+
+
+@router.get("/evidence/{kit_id}")
+async def get_evidence(kit_id: str):
+    kit = await asyncio.to_thread(get_evidence_store().get, kit_id)
+    if kit is None:
+        raise HTTPException(404, "Evidence kit not found")
+    return kit
@@ -0,0 +1,29 @@
+# backend/routes/jobs.py
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+from backend.tasks.workers import get_queue
+from backend.services.json_response import FastJSONResponse
+
+router = APIRouter()
+
+
+@router.get("/scan/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status of a queued scan: queued | running | done | failed,
+    plus progress (0..1), current stage and, once done, the result.
+    """
+    job = await asyncio.to_thread(get_queue().get, job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return FastJSONResponse(job)
+
+
+@router.get("/scan/jobs")
+async def job_queue_depth():
+    """
+    Number of jobs per status.
+    """
+    return await asyncio.to_thread(get_queue().depth)
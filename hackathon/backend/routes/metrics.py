@@ -0,0 +1,51 @@
+# backend/routes/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from analysis_engine.engine import cache_stats
+from analysis_engine.metrics import render_prometheus, format_value
+from backend.services.analysis_pool import pool_stats
+from backend.services.url_scraper import metadata_cache_stats
+from backend.services.play_client import play_client_stats
+from backend.tasks.workers import get_queue
+
+router = APIRouter()
+
+
+def _gauges():
+    """Point-in-time values read from the pool, job queue and caches."""
+    pool = pool_stats()
+    yield "analysis_pool_in_flight", "APK analyses submitted and not finished", {}, pool["in_flight"]
+    yield "analysis_pool_queued", "APK analyses waiting for a pool worker", {}, pool["queued"]
+    for status, count in sorted(get_queue().depth().items()):
+        yield "jobs", "Jobs in the queue by status", {"status": status}, count
+    for key, value in sorted(cache_stats().items()):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield "apk_result_cache", "APK result cache counters", {"stat": key}, value
+    for key, value in sorted(metadata_cache_stats().items()):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield "playstore_cache", "Play Store metadata cache counters", {"stat": key}, value
+    for key, value in sorted(play_client_stats().items()):
+        yield "playstore_client", "Async Play Store client counters", {"stat": key}, value
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus text exposition: stage latency histograms, analysis and
+    request counters, plus pool / queue / cache gauges.
+    A plain def: the gauges read SQLite (job queue, caches), so FastAPI
+    runs it on its thread pool rather than the event loop.
+    """
+    lines, seen = [], set()
+    for name, doc, labels, value in _gauges():
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {doc}")
+            lines.append(f"# TYPE {name} gauge")
+        label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+        value = format_value(value)
+        lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+    return PlainTextResponse(render_prometheus() + "\n".join(lines) + "\n",
+                             media_type="text/plain; version=0.0.4")
@@ -1,31 +1,208 @@
 # backend/routes/scan_apk.py
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from analysis_engine.engine import analyze_apk_full
+import time
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from analysis_engine.engine import analyze_apk_full, ANALYSIS_LEVELS
 from analysis_engine.engine import analyze_store_only
+from analysis_engine.engine import (
+    cache_stats, match_known_icons, check_cert_reputation, find_similar_apks,
+)
+from analysis_engine.apk_bundle import is_bundle, BUNDLE_SUFFIXES
+from analysis_engine.metrics import record_analysis
+from analysis_engine.reports.apk_report import VIEWS, project_apk_result
 from backend.services.scoring_connector import call_scoring_engine
+from backend.services.analysis_pool import run_in_pool, map_in_pool, pool_stats, PoolSaturated
+from backend.confi import MAX_UPLOAD_BYTES, APK_REPORT_VIEW, APK_JOB_TIMEOUT
+from backend.services.file_handler import (
+    save_upload_stream, discard_upload, max_body_bytes, UploadTooLarge, BadUpload,
+)
+from backend.services.json_response import FastJSONResponse
+from backend.tasks.workers import get_queue
 
 router = APIRouter()
 
 
-@router.post("/scan/apk")
-async def scan_apk(file: UploadFile = File(...)):
+# The upload is read from request.stream() by save_upload_stream rather
+# than declared as an UploadFile parameter: FastAPI would otherwise parse
+# (and spool) the whole multipart body before the handler even runs.
+UPLOAD_BODY = {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object", "required": ["file"],
+    "properties": {"file": {"type": "string", "format": "binary"}},
+}}}}}
+
+
+def _reject_oversized(request: Request):
+    """
+    Fail fast on the declared body size before reading a single chunk;
+    the streaming parser enforces the same limit for chunked uploads.
+    """
+    declared = request.headers.get("content-length")
+    limit = max_body_bytes()
+    if declared and declared.isdigit() and limit and int(declared) > limit:
+        raise HTTPException(413, f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+
+
+async def _store_upload(request: Request):
+    # bundles keep their extension; the analyzer tells them apart by content
+    try:
+        return await save_upload_stream(request, keep_suffixes=BUNDLE_SUFFIXES)
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
+    except BadUpload as e:
+        raise HTTPException(400, str(e))
+
+
+def _check_params(level: str, view: str):
+    if level not in ANALYSIS_LEVELS:
+        raise HTTPException(400, f"level must be one of {list(ANALYSIS_LEVELS)}")
+    if view not in VIEWS:
+        raise HTTPException(400, f"view must be one of {list(VIEWS)}")
+
+
+@router.post("/scan/apk", status_code=202, openapi_extra=UPLOAD_BODY)
+async def scan_apk(request: Request,
+                   level: str = Query("resources"),
+                   xref: bool = Query(False),
+                   priority: int = Query(0),
+                   timings: bool = Query(False),
+                   view: str = Query(APK_REPORT_VIEW)):
+    """
+    Deep APK scan, queued:
+    1) Store the upload (.apk, or a split bundle: .xapk / .apks) and
+       enqueue an "apk_scan" job
+       - level=manifest|resources|full picks how deep Androguard goes
+       - xref=true adds the dex cross-reference stage (implies full)
+       - higher priority jobs are picked first
+       - timings=true adds a per-stage timing breakdown to the result
+       - view=summary stores counts + samples instead of the full
+         file / component / IOC lists (view=full)
+    2) Poll GET /scan/jobs/{job_id} for progress and the final report
+    The upload is deleted once the job is done or has failed for good.
+    """
+    _check_params(level, view)
+    _reject_oversized(request)
+    stored = await _store_upload(request)
+
+    try:
+        job_id = await asyncio.to_thread(get_queue().submit, "apk_scan", {
+            "path": stored["path"],
+            "sha256": stored["sha256"],
+            "filename": stored["filename"],
+            "level": level,
+            "xref": xref,
+            "timings": timings,
+            "view": view,
+        }, priority=priority)
+
+        return {"job_id": job_id, "status": "queued", "file": stored["filename"]}
+
+    except Exception as e:
+        await asyncio.to_thread(discard_upload, stored["path"])
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/scan/apk/sync", openapi_extra=UPLOAD_BODY)
+async def scan_apk_sync(request: Request,
+                        level: str = Query("resources"),
+                        xref: bool = Query(False),
+                        timings: bool = Query(False),
+                        view: str = Query(APK_REPORT_VIEW)):
     """
-    Deep APK scan:
+    Deep APK scan inside the request (small APKs / debugging):
     1) Extract APK metadata (certs, manifest, icon hash, URLs)
     2) Score using scoring engine
+    3) Return the report in the requested view (summary | full)
+
+    Analysis runs in the bounded process pool: 503 when the pool is
+    saturated, 504 when the job exceeds APK_JOB_TIMEOUT. The splits of
+    an XAPK / APKS bundle are analysed in parallel and merged.
     """
-    try:
-        apk_bytes = await file.read()
+    _check_params(level, view)
+    _reject_oversized(request)
+    stored = await _store_upload(request)
 
-        apk_report = analyze_apk_full(apk_bytes)
-        final_score = call_scoring_engine(apk_report)
+    try:
+        start = time.perf_counter()
+        if await asyncio.to_thread(is_bundle, stored["path"]):
+            # fans the splits out to the pool from a thread
+            apk_report = await asyncio.wait_for(
+                asyncio.to_thread(analyze_apk_full, apk_path=stored["path"],
+                                  apk_sha256=stored["sha256"], level=level, xref=xref,
+                                  split_map=map_in_pool),
+                APK_JOB_TIMEOUT)
+        else:
+            apk_report = await run_in_pool(analyze_apk_full,
+                                           apk_path=stored["path"],
+                                           apk_sha256=stored["sha256"],
+                                           level=level, xref=xref)
+        wall = time.perf_counter() - start
+        await asyncio.to_thread(match_known_icons, apk_report)
+        await asyncio.to_thread(check_cert_reputation, apk_report)
+        await asyncio.to_thread(find_similar_apks, apk_report)
+        final_score = await asyncio.to_thread(
+            call_scoring_engine, None, kind="apk" if apk_report.get("success") else None,
+            apk_report=apk_report, timings=apk_report.get("timings"))
+        breakdown = record_analysis("apk", apk_report, wall)
 
-        return {
-            "file": file.filename,
-            "apk_metadata": apk_report,
+        response = {
+            "file": stored["filename"],
+            "apk_metadata": project_apk_result(apk_report, view),
             "score": final_score
         }
+        if timings:
+            response["timings"] = breakdown
+        return FastJSONResponse(response)
+
+    except PoolSaturated:
+        raise HTTPException(503, "APK analysis queue is full, retry later",
+                            headers={"Retry-After": "5"})
+
+    except asyncio.TimeoutError:
+        raise HTTPException(504, "APK analysis timed out")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    finally:
+        await asyncio.to_thread(discard_upload, stored["path"])
+
+
+@router.get("/scan/apk/cache")
+async def scan_apk_cache_stats():
+    """
+    Hit/miss counters of the content-addressed APK result cache.
+    """
+    return cache_stats()
+
+
+@router.get("/scan/apk/pool")
+async def scan_apk_pool_stats():
+    """
+    Occupancy of the APK analysis process pool.
+    """
+    return pool_stats()
+
+
+@router.get("/scan/apk/clusters")
+async def scan_apk_clusters(limit: int = Query(20, ge=1, le=500), min_size: int = Query(2, ge=1)):
+    """
+    Largest families of similar APKs seen so far.
+    """
+    from analysis_engine.apk_similarity import get_default_similarity_index
+    return await asyncio.to_thread(get_default_similarity_index().top_clusters, limit, min_size)
+
+
+@router.get("/scan/apk/clusters/{cluster_id}")
+async def scan_apk_cluster(cluster_id: int, limit: int = Query(100, ge=1, le=1000)):
+    """
+    One APK family and its most recent members.
+    """
+    from analysis_engine.apk_similarity import get_default_similarity_index
+    index = get_default_similarity_index()
+    cluster = await asyncio.to_thread(index.cluster, cluster_id)
+    if cluster is None:
+        raise HTTPException(404, "Cluster not found")
+    cluster["members"] = await asyncio.to_thread(index.cluster_members, cluster_id, limit)
+    return cluster
@@ -0,0 +1,34 @@
+# backend/routes/scan_batch.py
+
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from backend.confi import BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY, BATCH_MAX_ITEMS
+from backend.services.batch_scan import scan_many_ndjson
+from backend.routes.common import check_profile
+
+router = APIRouter()
+
+
+class BatchScanRequest(BaseModel):
+    items: List[str]
+    concurrency: Optional[int] = None
+    profile: Optional[str] = None
+
+
+@router.post("/scan/batch")
+async def scan_batch(req: BatchScanRequest):
+    """
+    Store-only scan of many package ids / Play URLs at once.
+    Streams one NDJSON line per item, in completion order.
+    """
+    if len(req.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(413, f"At most {BATCH_MAX_ITEMS} items per batch")
+    check_profile(req.profile)
+
+    concurrency = max(1, min(req.concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    return StreamingResponse(scan_many_ndjson(req.items, concurrency, req.profile),
+                             media_type="application/x-ndjson")
@@ -1,15 +1,23 @@
 # backend/routes/scan_url.py
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from backend.services.url_scraper import fetch_playstore_metadata
+from analysis_engine.metrics import StageTimer, record_analysis
+from backend.services.url_scraper import fetch_playstore_metadata_async, metadata_cache_stats
 from backend.services.scoring_connector import call_scoring_engine
+from backend.tasks.workers import get_queue
+from backend.routes.common import check_profile
 
 router = APIRouter()
 
 
 class URLScanRequest(BaseModel):
     url: str
+    profile: Optional[str] = None
+    timings: bool = False
 
 
 @router.post("/scan/url")
@@ -18,17 +26,50 @@ async def scan_url(req: URLScanRequest):
     Store-only scan:
     - Extract package
     - Fetch Play Store metadata
-    - Run scoring engine
+    - Run scoring engine (with the requested weight profile)
+    timings=true adds the fetch / scoring breakdown to the response.
     """
     pkg = req.url
+    check_profile(req.profile)
 
-    play_data = fetch_playstore_metadata(pkg)
+    timer = StageTimer()
+    with timer.stage("fetch"):
+        play_data = await fetch_playstore_metadata_async(pkg)
     if not play_data:
+        record_analysis("url", {"success": False, "timings": timer.result()})
         raise HTTPException(404, "Play Store metadata not found")
 
-    score = call_scoring_engine(play_data)
+    timings = timer.result()
+    # scoring stores the scan (a DB commit): keep it off the event loop
+    score = await asyncio.to_thread(call_scoring_engine, play_data, req.profile,
+                                    kind="url", timings=timings)
+    breakdown = record_analysis("url", {"success": True, "timings": timings})
 
-    return {
+    response = {
         "package": play_data.get("appId", pkg),
         "score": score
     }
+    if req.timings:
+        response["timings"] = breakdown
+    return response
+
+
+@router.post("/scan/url/jobs", status_code=202)
+async def scan_url_job(req: URLScanRequest, priority: int = Query(0)):
+    """
+    Queued store-only scan; poll GET /scan/jobs/{job_id} for the result.
+    """
+    check_profile(req.profile)
+    job_id = await asyncio.to_thread(get_queue().submit, "url_scan",
+                                     {"url": req.url, "profile": req.profile,
+                                      "timings": req.timings},
+                                     priority=priority)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/scan/url/cache")
+async def scan_url_cache_stats():
+    """
+    Hit / stale / miss counters of the Play Store metadata cache.
+    """
+    return metadata_cache_stats()
@@ -0,0 +1,52 @@
+# backend/routes/score.py
+
+import asyncio
+from typing import Optional, List
+
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+
+from analysis_engine.score_weights import profiles_status, reload_profiles
+from backend.tasks.workers import get_queue
+from backend.routes.common import check_profile
+
+router = APIRouter()
+
+
+class RescoreRequest(BaseModel):
+    profile: Optional[str] = None
+    scan_ids: Optional[List[int]] = None
+
+
+@router.get("/score/profiles")
+async def list_profiles():
+    """
+    Active weight profiles (raw + normalized weights) and the last reload error.
+    """
+    return profiles_status()
+
+
+@router.post("/score/profiles/reload")
+async def reload_weight_profiles():
+    """
+    Re-read the profiles file now instead of waiting for the mtime check.
+    An invalid file leaves the current profiles in place.
+    """
+    changed = await asyncio.to_thread(reload_profiles, force=True)
+    status = profiles_status()
+    status["reloaded"] = changed
+    return status
+
+
+@router.post("/score/rescore", status_code=202)
+async def rescore(req: RescoreRequest, priority: int = Query(-1)):
+    """
+    Queue a replay of stored scans (all, or `scan_ids`) against the current
+    heuristics and weights. No metadata is refetched and no APK re-analysed.
+    `profile` rescores every scan with that profile instead of its own.
+    """
+    check_profile(req.profile)
+    job_id = await asyncio.to_thread(get_queue().submit, "rescore",
+                                     {"profile": req.profile, "scan_ids": req.scan_ids},
+                                     priority=priority)
+    return {"job_id": job_id, "status": "queued"}
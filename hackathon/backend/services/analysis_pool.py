@@ -0,0 +1,169 @@
+# backend/services/analysis_pool.py
+"""
+Bounded process pool for CPU-bound APK analysis.
+
+Androguard holds the GIL for the whole parse, so running it inside an
+async handler stalls the event loop. Jobs go to a ProcessPoolExecutor
+instead; at most APK_WORKERS run at once and at most APK_MAX_QUEUE wait
+behind them. Anything beyond that is rejected with PoolSaturated.
+
+Workers import the APK stack (Androguard, PIL) when they start
+(APK_WORKER_WARMUP), so the API process itself never has to; with
+APK_POOL_PRESTART they are started at app startup by prestart().
+"""
+
+import time
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from functools import partial
+from typing import Optional, List, Dict, Any
+
+from backend.confi import (
+    APK_WORKERS, APK_JOB_TIMEOUT, APK_MAX_QUEUE, APK_WORKER_WARMUP, APK_POOL_PRESTART,
+)
+
+
+class PoolSaturated(Exception):
+    """Raised when running + queued jobs already reach the configured limit."""
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_in_flight = 0
+
+
+def _init_worker(warmup: bool) -> None:
+    if warmup:
+        from analysis_engine.engine import warmup as warmup_engine
+        warmup_engine()
+
+
+def _ping() -> None:
+    pass
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            # spawn: never fork a process that already runs uvicorn's threads
+            _executor = ProcessPoolExecutor(
+                max_workers=APK_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(APK_WORKER_WARMUP,),
+            )
+        return _executor
+
+
+def prestart() -> bool:
+    """
+    Start every pool worker now (in the background) if APK_POOL_PRESTART
+    is set. Returns whether it did. Does not take queue slots.
+    """
+    if not APK_POOL_PRESTART:
+        return False
+    executor = get_executor()
+    # workers are spawned on demand, one per submit that finds none idle
+    for _ in range(APK_WORKERS):
+        executor.submit(_ping)
+    return True
+
+
+def _release(_fut: Future) -> None:
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+
+
+def submit(fn, *args, **kwargs) -> Future:
+    """
+    Queue fn(*args, **kwargs) on the pool, or raise PoolSaturated.
+    fn and its arguments must be picklable.
+    """
+    global _in_flight
+    executor = get_executor()
+    with _lock:
+        if _in_flight >= APK_WORKERS + APK_MAX_QUEUE:
+            raise PoolSaturated(f"{_in_flight} APK jobs in flight")
+        _in_flight += 1
+
+    try:
+        fut = executor.submit(partial(fn, *args, **kwargs))
+    except Exception:
+        _release(None)
+        raise
+    # the slot is held until the worker is actually free again
+    fut.add_done_callback(_release)
+    return fut
+
+
+async def run_in_pool(fn, *args, timeout: Optional[float] = APK_JOB_TIMEOUT, **kwargs):
+    """
+    Await fn(*args, **kwargs) from the pool without blocking the event loop.
+    Raises PoolSaturated or asyncio.TimeoutError.
+
+    A job that times out is cancelled if it has not started yet; once
+    running it cannot be interrupted, so it keeps its slot until done.
+    """
+    fut = submit(fn, *args, **kwargs)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(fut), timeout)
+    except asyncio.TimeoutError:
+        fut.cancel()
+        raise
+
+
+def map_in_pool(fn, calls: List[Dict[str, Any]],
+                timeout: Optional[float] = APK_JOB_TIMEOUT) -> List[Any]:
+    """
+    fn(**kwargs) for every kwargs in calls, run on the pool concurrently;
+    blocks until all are done and returns the results in order (the
+    engine's split_map for bundles). Calls are submitted in order as
+    slots free up, so a large bundle never needs more than one free slot.
+    Raises PoolSaturated if not even the first call can be queued, and
+    TimeoutError (cancelling what has not started) after `timeout`.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    futures: List[Future] = []
+    try:
+        for kwargs in calls:
+            while True:
+                try:
+                    futures.append(submit(fn, **kwargs))
+                    break
+                except PoolSaturated:
+                    pending = [f for f in futures if not f.done()]
+                    if not pending:
+                        raise
+                    remaining = deadline - time.monotonic() if deadline else None
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"{len(calls)} pool jobs exceeded {timeout}s")
+                    wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        return [f.result(timeout=deadline - time.monotonic() if deadline else None)
+                for f in futures]
+    except BaseException:
+        for f in futures:
+            f.cancel()
+        raise
+
+
+def pool_stats() -> dict:
+    with _lock:
+        in_flight = _in_flight
+    return {
+        "workers": APK_WORKERS,
+        "max_queue": APK_MAX_QUEUE,
+        "in_flight": in_flight,
+        "queued": max(0, in_flight - APK_WORKERS),
+    }
+
+
+def shutdown_pool() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,100 @@
+# backend/services/batch_scan.py
+"""
+Concurrent store-only scanning for lists of package ids / Play URLs.
+
+A fixed number of worker coroutines pull items from a queue, fetch the
+metadata on the event loop (metadata cache + pooled async client) and
+score it on a small thread pool (scoring writes to the database). Results are yielded in completion order, so callers can
+stream them out as NDJSON while the rest of the batch is still running.
+"""
+
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, AsyncIterator, Dict, Any, Optional
+
+from analysis_engine import json_codec
+from analysis_engine.metrics import StageTimer, record_analysis
+from backend.confi import BATCH_CONCURRENCY
+from backend.services.scoring_connector import call_scoring_engine
+from backend.services.url_scraper import fetch_playstore_metadata_async, extract_package_id
+
+_DONE = object()
+
+
+def _score_one(item: str, pkg: str, play_data: Dict[str, Any], timings: Dict[str, Any],
+               profile: Optional[str]) -> Dict[str, Any]:
+    report = call_scoring_engine(play_data, profile, kind="url", timings=timings)
+    record_analysis("batch", {"success": True, "timings": timings})
+    return {"input": item, "package": play_data.get("appId", pkg), "success": True,
+            "risk_score": report.get("risk_score"), "score": report}
+
+
+async def scan_one(item: str, profile: Optional[str] = None,
+                   executor: Optional[ThreadPoolExecutor] = None) -> Dict[str, Any]:
+    pkg = extract_package_id(item.strip())
+    timer = StageTimer()
+    try:
+        with timer.stage("fetch"):
+            play_data = await fetch_playstore_metadata_async(pkg)
+        if not play_data:
+            record_analysis("batch", {"success": False, "timings": timer.result()})
+            return {"input": item, "package": pkg, "success": False,
+                    "error": "Play Store metadata not found"}
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, _score_one, item, pkg, play_data,
+                                          timer.result(), profile)
+    except Exception as e:
+        return {"input": item, "package": pkg, "success": False, "error": str(e)}
+
+
+async def scan_many(items: Iterable[str],
+                    concurrency: int = BATCH_CONCURRENCY,
+                    profile: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield one result dict per item as soon as it completes.
+    At most `concurrency` fetches are in flight at any time.
+    """
+    todo: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    results: asyncio.Queue = asyncio.Queue()
+    executor = ThreadPoolExecutor(max_workers=min(concurrency, os.cpu_count() or 4),
+                                  thread_name_prefix="batch-score")
+
+    async def feed():
+        for item in items:
+            if item and item.strip():
+                await todo.put(item.strip())
+        for _ in range(concurrency):
+            await todo.put(_DONE)
+
+    async def work():
+        while True:
+            item = await todo.get()
+            if item is _DONE:
+                await results.put(_DONE)
+                return
+            await results.put(await scan_one(item, profile, executor))
+
+    tasks = [asyncio.create_task(feed())]
+    tasks += [asyncio.create_task(work()) for _ in range(concurrency)]
+
+    try:
+        finished = 0
+        while finished < concurrency:
+            result = await results.get()
+            if result is _DONE:
+                finished += 1
+                continue
+            yield result
+    finally:
+        for t in tasks:
+            t.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def scan_many_ndjson(items: Iterable[str],
+                           concurrency: int = BATCH_CONCURRENCY,
+                           profile: Optional[str] = None) -> AsyncIterator[str]:
+    async for result in scan_many(items, concurrency, profile):
+        yield json_codec.dumps_text(result) + "\n"
@@ -0,0 +1,353 @@
+# backend/services/db_service.py
+"""
+Database helpers used by the routes and scripts.
+"""
+
+from datetime import datetime
+from typing import Optional, Iterable, Dict, Any, List, Callable
+
+from analysis_engine.brand_index import BrandIndex, fold_confusables
+from analysis_engine.name_similarity import get_brand_index, set_brand_index, has_seed_brands
+from analysis_engine.certificate_check import CertReputation
+from analysis_engine.engine import set_cert_reputation, get_cert_reputation
+from analysis_engine.reports.rescore import (
+    extract_store_features, extract_apk_features, signal_states, replay_store_report,
+)
+from analysis_engine.score_weights import get_profile, DEFAULT_PROFILE
+from backend.database.connection import SessionLocal
+from backend.database.models.brand import Brand, CertificateFingerprint
+from backend.database.models.scan import Scan, SignalScore
+
+VERDICTS = ("legit", "malicious", "unknown")
+
+
+# ============================================================
+# Brands
+# ============================================================
+
+def load_brand_index(batch_size: int = 5000) -> BrandIndex:
+    """
+    Build a BrandIndex from the brands table (streamed in batches).
+    """
+    index = BrandIndex()
+    with SessionLocal() as session:
+        rows = session.query(Brand.id, Brand.name, Brand.package_name).yield_per(batch_size)
+        for brand_id, name, package_name in rows:
+            index.add(name, brand_id=brand_id, package=package_name)
+    return index
+
+
+def install_brand_index() -> int:
+    """
+    Swap the brand corpus from the DB into name_similarity, if it has any.
+    Returns the number of brands indexed (0 keeps the built-in seed list).
+    """
+    index = load_brand_index()
+    if len(index):
+        set_brand_index(index)
+    return len(index)
+
+
+def add_brand(name: str, package_name: Optional[str] = None,
+              developer: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Insert a brand and add it to the live brand index. Only this process's
+    index is updated; other processes load it on startup
+    (install_brand_index). A duplicate name raises IntegrityError.
+    """
+    with SessionLocal() as session:
+        brand = Brand(name=name, normalized=fold_confusables(name),
+                      package_name=package_name, developer=developer)
+        session.add(brand)
+        session.commit()
+        brand_id = brand.id
+
+    index = get_brand_index()
+    if has_seed_brands(index):
+        # first DB brand: the DB corpus replaces the seed list, as on startup
+        install_brand_index()
+    else:
+        # keep the live index in step, no rebuild
+        index.add(name, brand_id=brand_id, package=package_name)
+    return {"id": brand_id, "name": name, "normalized": fold_confusables(name)}
+
+
+def bulk_add_brands(names: Iterable[str], batch_size: int = 5000) -> int:
+    """
+    Insert many brand names at once (duplicates skipped), then reload the index.
+    """
+    with SessionLocal() as session:
+        existing = {n for (n,) in session.query(Brand.name)}
+        batch, added = [], 0
+        for name in names:
+            name = name.strip()
+            if not name or name in existing or not fold_confusables(name):
+                continue
+            existing.add(name)
+            batch.append({"name": name, "normalized": fold_confusables(name)})
+            if len(batch) >= batch_size:
+                session.bulk_insert_mappings(Brand, batch)
+                added += len(batch)
+                batch = []
+        if batch:
+            session.bulk_insert_mappings(Brand, batch)
+            added += len(batch)
+        session.commit()
+
+    install_brand_index()
+    return added
+
+
+def remove_brand(brand_id: int) -> bool:
+    with SessionLocal() as session:
+        brand = session.get(Brand, brand_id)
+        if brand is None:
+            return False
+        session.delete(brand)
+        session.commit()
+
+    get_brand_index().remove(brand_id)
+    return True
+
+
+# ============================================================
+# Certificate fingerprints
+# ============================================================
+
+def _cert_record(fp: CertificateFingerprint, brand_name: Optional[str]) -> Dict[str, Any]:
+    return {
+        "sha256": fp.sha256,
+        "publisher": fp.publisher,
+        "brand": brand_name,
+        "package": fp.package_name,
+        "verdict": fp.verdict,
+        "legit_count": fp.legit_count,
+        "malicious_count": fp.malicious_count,
+    }
+
+
+def load_cert_reputation(batch_size: int = 10000) -> CertReputation:
+    reputation = CertReputation()
+    with SessionLocal() as session:
+        rows = (session.query(CertificateFingerprint, Brand.name)
+                .outerjoin(Brand, CertificateFingerprint.brand_id == Brand.id)
+                .yield_per(batch_size))
+        batch = []
+        for fp, brand_name in rows:
+            batch.append(_cert_record(fp, brand_name))
+            if len(batch) >= batch_size:
+                reputation.load(batch)
+                batch = []
+        reputation.load(batch)
+    return reputation
+
+
+def install_cert_reputation() -> int:
+    reputation = load_cert_reputation()
+    set_cert_reputation(reputation)
+    return len(reputation)
+
+
+def bulk_import_certificates(records: Iterable[Dict[str, Any]], batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Upsert fingerprint records in batches of `batch_size`:
+    {"sha256", "sha1"?, "publisher"?, "brand"?, "package"?, "verdict"?}
+    `brand` is a brand name and must already exist in the brands table.
+    Fields left empty keep their stored value (new rows: verdict "unknown").
+    An unknown verdict or brand raises ValueError and nothing is imported.
+    """
+    inserted = updated = 0
+    with SessionLocal() as session:
+        brand_ids = dict(session.query(Brand.name, Brand.id))
+
+        def flush(batch):
+            nonlocal inserted, updated
+            shas = [r["sha256"] for r in batch]
+            existing = {sha for (sha,) in session.query(CertificateFingerprint.sha256)
+                        .filter(CertificateFingerprint.sha256.in_(shas))}
+            new = [{"verdict": "unknown", **r} for r in batch if r["sha256"] not in existing]
+            old = [r for r in batch if r["sha256"] in existing]
+            if new:
+                session.bulk_insert_mappings(CertificateFingerprint, new)
+            if old:
+                session.bulk_update_mappings(CertificateFingerprint, old)
+            inserted += len(new)
+            updated += len(old)
+
+        batch, seen = [], set()
+        for r in records:
+            sha = (r.get("sha256") or "").strip().lower()
+            if len(sha) != 64 or sha in seen:
+                continue
+            seen.add(sha)
+            row = {"sha256": sha, "last_seen": datetime.utcnow()}
+            verdict = r.get("verdict")
+            if verdict:
+                if verdict not in VERDICTS:
+                    raise ValueError(f"Unknown verdict {verdict!r} for {sha}")
+                row["verdict"] = verdict
+            for src, dst in (("sha1", "sha1"), ("publisher", "publisher"), ("package", "package_name")):
+                if r.get(src):
+                    row[dst] = r[src]
+            if r.get("brand"):
+                if r["brand"] not in brand_ids:
+                    raise ValueError(f"Unknown brand {r['brand']!r} for {sha}")
+                row["brand_id"] = brand_ids[r["brand"]]
+            batch.append(row)
+
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        session.commit()
+
+    install_cert_reputation()
+    return {"inserted": inserted, "updated": updated}
+
+
+def record_cert_verdict(sha256: str, verdict: str, publisher: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Add one verdict to a certificate's history (creating it if unseen)
+    and refresh its entry in the live reputation store.
+    """
+    if verdict not in VERDICTS:
+        raise ValueError(f"verdict must be one of {VERDICTS}")
+
+    sha256 = sha256.lower()
+    with SessionLocal() as session:
+        fp = session.get(CertificateFingerprint, sha256)
+        if fp is None:
+            fp = CertificateFingerprint(sha256=sha256, legit_count=0, malicious_count=0)
+            session.add(fp)
+        if publisher:
+            fp.publisher = publisher
+        if verdict == "legit":
+            fp.legit_count += 1
+        elif verdict == "malicious":
+            fp.malicious_count += 1
+        fp.verdict = verdict
+        fp.last_seen = datetime.utcnow()
+        session.commit()
+
+        brand = session.get(Brand, fp.brand_id) if fp.brand_id else None
+        record = _cert_record(fp, brand.name if brand else None)
+
+    get_cert_reputation().load([record])
+    return record
+
+
+# ============================================================
+# Scans (raw features + signal sub-scores)
+# ============================================================
+
+def record_scan(kind: str, play_data: Dict[str, Any], report: Dict[str, Any],
+                apk_report: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Store a scan's raw features and the signal sub-scores of its report.
+    kind: "url" or "apk". apk_report: analyze_apk_full()'s result (the
+    features are read from its "apk" section). Returns the scan id.
+    """
+    store = extract_store_features(play_data)
+    deep = (apk_report or {}).get("apk") or {}
+    apk = extract_apk_features(deep) if deep else None
+    package_name = store.get("appId") or ((apk or {}).get("identity") or {}).get("package")
+
+    profile = report.get("weights_profile") or DEFAULT_PROFILE
+    states = signal_states(store, report, apk)
+    scan = Scan(kind=kind, package_name=package_name,
+                apk_sha256=deep.get("sha256"),
+                features={"store": store, "apk": apk},
+                weights_profile=profile,
+                aggregate=_aggregate(_scan_profile(profile), states),
+                risk_score=report.get("risk_score"))
+    for name, st in states.items():
+        scan.signals.append(SignalScore(signal=name, version=st["version"], input_digest=st["digest"],
+                                        value=st["value"], result=st["result"]))
+
+    with SessionLocal() as session:
+        session.add(scan)
+        session.commit()
+        return scan.id
+
+
+def _aggregate(weights, states: Dict[str, Dict[str, Any]]) -> float:
+    # the weighted mean behind risk_score, before rounding to 0..100
+    return float(weights.aggregate({name: st["value"] for name, st in states.items()}))
+
+
+def _scan_profile(name: str):
+    # a profile removed since the scan falls back to the default one
+    try:
+        return get_profile(name)
+    except KeyError:
+        return get_profile(DEFAULT_PROFILE)
+
+
+def rescore_scans(profile: Optional[str] = None, scan_ids: Optional[List[int]] = None,
+                  batch_size: int = 500,
+                  progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    """
+    Replay stored scans through the current heuristics and weights.
+    Only signals whose input digest changed are recomputed; the others
+    are reused as stored. profile: score every scan with this profile
+    instead of the one it was scored with (KeyError if unknown).
+    """
+    override = get_profile(profile) if profile else None
+    stats = {"scans": 0, "signals_recomputed": 0, "signals_reused": 0, "scores_changed": 0}
+
+    with SessionLocal() as session:
+        query = session.query(Scan)
+        if scan_ids is not None:
+            query = query.filter(Scan.id.in_(scan_ids))
+        total = query.count()
+
+        last_id = 0
+        while True:
+            batch = query.filter(Scan.id > last_id).order_by(Scan.id).limit(batch_size).all()
+            if not batch:
+                break
+            now = datetime.utcnow()
+            for scan in batch:
+                weights = override or _scan_profile(scan.weights_profile)
+                rows = {row.signal: row for row in scan.signals}
+                previous = {name: {"version": row.version, "digest": row.input_digest,
+                                   "value": row.value, "result": row.result}
+                            for name, row in rows.items()}
+
+                features = scan.features or {}
+                report, states, recomputed = replay_store_report(
+                    features.get("store") or {}, previous, weights, features.get("apk"))
+
+                for name in recomputed:
+                    st = states[name]
+                    row = rows.get(name)
+                    if row is None:
+                        row = SignalScore(signal=name)
+                        scan.signals.append(row)
+                    row.version = st["version"]
+                    row.input_digest = st["digest"]
+                    row.value = st["value"]
+                    row.result = st["result"]
+                    row.computed_at = now
+
+                if report["risk_score"] != scan.risk_score:
+                    stats["scores_changed"] += 1
+                if recomputed or report["risk_score"] != scan.risk_score \
+                        or weights.name != scan.weights_profile or scan.aggregate is None:
+                    scan.aggregate = _aggregate(weights, states)
+                    scan.risk_score = report["risk_score"]
+                    scan.weights_profile = weights.name
+                    scan.scored_at = now
+
+                stats["scans"] += 1
+                stats["signals_recomputed"] += len(recomputed)
+                stats["signals_reused"] += len(states) - len(recomputed)
+                last_id = scan.id
+
+            session.commit()
+            session.expunge_all()
+            if progress:
+                progress(stats["scans"], total)
+
+    return stats
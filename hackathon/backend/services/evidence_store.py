@@ -0,0 +1,311 @@
+# backend/services/evidence_store.py
+"""
+Evidence kit storage.
+
+Kits are written by one background thread in batches (group commit):
+put() only enqueues, and callers wait on a future that resolves once the
+batch holding their kit is written and indexed. Writes are flushed to the
+OS, not fsync'ed, unless EVIDENCE_FSYNC is set: a kit survives a crash of
+the process but not of the machine. A batch that fails part-way is
+rolled back (segments truncated to their size before the batch), so no
+unindexed records are left behind. Serialisation is compact JSON
+compressed with zlib, done on the writer thread.
+
+Two on-disk layouts, both sharded by a hash of the package name so no
+directory grows unbounded:
+
+- "segment" (default): records appended to segment files,
+  <root>/<sh>/<writer>-<seq>.seg, rolled at EVIDENCE_SEGMENT_BYTES. Each
+  record is MAGIC + length + payload, so a segment can be rescanned
+  without the index. Every process appends only to its own segments.
+- "file": one <root>/<sh>/<sh2>/<kit_id>.json.z per kit, written via a
+  temp file + rename.
+
+A SQLite index (kit_id -> file, offset, length) serves get() with one
+lookup and one positioned read, and lists a package's kits.
+"""
+
+import os
+import time
+import uuid
+import zlib
+import queue
+import struct
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, List, Tuple
+
+from analysis_engine import json_codec
+from backend.confi import (
+    EVIDENCE_DIR, EVIDENCE_FORMAT, EVIDENCE_BATCH_SIZE, EVIDENCE_FLUSH_INTERVAL,
+    EVIDENCE_SEGMENT_BYTES, EVIDENCE_FSYNC,
+)
+
+FORMATS = ("segment", "file")
+MAGIC = b"EVK1"
+_RECORD_HEADER = struct.Struct("<4sI")
+_STOP = object()
+
+
+def shard_of(package: str) -> str:
+    return hashlib.sha1(package.encode("utf-8")).hexdigest()
+
+
+def encode_kit(kit: Dict[str, Any]) -> bytes:
+    return zlib.compress(json_codec.dumps(kit), 6)
+
+
+def decode_kit(payload: bytes) -> Dict[str, Any]:
+    return json_codec.loads(zlib.decompress(payload))
+
+
+class EvidenceStore:
+    def __init__(self, root: str = EVIDENCE_DIR, fmt: str = EVIDENCE_FORMAT,
+                 batch_size: int = EVIDENCE_BATCH_SIZE,
+                 flush_interval: float = EVIDENCE_FLUSH_INTERVAL,
+                 segment_bytes: int = EVIDENCE_SEGMENT_BYTES,
+                 fsync: bool = EVIDENCE_FSYNC):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown evidence format: {fmt}")
+        self.root = Path(root)
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.stats = {"kits": 0, "batches": 0, "bytes": 0, "errors": 0}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kits ("
+            " kit_id TEXT PRIMARY KEY,"
+            " package TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " path TEXT NOT NULL,"
+            " offset INTEGER NOT NULL,"
+            " length INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_kits_package ON kits(package, created_at)"
+        )
+        self._conn.commit()
+
+        # segments this process appends to: shard -> (path, open file)
+        self._writer_id = uuid.uuid4().hex[:8]
+        self._segments: Dict[str, Tuple[Path, Any]] = {}
+        self._seq = 0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="evidence-writer", daemon=True)
+        self._thread.start()
+
+    # ---------------------------
+    # Writing
+    # ---------------------------
+    def put(self, report: Dict[str, Any], package: Optional[str] = None) -> Tuple[str, Future]:
+        """
+        Queue a kit; returns (kit_id, future). The future resolves to the
+        kit_id once the kit is written and indexed (see EVIDENCE_FSYNC).
+        """
+        package = package or str(report.get("package") or "unknown")
+        created_at = time.time()
+        kit_id = time.strftime("%Y%m%d%H%M%S", time.gmtime(created_at)) + "-" + uuid.uuid4().hex[:16]
+        fut: Future = Future()
+        self._queue.put((kit_id, package, created_at, report, fut))
+        return kit_id, fut
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch: list) -> None:
+        # segment -> its size before this batch, and kit files written so far
+        starts: Dict[Path, int] = {}
+        written: List[Path] = []
+        try:
+            rows = []
+            for kit_id, package, created_at, report, _ in batch:
+                payload = encode_kit({"kit_id": kit_id, "package": package,
+                                      "created_at": created_at, "report": report})
+                if self.fmt == "segment":
+                    path, offset = self._append_segment(shard_of(package)[:2], payload, starts)
+                else:
+                    path, offset = self._write_file(shard_of(package), kit_id, payload), 0
+                    written.append(path)
+                rows.append((kit_id, package, created_at, str(path), offset, len(payload)))
+                self.stats["bytes"] += len(payload)
+            for _, f in self._segments.values():
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+            with self._lock:
+                self._conn.executemany("INSERT INTO kits VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._conn.commit()
+        except Exception as e:
+            self.stats["errors"] += 1
+            self._rollback(starts, written)
+            for *_, fut in batch:
+                fut.set_exception(e)
+            return
+
+        self.stats["kits"] += len(batch)
+        self.stats["batches"] += 1
+        for kit_id, *_, fut in batch:
+            fut.set_result(kit_id)
+
+    def _rollback(self, starts: Dict[Path, int], written: List[Path]) -> None:
+        """Undo a failed batch: cut its segments back to their pre-batch size."""
+        open_files = {path: (shard, f) for shard, (path, f) in self._segments.items()}
+        for path, size in starts.items():
+            shard, f = open_files.get(path, (None, None))
+            if f is not None:
+                try:
+                    f.truncate(size)
+                    f.seek(size)
+                    continue
+                except OSError:
+                    # buffered bytes cannot be flushed: drop the handle
+                    del self._segments[shard]
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
+            try:
+                os.truncate(path, size)
+            except OSError:
+                pass
+        for path in written:
+            path.unlink(missing_ok=True)
+
+    def _append_segment(self, shard: str, payload: bytes,
+                        starts: Dict[Path, int]) -> Tuple[Path, int]:
+        entry = self._segments.get(shard)
+        if entry is not None and entry[1].tell() >= self.segment_bytes:
+            entry[1].close()
+            entry = None
+        if entry is None:
+            self._seq += 1
+            directory = self.root / shard
+            directory.mkdir(exist_ok=True)
+            path = directory / f"{self._writer_id}-{self._seq:06d}.seg"
+            entry = self._segments[shard] = (path, open(path, "ab"))
+        path, f = entry
+        starts.setdefault(path, f.tell())
+        f.write(_RECORD_HEADER.pack(MAGIC, len(payload)))
+        offset = f.tell()
+        f.write(payload)
+        return path, offset
+
+    def _write_file(self, shard: str, kit_id: str, payload: bytes) -> Path:
+        directory = self.root / shard[:2] / shard[2:4]
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{kit_id}.json.z"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return path
+
+    # ---------------------------
+    # Reading
+    # ---------------------------
+    def get(self, kit_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, offset, length FROM kits WHERE kit_id=?", (kit_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        path, offset, length = row
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            payload = os.pread(fd, length, offset)
+        finally:
+            os.close(fd)
+        return decode_kit(payload)
+
+    def list_package(self, package: str, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kit_id, created_at, length FROM kits WHERE package=?"
+                " ORDER BY created_at DESC LIMIT ?", (package, limit)
+            ).fetchall()
+        return [{"kit_id": k, "created_at": c, "bytes": n} for k, c, n in rows]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats, format=self.fmt, pending=self._queue.qsize())
+
+    def close(self) -> None:
+        """Flush everything queued, then stop the writer."""
+        self._queue.put(_STOP)
+        self._thread.join()
+        for _, f in self._segments.values():
+            f.close()
+        self._segments.clear()
+
+
+def scan_segment(path: str):
+    """Yield (offset, kit) for every record in a segment file (index rebuilds)."""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            magic, length = _RECORD_HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: bad record at {f.tell() - _RECORD_HEADER.size}")
+            offset = f.tell()
+            payload = f.read(length)
+            if len(payload) < length:
+                return   # torn tail write
+            yield offset, decode_kit(payload)
+
+
+_store: Optional[EvidenceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_evidence_store() -> EvidenceStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EvidenceStore()
+        return _store
+
+
+def close_evidence_store() -> None:
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        store.close()
@@ -0,0 +1,179 @@
+# backend/services/file_handler.py
+"""
+Upload storage for queued scans: files are stored under UPLOAD_DIR,
+named by their SHA-256 plus a per-upload token, and deleted with
+discard_upload() once their scan is over. Every upload gets its own file,
+so finishing one scan never pulls the APK from under a concurrent scan of
+the same content.
+
+The multipart request body is parsed as it arrives: the file part is
+hashed and written straight to its UPLOAD_DIR file in UPLOAD_CHUNK_BYTES
+writes, so the upload is neither held in memory nor spooled to a
+temporary file first, and the analyzer opens the stored file in place.
+MAX_UPLOAD_BYTES is enforced in the receive loop, so an oversized body
+is rejected as soon as it crosses the limit.
+"""
+
+import os
+import uuid
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable, List
+
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from backend.confi import UPLOAD_DIR, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES
+
+# multipart boundaries and part headers on top of the file itself
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+def max_body_bytes(max_bytes: int = MAX_UPLOAD_BYTES) -> int:
+    """Largest request body that can carry a max_bytes file (0: no limit)."""
+    return max_bytes + _MULTIPART_OVERHEAD if max_bytes else 0
+
+
+class UploadTooLarge(Exception):
+    """Raised as soon as an upload grows past MAX_UPLOAD_BYTES."""
+
+
+class BadUpload(Exception):
+    """The request body is not multipart/form-data with a file part."""
+
+
+def _finalize(tmp: Path, sha256: str, suffix: str) -> Path:
+    target = Path(UPLOAD_DIR) / f"{sha256}.{tmp.stem}{suffix}"
+    os.replace(tmp, target)
+    return target
+
+
+class _FilePart:
+    """MultipartParser callbacks collecting the bytes of one named file part."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.filename: Optional[str] = None
+        self.found = False
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        # file bytes parsed but not written yet, and their total size
+        self.pending: List[bytes] = []
+        self.buffered = 0
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._wanted = False
+
+    def callbacks(self) -> Dict[str, Any]:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field_data,
+            "on_header_value": self._header_value_data,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def _part_begin(self):
+        self._disposition = b""
+        self._header_field = self._header_value = b""
+        self._wanted = False
+
+    def _header_field_data(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _header_value_data(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("latin-1")
+        # only the first part with that name and a filename is stored
+        if name == self.field and b"filename" in options and not self.found:
+            self._wanted = True
+            self.found = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+
+    def _part_data(self, data, start, end):
+        if self._wanted:
+            chunk = bytes(data[start:end])
+            self.size += len(chunk)
+            self.sha256.update(chunk)
+            self.pending.append(chunk)
+            self.buffered += len(chunk)
+
+    def take(self) -> bytes:
+        data = b"".join(self.pending)
+        self.pending, self.buffered = [], 0
+        return data
+
+    def _part_end(self):
+        self._wanted = False
+
+
+async def save_upload_stream(request: Request,
+                             field: str = "file",
+                             max_bytes: int = MAX_UPLOAD_BYTES,
+                             keep_suffixes: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Parse a multipart/form-data request body and store its `field` file
+    part under UPLOAD_DIR, hashing it on the way.
+    Returns {"path", "sha256", "size", "filename"}. The stored file keeps
+    the upload's extension if it is in keep_suffixes, else ".apk".
+    Raises UploadTooLarge or BadUpload; nothing is left on disk either way.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise BadUpload("Expected a multipart/form-data body")
+
+    Path(UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
+    tmp = Path(UPLOAD_DIR) / f"{uuid.uuid4().hex}.part"
+
+    part = _FilePart(field)
+    parser = MultipartParser(boundary, part.callbacks())
+    body_limit = max_body_bytes(max_bytes)
+
+    received = 0
+    try:
+        with open(tmp, "wb") as out:
+            async for body in request.stream():
+                received += len(body)
+                if body_limit and received > body_limit:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                try:
+                    parser.write(body)
+                except Exception as e:
+                    raise BadUpload(f"Malformed multipart body: {e}")
+                if max_bytes and part.size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+
+                if part.buffered >= UPLOAD_CHUNK_BYTES:
+                    await asyncio.to_thread(out.write, part.take())
+            parser.finalize()
+            if part.pending:
+                await asyncio.to_thread(out.write, part.take())
+        if not part.found:
+            raise BadUpload(f"Missing file field {field!r}")
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    suffix = Path(part.filename or "").suffix.lower()
+    suffix = suffix if suffix in tuple(keep_suffixes) else ".apk"
+    sha256 = part.sha256.hexdigest()
+    target = await asyncio.to_thread(_finalize, tmp, sha256, suffix)
+    return {"path": str(target), "sha256": sha256, "size": part.size, "filename": part.filename}
+
+
+def discard_upload(path: str) -> None:
+    """Delete a stored upload whose scan is over (already gone is fine)."""
+    Path(path).unlink(missing_ok=True)
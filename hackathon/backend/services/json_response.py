@@ -0,0 +1,18 @@
+# backend/services/json_response.py
+"""
+JSONResponse rendered with analysis_engine.json_codec (orjson when
+installed). It is the app's default response class; routes returning
+large reports construct it directly, which also skips FastAPI's
+jsonable_encoder pass over the whole document.
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from analysis_engine import json_codec
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps(content)
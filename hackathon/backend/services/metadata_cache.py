@@ -0,0 +1,226 @@
+# backend/services/metadata_cache.py
+"""
+Two-level cache for Play Store metadata: in-process LRU in front of an
+optional SQLite file, with TTL + stale-while-revalidate.
+
+- fresh   (age < ttl):              served from cache
+- stale   (age < ttl + stale_ttl):  served from cache, refreshed in background
+- expired / missing:                fetched inline
+Concurrent callers for the same key share one fetch, and a failed fetch
+falls back to whatever copy is cached, however old. get_or_fetch_async()
+is the same for coroutine fetchers: waiters await the leader's future,
+and stale entries are refreshed in a task rather than a thread. Its
+SQLite reads and writes run in a worker thread; in-memory hits are
+served on the event loop.
+"""
+
+import asyncio
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Tuple, Awaitable, Set
+
+from analysis_engine import json_codec
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class MetadataCache:
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int,
+                 disk_path: Optional[str] = None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0,
+                      "fetches": 0, "fetch_errors": 0, "fallbacks": 0, "coalesced": 0}
+
+        self._mem: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+        self._ainflight: Dict[str, asyncio.Future] = {}
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+        self._conn = None
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(disk_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                " key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._conn.commit()
+
+    # ---------------------------
+    # Storage layers
+    # ---------------------------
+    def _load_locked(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        entry = self._mem.get(key)
+        if entry is not None:
+            self._mem.move_to_end(key)
+            return entry
+
+        if self._conn is not None:
+            row = self._conn.execute(
+                "SELECT fetched_at, payload FROM metadata WHERE key=?", (key,)
+            ).fetchone()
+            if row is not None:
+                entry = (row[0], json_codec.loads(row[1]))
+                self._remember_locked(key, entry)
+                return entry
+        return None
+
+    def _remember_locked(self, key: str, entry: Tuple[float, Dict[str, Any]]) -> None:
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _store(self, key: str, value: Dict[str, Any]) -> None:
+        entry = (time.time(), value)
+        with self._lock:
+            self._remember_locked(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?)",
+                    (key, entry[0], json_codec.dumps_text(value)),
+                )
+                self._conn.commit()
+
+    # ---------------------------
+    # Fetch (single-flight)
+    # ---------------------------
+    def _fetch(self, key: str, fetch: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            return flight.value
+
+        value = None
+        try:
+            self.stats["fetches"] += 1
+            value = fetch()
+            if value is not None:
+                self._store(key, value)
+            else:
+                self.stats["fetch_errors"] += 1
+        except Exception:
+            self.stats["fetch_errors"] += 1
+        finally:
+            flight.value = value
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+        return value
+
+    def _refresh_in_background(self, key: str, fetch) -> None:
+        with self._lock:
+            if key in self._inflight:
+                return
+        threading.Thread(target=self._fetch, args=(key, fetch), daemon=True).start()
+
+    async def _fetch_async(self, key: str,
+                           fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        flight = self._ainflight.get(key)
+        if flight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(flight)
+
+        flight = self._ainflight[key] = asyncio.get_running_loop().create_future()
+        value = None
+        try:
+            self.stats["fetches"] += 1
+            value = await fetch()
+            if value is not None:
+                if self._conn is not None:
+                    await asyncio.to_thread(self._store, key, value)
+                else:
+                    self._store(key, value)
+            else:
+                self.stats["fetch_errors"] += 1
+        except Exception:
+            self.stats["fetch_errors"] += 1
+        finally:
+            self._ainflight.pop(key, None)
+            flight.set_result(value)
+        return value
+
+    def _refresh_in_task(self, key: str, fetch) -> None:
+        if key in self._ainflight:
+            return
+        task = asyncio.get_running_loop().create_task(self._fetch_async(key, fetch))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    def _lookup(self, key: str) -> Tuple[str, Optional[Tuple[float, Dict[str, Any]]]]:
+        """("fresh" | "stale" | "miss", entry), counting the hit / miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._load_locked(key)
+
+        if entry is not None:
+            age = now - entry[0]
+            if age < self.ttl:
+                self.stats["hits"] += 1
+                return "fresh", entry
+            if age < self.ttl + self.stale_ttl:
+                self.stats["stale_hits"] += 1
+                return "stale", entry
+
+        self.stats["misses"] += 1
+        return "miss", entry
+
+    def get_or_fetch(self, key: str,
+                     fetch: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        state, entry = self._lookup(key)
+        if state == "stale":
+            self._refresh_in_background(key, fetch)
+        if state != "miss":
+            return entry[1]
+
+        value = self._fetch(key, fetch)
+        if value is None and entry is not None:
+            # upstream down: an old answer beats no answer
+            self.stats["fallbacks"] += 1
+            return entry[1]
+        return value
+
+    async def get_or_fetch_async(self, key: str,
+                                 fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            on_disk_only = self._conn is not None and key not in self._mem
+        if on_disk_only:
+            state, entry = await asyncio.to_thread(self._lookup, key)
+        else:
+            state, entry = self._lookup(key)
+        if state == "stale":
+            self._refresh_in_task(key, fetch)
+        if state != "miss":
+            return entry[1]
+
+        value = await self._fetch_async(key, fetch)
+        if value is None and entry is not None:
+            self.stats["fallbacks"] += 1
+            return entry[1]
+        return value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._mem)
+        return dict(self.stats, entries=size, ttl=self.ttl, stale_ttl=self.stale_ttl)
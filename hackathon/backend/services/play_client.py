@@ -0,0 +1,184 @@
+# backend/services/play_client.py
+"""
+Async Play Store detail-page fetcher.
+
+One shared httpx.AsyncClient (keep-alive connection pool) per event loop
+replaces google_play_scraper's urlopen-per-call. Per host:
+
+- at most PLAY_HTTP_PER_HOST requests in flight (semaphore);
+- requests are spaced to PLAY_RATE_LIMIT per second, each slot shifted
+  by a random jitter so concurrent callers do not fire in lockstep;
+- 429 / 5xx / transport errors are retried PLAY_HTTP_RETRIES times with
+  exponential backoff and full jitter (Retry-After is honoured);
+- a 404 is retried once without the country, like google_play_scraper.
+
+The page is parsed with google_play_scraper's own parse_dom, so results
+are identical to the synchronous path. PLAY_BASE_URL points the client
+at a stub (scripts/play_stub.py) for tests and benchmarks.
+"""
+
+import time
+import random
+import asyncio
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from google_play_scraper.features.app import parse_dom
+
+from analysis_engine.metrics import PLAYSTORE_FETCH_SECONDS
+from backend.confi import (
+    PLAY_BASE_URL, PLAY_HTTP_MAX_CONNECTIONS, PLAY_HTTP_PER_HOST, PLAY_HTTP_TIMEOUT,
+    PLAY_HTTP_RETRIES, PLAY_HTTP_BACKOFF, PLAY_RATE_LIMIT, PLAY_RATE_JITTER,
+)
+
+DETAIL_PATH = "/store/apps/details"
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+_MAX_BACKOFF = 30.0
+
+
+class _HostLimiter:
+    """Concurrency cap + jittered request spacing for one host."""
+
+    def __init__(self, concurrency: int, rate: float, jitter: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.jitter = jitter
+        self._next_slot = 0.0
+
+    async def wait_turn(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        # reserve the next slot before sleeping, so callers queue up in order
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        delay = slot - now + random.uniform(0, self.jitter * self.interval)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class PlayStoreClient:
+    def __init__(self, base_url: str = PLAY_BASE_URL,
+                 max_connections: int = PLAY_HTTP_MAX_CONNECTIONS,
+                 per_host: int = PLAY_HTTP_PER_HOST,
+                 timeout: float = PLAY_HTTP_TIMEOUT,
+                 retries: int = PLAY_HTTP_RETRIES,
+                 backoff: float = PLAY_HTTP_BACKOFF,
+                 rate_limit: float = PLAY_RATE_LIMIT,
+                 rate_jitter: float = PLAY_RATE_JITTER,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url.rstrip("/")
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.rate_limit = rate_limit
+        self.rate_jitter = rate_jitter
+        self.stats = {"requests": 0, "retries": 0, "not_found": 0, "errors": 0}
+        self._limiters: Dict[str, _HostLimiter] = {}
+        self._http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            headers={"User-Agent": "Mozilla/5.0 (compatible; fake-app-detector)"},
+            follow_redirects=True,
+            transport=transport,
+        )
+
+    def _limiter(self, url: str) -> _HostLimiter:
+        host = urlsplit(url).netloc
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = _HostLimiter(
+                self.per_host, self.rate_limit, self.rate_jitter)
+        return limiter
+
+    async def _get(self, url: str, params: Dict[str, str]) -> Optional[str]:
+        """
+        GET with retries; returns the body, None on 404. Raises the last
+        error once retries are exhausted.
+        """
+        limiter = self._limiter(url)
+        attempt = 0
+        while True:
+            retry_after = None
+            async with limiter.semaphore:
+                await limiter.wait_turn()
+                self.stats["requests"] += 1
+                try:
+                    resp = await self._http.get(url, params=params)
+                    if resp.status_code == 404:
+                        return None
+                    if resp.status_code not in _RETRY_STATUS:
+                        resp.raise_for_status()
+                        return resp.text
+                    error: Exception = httpx.HTTPStatusError(
+                        f"HTTP {resp.status_code}", request=resp.request, response=resp)
+                    retry_after = resp.headers.get("Retry-After")
+                except httpx.TransportError as e:
+                    error = e
+
+            if attempt >= self.retries:
+                raise error
+            attempt += 1
+            self.stats["retries"] += 1
+            delay = random.uniform(0, min(_MAX_BACKOFF, self.backoff * 2 ** attempt))
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+
+    async def app_details(self, app_id: str, lang: str, country: str) -> Optional[Dict[str, Any]]:
+        """google_play_scraper.app() over the shared pool; None if not found."""
+        url = self.base_url + DETAIL_PATH
+        params = {"id": app_id, "hl": lang, "gl": country}
+        dom = await self._get(url, params)
+        if dom is None:
+            del params["gl"]
+            dom = await self._get(url, params)
+        if dom is None:
+            self.stats["not_found"] += 1
+            return None
+        return parse_dom(dom=dom, app_id=app_id, url=str(httpx.URL(url, params=params)))
+
+    async def fetch(self, app_id: str, lang: str, country: str) -> Optional[Dict[str, Any]]:
+        """app_details() that never raises, with the fetch latency metric."""
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await self.app_details(app_id, lang, country)
+        except Exception:
+            outcome = "error"
+            self.stats["errors"] += 1
+            return None
+        finally:
+            PLAYSTORE_FETCH_SECONDS.observe(time.perf_counter() - start, outcome=outcome)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+# asyncio primitives and pooled connections belong to one event loop
+_clients: Dict[int, Tuple[asyncio.AbstractEventLoop, PlayStoreClient]] = {}
+
+
+def get_play_client() -> PlayStoreClient:
+    """The shared client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(id(loop))
+    if entry is None or entry[0] is not loop:
+        entry = _clients[id(loop)] = (loop, PlayStoreClient())
+    return entry[1]
+
+
+async def close_play_client() -> None:
+    entry = _clients.pop(id(asyncio.get_running_loop()), None)
+    if entry is not None:
+        await entry[1].aclose()
+
+
+def play_client_stats() -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for _, client in list(_clients.values()):
+        for k, v in client.stats.items():
+            totals[k] = totals.get(k, 0) + v
+    return totals
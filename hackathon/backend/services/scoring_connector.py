@@ -1,10 +1,29 @@
 # backend/services/scoring_connector.py
 from analysis_engine.engine import analyze_store_only
+from analysis_engine.metrics import time_into
+from analysis_engine.reports.rescore import extract_apk_features, apk_store_features
+from backend.services.db_service import record_scan
 
-def call_scoring_engine(play_data):
+def call_scoring_engine(play_data, profile=None, kind=None, apk_report=None, timings=None):
     """
     Thin adaptor: call analysis engine and return a risk score dict.
+    play_data: Play Store metadata; None for an APK that was not looked
+    up on the store (its package name stands in).
+    profile: weight profile name (None -> default).
+    kind: "url" / "apk" to store the scan's raw features and sub-scores
+    for later rescoring (report["scan_id"]); None stores nothing.
+    apk_report: analyze_apk_full()'s result; a successful one adds the
+    APK signals to the score.
+    timings: a stage breakdown to add "scoring" / "persist" to.
     """
-    report = analyze_store_only(play_data)
+    deep = (apk_report or {}).get("apk") if (apk_report or {}).get("success") else None
+    apk = extract_apk_features(deep) if deep else None
+    if play_data is None:
+        play_data = apk_store_features(apk) if apk else {}
+    with time_into(timings, "scoring"):
+        report = analyze_store_only(play_data, profile, apk=apk)
     # report should contain 'risk_score' (0..100)
+    if kind:
+        with time_into(timings, "persist"):
+            report["scan_id"] = record_scan(kind, play_data, report, apk_report)
     return report
@@ -1,17 +1,81 @@
 # backend/services/url_scraper.py
 """
 Light wrapper for Play Store metadata fetch.
-In production use google-play-scraper (node) or google_play_scraper (python) with retries, caching and regional fallback.
+Uses google_play_scraper (python) behind an LRU + on-disk cache with TTL,
+stale-while-revalidate and request coalescing (see metadata_cache.py).
+fetch_playstore_metadata_async() is the event-loop version, backed by
+the pooled async client in play_client.py; both share the cache.
 """
-from google_play_scraper.features.app_details import app_details
+import re
+import time
+import asyncio
+import threading
+from typing import Optional
 
-def fetch_playstore_metadata(package_or_url: str):
-    # Attempt to extract package id
-    import re
+from google_play_scraper import app as app_details
+
+from analysis_engine.metrics import PLAYSTORE_FETCH_SECONDS
+from backend.confi import (PLAY_LANG, PLAY_COUNTRY, PLAY_CACHE_TTL, PLAY_CACHE_STALE,
+                           PLAY_CACHE_MAX_ENTRIES, PLAY_CACHE_PATH)
+from backend.services.metadata_cache import MetadataCache
+from backend.services.play_client import get_play_client
+
+_cache: Optional[MetadataCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """The shared cache, created (with its PLAY_CACHE_PATH file) on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MetadataCache(ttl=PLAY_CACHE_TTL,
+                                   stale_ttl=PLAY_CACHE_STALE,
+                                   max_entries=PLAY_CACHE_MAX_ENTRIES,
+                                   disk_path=PLAY_CACHE_PATH or None)
+        return _cache
+
+
+def extract_package_id(package_or_url: str) -> str:
     m = re.search(r"id=([A-Za-z0-9_.]+)", package_or_url)
-    pkg = m.group(1) if m else package_or_url
+    return m.group(1) if m else package_or_url
+
+
+def _fetch_uncached(pkg: str, lang: str, country: str):
+    start = time.perf_counter()
+    outcome = "ok"
     try:
-        data = app_details(pkg, lang="en", country="in")
-        return data
+        return app_details(pkg, lang=lang, country=country)
     except Exception:
+        outcome = "error"
         return None
+    finally:
+        PLAYSTORE_FETCH_SECONDS.observe(time.perf_counter() - start, outcome=outcome)
+
+
+def fetch_playstore_metadata(package_or_url: str, lang: str = PLAY_LANG,
+                             country: str = PLAY_COUNTRY, use_cache: bool = True):
+    # Attempt to extract package id
+    pkg = extract_package_id(package_or_url)
+    if not use_cache:
+        return _fetch_uncached(pkg, lang, country)
+
+    key = f"{pkg}|{lang}|{country}"
+    return get_metadata_cache().get_or_fetch(key, lambda: _fetch_uncached(pkg, lang, country))
+
+
+async def fetch_playstore_metadata_async(package_or_url: str, lang: str = PLAY_LANG,
+                                         country: str = PLAY_COUNTRY, use_cache: bool = True):
+    pkg = extract_package_id(package_or_url)
+    client = get_play_client()
+    if not use_cache:
+        return await client.fetch(pkg, lang, country)
+
+    key = f"{pkg}|{lang}|{country}"
+    # the first call opens the SQLite file: do that off the event loop
+    cache = _cache or await asyncio.to_thread(get_metadata_cache)
+    return await cache.get_or_fetch_async(key, lambda: client.fetch(pkg, lang, country))
+
+
+def metadata_cache_stats():
+    return get_metadata_cache().snapshot()
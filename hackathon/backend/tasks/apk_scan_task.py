@@ -0,0 +1,89 @@
+# backend/tasks/apk_scan_task.py
+"""
+Deep APK scan job: analyze an uploaded APK (or split bundle) in the process
+pool and score it.
+"""
+
+import os
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from analysis_engine.engine import (
+    analyze_apk_full, match_known_icons, check_cert_reputation, find_similar_apks,
+)
+from analysis_engine.apk_bundle import is_bundle
+from analysis_engine.metrics import record_analysis
+from analysis_engine.reports.apk_report import project_apk_result
+from backend.confi import APK_JOB_TIMEOUT
+from backend.services.analysis_pool import submit, map_in_pool, PoolSaturated
+from backend.services.file_handler import discard_upload
+from backend.services.scoring_connector import call_scoring_engine
+from backend.tasks.workers import register_task, RetryLater
+
+
+def _discard(payload):
+    discard_upload(payload["path"])
+
+
+@register_task("apk_scan", cleanup=_discard)
+def run_apk_scan(payload, progress):
+    """
+    payload: {"path", "sha256", "filename", "level", "xref", "timings", "view"}
+    """
+    path = payload["path"]
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Uploaded APK is gone: {path}")
+
+    progress(0.1, "analyzing")
+    start = time.perf_counter()
+    if is_bundle(path):
+        # the job thread fans the splits out to the pool and merges them
+        try:
+            apk_report = analyze_apk_full(apk_path=path, apk_sha256=payload.get("sha256"),
+                                          level=payload.get("level", "resources"),
+                                          xref=payload.get("xref", False),
+                                          split_map=map_in_pool)
+        except PoolSaturated as e:
+            raise RetryLater(str(e))
+        return _finish(payload, apk_report, time.perf_counter() - start, progress)
+
+    try:
+        fut = submit(analyze_apk_full, apk_path=path,
+                     apk_sha256=payload.get("sha256"),
+                     level=payload.get("level", "resources"),
+                     xref=payload.get("xref", False))
+    except PoolSaturated as e:
+        raise RetryLater(str(e))
+
+    try:
+        apk_report = fut.result(timeout=APK_JOB_TIMEOUT)
+    except FutureTimeout:
+        fut.cancel()
+        raise TimeoutError(f"APK analysis exceeded {APK_JOB_TIMEOUT}s")
+    return _finish(payload, apk_report, time.perf_counter() - start, progress)
+
+
+def _finish(payload, apk_report, wall, progress):
+    if not apk_report.get("success"):
+        # a parse error will not go away on retry
+        record_analysis("apk", apk_report, wall)
+        return {"file": payload.get("filename"), "apk_metadata": apk_report, "score": None}
+
+    progress(0.7, "reputation")
+    match_known_icons(apk_report)
+    check_cert_reputation(apk_report)
+    find_similar_apks(apk_report)
+
+    progress(0.8, "scoring")
+    final_score = call_scoring_engine(None, kind="apk", apk_report=apk_report,
+                                      timings=apk_report.get("timings"))
+    breakdown = record_analysis("apk", apk_report, wall)
+
+    result = {
+        "file": payload.get("filename"),
+        "apk_metadata": project_apk_result(apk_report, payload.get("view", "full")),
+        "score": final_score
+    }
+    if payload.get("timings"):
+        result["timings"] = breakdown
+    return result
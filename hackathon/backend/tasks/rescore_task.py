@@ -0,0 +1,21 @@
+# backend/tasks/rescore_task.py
+"""
+Rescore job: replay stored scans through the current heuristics and
+weight profiles, recomputing only the signals whose inputs changed.
+"""
+
+from backend.services.db_service import rescore_scans
+from backend.tasks.workers import register_task
+
+
+@register_task("rescore")
+def run_rescore(payload, progress):
+    """
+    payload: {"profile", "scan_ids"}
+    """
+    def report(done, total):
+        progress(done / total if total else 1.0, f"rescored {done}/{total}")
+
+    return rescore_scans(profile=payload.get("profile"),
+                         scan_ids=payload.get("scan_ids"),
+                         progress=report)
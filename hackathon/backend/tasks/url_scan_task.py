@@ -0,0 +1,39 @@
+# backend/tasks/url_scan_task.py
+"""
+Store-only scan job: fetch Play Store metadata and score it.
+"""
+
+from analysis_engine.metrics import StageTimer, record_analysis
+from backend.services.url_scraper import fetch_playstore_metadata
+from backend.services.scoring_connector import call_scoring_engine
+from backend.tasks.workers import register_task
+
+
+@register_task("url_scan")
+def run_url_scan(payload, progress):
+    """
+    payload: {"url", "profile", "timings"}
+    """
+    pkg = payload["url"]
+
+    progress(0.1, "fetching")
+    timer = StageTimer()
+    with timer.stage("fetch"):
+        play_data = fetch_playstore_metadata(pkg)
+    if not play_data:
+        record_analysis("url", {"success": False, "timings": timer.result()})
+        # network hiccups are retried by the worker pool
+        raise LookupError("Play Store metadata not found")
+
+    progress(0.7, "scoring")
+    timings = timer.result()
+    score = call_scoring_engine(play_data, payload.get("profile"), kind="url", timings=timings)
+    breakdown = record_analysis("url", {"success": True, "timings": timings})
+
+    result = {
+        "package": play_data.get("appId", pkg),
+        "score": score
+    }
+    if payload.get("timings"):
+        result["timings"] = breakdown
+    return result
@@ -0,0 +1,381 @@
+# backend/tasks/workers.py
+"""
+Local job queue + worker pool for deep scans.
+
+Jobs live in a SQLite table, so no external broker is needed and queued
+work survives a restart. Worker threads claim the highest-priority ready
+job, run the task registered for its kind, and record progress and the
+final result. Failed jobs are retried with exponential backoff up to
+JOB_MAX_ATTEMPTS.
+
+A claimed job is leased to the claiming queue (its owner) for
+JOB_LEASE_SECONDS; the pool renews the lease of every job it is running.
+Jobs whose lease ran out - their process died - go back to the queue, so
+several processes can share one jobs database without stealing each
+other's running work.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable
+
+from analysis_engine import json_codec
+from backend.confi import (JOBS_DB_PATH, JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_RETRY_BACKOFF,
+                           JOB_LEASE_SECONDS)
+
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class RetryLater(Exception):
+    """Raised by a task to be re-queued without counting as a failed attempt."""
+
+
+class JobQueue:
+    """
+    SQLite-backed priority queue. Higher priority runs first, FIFO within
+    a priority. Safe to use from several threads.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH, lease: float = JOB_LEASE_SECONDS,
+                 owner: Optional[str] = None):
+        self.path = path
+        self.lease = lease
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " priority INTEGER NOT NULL DEFAULT 0,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " max_attempts INTEGER NOT NULL,"
+            " progress REAL NOT NULL DEFAULT 0,"
+            " stage TEXT,"
+            " result TEXT,"
+            " error TEXT,"
+            " owner TEXT,"
+            " lease_until REAL,"
+            " available_at REAL NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        # databases created before leases: add the columns in place
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column in ("owner TEXT", "lease_until REAL"):
+            if column.split()[0] not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_ready"
+            " ON jobs(status, priority DESC, available_at, created_at)"
+        )
+        self._conn.commit()
+
+    # ---------------------------
+    # Producer side
+    # ---------------------------
+    def submit(self, kind: str, payload: Dict[str, Any], priority: int = 0,
+               max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, priority, status, max_attempts,"
+                " available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), priority, QUEUED, max_attempts, now, now, now),
+            )
+            self._conn.commit()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "priority": row["priority"],
+            "attempts": row["attempts"],
+            "progress": row["progress"],
+            "stage": row["stage"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        if row["result"] is not None:
+            job["result"] = json_codec.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def depth(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    # ---------------------------
+    # Worker side
+    # ---------------------------
+    def claim(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, payload, attempts FROM jobs"
+                " WHERE status=? AND available_at<=?"
+                " ORDER BY priority DESC, created_at ASC LIMIT 1",
+                (QUEUED, now),
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._conn.execute(
+                "UPDATE jobs SET status=?, attempts=attempts+1, owner=?, lease_until=?,"
+                " updated_at=? WHERE id=?",
+                (RUNNING, self.owner, now + self.lease, now, row["id"]),
+            )
+            self._conn.commit()
+
+        return {"id": row["id"], "kind": row["kind"],
+                "payload": json.loads(row["payload"]), "attempts": row["attempts"] + 1}
+
+    def set_progress(self, job_id: str, progress: float, stage: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET progress=?, stage=?, lease_until=?, updated_at=?"
+                " WHERE id=? AND owner=?",
+                (progress, stage, now + self.lease, now, job_id, self.owner),
+            )
+            self._conn.commit()
+
+    def renew_leases(self, job_ids) -> int:
+        """Extend the lease of the given running jobs this queue owns."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        marks = ",".join("?" * len(job_ids))
+        with self._lock:
+            cur = self._conn.execute(
+                f"UPDATE jobs SET lease_until=? WHERE status=? AND owner=? AND id IN ({marks})",
+                (time.time() + self.lease, RUNNING, self.owner, *job_ids),
+            )
+            self._conn.commit()
+        return cur.rowcount
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> bool:
+        """Store the result; False if the lease was lost and the job re-queued meanwhile."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status=?, progress=1, stage='done', result=?, error=NULL,"
+                " owner=NULL, lease_until=NULL, updated_at=? WHERE id=? AND status=? AND owner=?",
+                (DONE, json_codec.dumps_text(result), time.time(), job_id, RUNNING, self.owner),
+            )
+            self._conn.commit()
+        return cur.rowcount > 0
+
+    def fail(self, job_id: str, error: str, retry: bool = True,
+             count_attempt: bool = True) -> Optional[str]:
+        """
+        Re-queue the job (with backoff) or mark it failed; returns the new
+        status, or None if the job is unknown or no longer leased to us.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id=? AND status=? AND owner=?",
+                (job_id, RUNNING, self.owner),
+            ).fetchone()
+            if row is None:
+                return None
+
+            attempts = row["attempts"] if count_attempt else row["attempts"] - 1
+            if retry and attempts < row["max_attempts"]:
+                delay = JOB_RETRY_BACKOFF ** max(attempts, 1)
+                self._conn.execute(
+                    "UPDATE jobs SET status=?, attempts=?, error=?, stage='retrying',"
+                    " owner=NULL, lease_until=NULL, available_at=?, updated_at=? WHERE id=?",
+                    (QUEUED, attempts, error, now + delay, now, job_id),
+                )
+                status = QUEUED
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status=?, error=?, owner=NULL, lease_until=NULL,"
+                    " updated_at=? WHERE id=?",
+                    (FAILED, error, now, job_id),
+                )
+                status = FAILED
+            self._conn.commit()
+        return status
+
+    def requeue_expired(self) -> int:
+        """
+        Running jobs whose lease ran out (their worker died, or they were
+        claimed before leases existed) go back to the queue.
+        """
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status=?, owner=NULL, lease_until=NULL, updated_at=?"
+                " WHERE status=? AND (lease_until IS NULL OR lease_until<?)",
+                (QUEUED, now, RUNNING, now),
+            )
+            self._conn.commit()
+        return cur.rowcount
+
+
+# ============================================================
+# Worker pool
+# ============================================================
+
+# kind -> task(payload, progress) -> result dict
+TASKS: Dict[str, Callable[[Dict[str, Any], Callable[[float, str], None]], Dict[str, Any]]] = {}
+# kind -> cleanup(payload), run once the job is done or has failed for good
+CLEANUPS: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+
+
+def register_task(kind: str, cleanup: Optional[Callable[[Dict[str, Any]], None]] = None):
+    def wrap(fn):
+        TASKS[kind] = fn
+        if cleanup is not None:
+            CLEANUPS[kind] = cleanup
+        return fn
+    return wrap
+
+
+class WorkerPool:
+    def __init__(self, queue: JobQueue, workers: int = JOB_WORKERS, poll_interval: float = 0.2):
+        self.queue = queue
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+        # ids of the jobs this pool is running, whose leases it renews
+        self._active = set()
+        self._active_lock = threading.Lock()
+
+    def start(self) -> None:
+        self.queue.requeue_expired()
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"scan-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat, name="scan-worker-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _heartbeat(self) -> None:
+        # renew our leases, and pick up the jobs of workers that died
+        while not self._stop.wait(self.queue.lease / 3):
+            try:
+                with self._active_lock:
+                    active = list(self._active)
+                self.queue.renew_leases(active)
+                self.queue.requeue_expired()
+            except Exception:
+                logger.exception("Job lease heartbeat failed")
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            with self._active_lock:
+                self._active.add(job["id"])
+            try:
+                self._run(job)
+            finally:
+                with self._active_lock:
+                    self._active.discard(job["id"])
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        task = TASKS.get(job["kind"])
+        if task is None:
+            self.queue.fail(job_id, f"Unknown job kind: {job['kind']}", retry=False)
+            return
+
+        def progress(value: float, stage: str = None):
+            self.queue.set_progress(job_id, value, stage)
+
+        try:
+            result = task(job["payload"], progress)
+        except RetryLater as e:
+            status = self.queue.fail(job_id, str(e), count_attempt=False)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, job["kind"])
+            status = self.queue.fail(job_id, f"{type(e).__name__}: {e}")
+        else:
+            status = DONE if self.queue.complete(job_id, result) else None
+
+        if status is None:
+            # the lease ran out and the job was re-queued: its next run owns the cleanup
+            logger.warning("Job %s (%s) lost its lease before finishing", job_id, job["kind"])
+            return
+        cleanup = CLEANUPS.get(job["kind"])
+        if cleanup is not None and status != QUEUED:
+            try:
+                cleanup(job["payload"])
+            except Exception:
+                logger.exception("Cleanup of job %s (%s) failed", job_id, job["kind"])
+
+
+_queue: Optional[JobQueue] = None
+_pool: Optional[WorkerPool] = None
+_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    global _queue
+    with _lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+def start_workers() -> None:
+    global _pool
+    # importing the task modules registers them
+    from backend.tasks import apk_scan_task, url_scan_task, rescore_task  # noqa: F401
+
+    with _lock:
+        if _pool is not None:
+            return
+    pool = WorkerPool(get_queue())
+    pool.start()
+    with _lock:
+        _pool = pool
+
+
+def stop_workers() -> None:
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.stop()
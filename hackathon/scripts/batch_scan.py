@@ -0,0 +1,59 @@
+# scripts/batch_scan.py
+
+"""
+Store-only triage of a list of package ids / Play URLs from the command line.
+
+    python scripts/batch_scan.py packages.txt -o results.ndjson -c 32
+
+Input: one package id or Play URL per line ("-" reads stdin).
+Output: one NDJSON result per line, in completion order.
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.confi import BATCH_CONCURRENCY  # noqa: E402
+from backend.services.batch_scan import scan_many_ndjson  # noqa: E402
+from backend.database.connection import init_db  # noqa: E402
+from backend.services.db_service import install_brand_index  # noqa: E402
+
+
+def _read_items(path: str):
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with stream:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+async def _run(args):
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    count = 0
+    start = time.time()
+    try:
+        async for line in scan_many_ndjson(_read_items(args.input), args.concurrency, args.profile):
+            out.write(line)
+            count += 1
+            if args.output and count % 100 == 0:
+                print(f"{count} scanned ({count / (time.time() - start):.1f}/s)", file=sys.stderr)
+    finally:
+        if args.output:
+            out.close()
+    print(f"done: {count} items in {time.time() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch store-only scan")
+    parser.add_argument("input", help="file with one package id / URL per line, or -")
+    parser.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument("-p", "--profile", help="weight profile name (default: default)")
+    init_db()
+    install_brand_index()
+    asyncio.run(_run(parser.parse_args()))
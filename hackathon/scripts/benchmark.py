@@ -0,0 +1,367 @@
+# scripts/benchmark.py
+
+"""
+Benchmark harness for the analysis engine and the API.
+
+    python scripts/benchmark.py                       # every suite, default sizes
+    python scripts/benchmark.py -s apk -s store -n 200
+    python scripts/benchmark.py -o bench.json --compare storage/benchmarks/bench-prev.json
+
+Suites:
+  apk     analyze_apk_full on synthetic APKs (small / medium / large), per level,
+          and on split bundles (sequential vs the process pool)
+  store   analyze_store_only and analyze_store_batch on synthetic Play metadata
+  icon    launcher icon hashes (pHash / dHash / aHash / colour histogram), uncached and cached
+  names   package/title similarity against a 10k-brand index
+  api     in-process load test of the FastAPI app (store-only + sync APK scans)
+
+Each benchmark reports throughput, latency percentiles (p50 / p90 / p99)
+and peak Python heap (tracemalloc, measured on a separate pass so it does
+not skew latency). Results are written as JSON (default
+storage/benchmarks/bench-<timestamp>.json); --compare prints the change
+against an earlier file.
+
+The run uses throwaway caches and databases in a temp directory, and the
+Play Store is replaced by scripts/play_stub.py on a local port: nothing
+touches the real store or the real storage/.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+import socket
+import argparse
+import platform
+import threading
+import subprocess
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+SUITES = ("apk", "store", "icon", "names", "api")
+
+
+def _isolate_storage() -> str:
+    """Point every cache / DB at a temp dir before the backend is imported."""
+    tmp = tempfile.mkdtemp(prefix="bench-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp}/app.db")
+    os.environ.setdefault("JOBS_DB_PATH", f"{tmp}/jobs.sqlite3")
+    os.environ.setdefault("UPLOAD_DIR", f"{tmp}/uploads")
+    os.environ.setdefault("APK_CACHE_PATH", f"{tmp}/apk_results.sqlite3")
+    os.environ.setdefault("PLAY_CACHE_PATH", f"{tmp}/play_metadata.sqlite3")
+    os.environ.setdefault("ICON_INDEX_PATH", f"{tmp}/icon_index.sqlite3")
+    os.environ.setdefault("APK_SIMILARITY_PATH", f"{tmp}/apk_similarity.sqlite3")
+    os.environ.setdefault("EVIDENCE_DIR", f"{tmp}/evidence_kits")
+    # the API suite fetches from a local stub store, unthrottled
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    os.environ.setdefault("PLAY_BASE_URL", f"http://127.0.0.1:{port}")
+    os.environ.setdefault("PLAY_RATE_LIMIT", "0")
+    return tmp
+
+
+def _start_play_stub(apps) -> None:
+    import uvicorn
+    from urllib.parse import urlsplit
+    from scripts.play_stub import PlayStub
+
+    url = urlsplit(os.environ["PLAY_BASE_URL"])
+    server = uvicorn.Server(uvicorn.Config(PlayStub(apps), host=url.hostname, port=url.port,
+                                           log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+
+# ---------------------------
+# Measurement
+# ---------------------------
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _summary(name: str, latencies: List[float], wall: float, items: int,
+             peak_bytes: Optional[int], extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    lat = sorted(latencies)
+    result = {
+        "name": name,
+        "calls": len(lat),
+        "items": items,
+        "wall_seconds": round(wall, 6),
+        "throughput_per_s": round(items / wall, 3) if wall else None,
+        "latency_ms": {
+            "mean": round(1000 * sum(lat) / len(lat), 4) if lat else None,
+            "p50": round(1000 * _percentile(lat, 50), 4),
+            "p90": round(1000 * _percentile(lat, 90), 4),
+            "p99": round(1000 * _percentile(lat, 99), 4),
+            "max": round(1000 * lat[-1], 4) if lat else None,
+        },
+        "peak_heap_bytes": peak_bytes,
+    }
+    if extra:
+        result.update(extra)
+    return result
+
+
+def bench(name: str, fn: Callable[[Any], Any], inputs: List[Any], warmup: int = 1,
+          items_per_call: int = 1, memory: bool = True) -> Dict[str, Any]:
+    """
+    Time fn(x) for every x in inputs, then (optionally) rerun a slice of
+    the inputs under tracemalloc for the peak heap.
+    """
+    for x in inputs[:warmup]:
+        fn(x)
+
+    latencies = []
+    start = time.perf_counter()
+    for x in inputs:
+        t = time.perf_counter()
+        fn(x)
+        latencies.append(time.perf_counter() - t)
+    wall = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        for x in inputs[:max(1, min(len(inputs), 20))]:
+            fn(x)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    result = _summary(name, latencies, wall, len(inputs) * items_per_call, peak)
+    print(f"  {name:<40} {result['throughput_per_s']:>12} /s   "
+          f"p50 {result['latency_ms']['p50']:>10} ms   p99 {result['latency_ms']['p99']:>10} ms",
+          file=sys.stderr)
+    return result
+
+
+# ---------------------------
+# Suites
+# ---------------------------
+
+def suite_apk(args) -> List[Dict[str, Any]]:
+    from analysis_engine.engine import analyze_apk_full
+    from scripts.synthetic import make_apk, make_bundle, APK_SIZES
+
+    results = []
+    for size in args.apk_sizes:
+        count = max(1, args.apk_count if size != "large" else max(1, args.apk_count // 5))
+        apks = [make_apk(**APK_SIZES[size], seed=i) for i in range(count)]
+        mean_bytes = sum(map(len, apks)) // len(apks)
+        for level in ("manifest", "resources", "full"):
+            r = bench(f"apk.{size}.{level}",
+                      lambda data: analyze_apk_full(apk_bytes=data, level=level, use_cache=False),
+                      apks)
+            r["apk_bytes"] = mean_bytes
+            results.append(r)
+        r = bench(f"apk.{size}.cache_hit",
+                  lambda data: analyze_apk_full(apk_bytes=data, level="full"),
+                  apks, warmup=len(apks))
+        r["apk_bytes"] = mean_bytes
+        results.append(r)
+
+    # split bundles: base + 3 feature splits of the same size, one after
+    # another vs fanned out to the APK process pool
+    from backend.services.analysis_pool import map_in_pool, shutdown_pool
+    size = "medium" if "medium" in args.apk_sizes else args.apk_sizes[0]
+    bundles = [make_bundle(**APK_SIZES[size], features=3, seed=i)
+               for i in range(max(1, args.apk_count // 5))]
+    for mode, split_map in (("sequential", None), ("pool", map_in_pool)):
+        r = bench(f"apk.bundle.{size}.{mode}",
+                  lambda data: analyze_apk_full(apk_bytes=data, level="full", use_cache=False,
+                                                split_map=split_map),
+                  bundles)
+        r["apk_bytes"] = sum(map(len, bundles)) // len(bundles)
+        results.append(r)
+    shutdown_pool()
+    return results
+
+
+def suite_store(args) -> List[Dict[str, Any]]:
+    from analysis_engine.engine import analyze_store_only, analyze_store_batch
+    from scripts.synthetic import make_play_metadata
+
+    apps = make_play_metadata(args.n, seed=1)
+    results = [bench("store.analyze_store_only", analyze_store_only, apps)]
+    table = make_play_metadata(args.n * 10, seed=2)
+    results.append(bench("store.analyze_store_batch", analyze_store_batch, [table] * 3,
+                         items_per_call=len(table)))
+    return results
+
+
+def suite_icon(args) -> List[Dict[str, Any]]:
+    from analysis_engine.icon_pipeline import hash_icon
+    from scripts.synthetic import make_icon
+
+    icons = [make_icon(seed=i) for i in range(args.n)]
+    return [
+        # decode + pHash / dHash / aHash / colour histogram
+        bench("icon.hashes", lambda data: hash_icon(data, use_cache=False), icons),
+        bench("icon.hashes.cached", hash_icon, icons, warmup=len(icons)),
+    ]
+
+
+def suite_names(args) -> List[Dict[str, Any]]:
+    from analysis_engine.brand_index import BrandIndex
+    from analysis_engine.name_similarity import check_package_label_similarity
+    from scripts.synthetic import make_play_metadata
+
+    rnd = random.Random(3)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    corpus = {"".join(rnd.choice(letters) for _ in range(rnd.randint(4, 14))) for _ in range(10000)}
+    index = BrandIndex(sorted(corpus))
+    apps = make_play_metadata(args.n, seed=4)
+    return [
+        bench("names.brand_index_query", lambda a: index.query(a["title"], k=3), apps),
+        bench("names.package_label_similarity",
+              lambda a: check_package_label_similarity(a, brand_index=index), apps),
+    ]
+
+
+def suite_api(args) -> List[Dict[str, Any]]:
+    import httpx
+    from scripts.synthetic import make_play_metadata, make_apk, APK_SIZES
+    from backend.main import app
+
+    apps = {a["appId"]: a for a in make_play_metadata(args.n, seed=5)}
+    _start_play_stub(list(apps.values()))
+
+    async def load(name, requests, concurrency):
+        latencies, statuses = [], {}
+        todo = list(requests)
+
+        async def worker(client):
+            while todo:
+                method, url, kwargs = todo.pop()
+                t = time.perf_counter()
+                r = await client.request(method, url, **kwargs)
+                latencies.append(time.perf_counter() - t)
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+            wall = time.perf_counter() - start
+        result = _summary(name, latencies, wall, len(latencies), None,
+                          {"concurrency": concurrency, "status_codes": statuses})
+        print(f"  {name:<40} {result['throughput_per_s']:>12} /s   "
+              f"p50 {result['latency_ms']['p50']:>10} ms   p99 {result['latency_ms']['p99']:>10} ms",
+              file=sys.stderr)
+        return result
+
+    async def run():
+        # the app's startup hooks (DB, brand index, workers) as under uvicorn
+        async with app.router.lifespan_context(app):
+            results = []
+            url_requests = [("POST", "/api/scan/url", {"json": {"url": pkg}}) for pkg in apps]
+            results.append(await load("api.scan_url", url_requests, args.concurrency))
+
+            apk = make_apk(**APK_SIZES["small"], seed=9)
+            apk_requests = [("POST", "/api/scan/apk/sync?level=full",
+                             {"files": {"file": (f"b{i}.apk", apk, "application/vnd.android.package-archive")}})
+                            for i in range(max(4, args.apk_count))]
+            results.append(await load("api.scan_apk_sync", apk_requests, min(args.concurrency, 4)))
+
+            results.append(await load("api.metrics", [("GET", "/metrics", {})] * 50, 4))
+            return results
+
+    return asyncio.run(run())
+
+
+# ---------------------------
+# Output / comparison
+# ---------------------------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    prev = {r["name"]: r for r in previous.get("results", [])}
+    print(f"\n{'benchmark':<40} {'throughput':>12} {'p50':>10} {'p99':>10}   (vs {previous['meta'].get('commit')})")
+    for r in current["results"]:
+        p = prev.get(r["name"])
+        if not p:
+            continue
+
+        def delta(a, b):
+            return f"{(a - b) / b * 100:+.1f}%" if a is not None and b else "n/a"
+
+        print(f"{r['name']:<40} {delta(r['throughput_per_s'], p['throughput_per_s']):>12} "
+              f"{delta(r['latency_ms']['p50'], p['latency_ms']['p50']):>10} "
+              f"{delta(r['latency_ms']['p99'], p['latency_ms']['p99']):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the analysis engine and API")
+    parser.add_argument("-s", "--suite", action="append", choices=SUITES,
+                        help="suite to run (repeatable; default: all)")
+    parser.add_argument("-n", type=int, default=500, help="items for the store / icon / name suites")
+    parser.add_argument("--apk-count", type=int, default=10, help="APKs per size (large: a fifth)")
+    parser.add_argument("--apk-sizes", nargs="+", default=["small", "medium", "large"],
+                        choices=["small", "medium", "large"])
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="API load-test clients")
+    parser.add_argument("-o", "--output", help="JSON output (default: storage/benchmarks/bench-<ts>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    tmp = _isolate_storage()
+    from analysis_engine.engine import ENGINE_VERSION  # noqa: E402
+
+    suites = args.suite or list(SUITES)
+    run = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "engine_version": ENGINE_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "suites": suites,
+            "args": vars(args),
+        },
+        "results": [],
+    }
+
+    for name in suites:
+        print(f"[{name}]", file=sys.stderr)
+        run["results"].extend(globals()[f"suite_{name}"](args))
+    run["meta"]["peak_rss_bytes"] = _peak_rss_bytes()
+
+    out = Path(args.output) if args.output else \
+        ROOT / "storage" / "benchmarks" / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(run, indent=2))
+    print(f"results: {out}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(run, json.load(f))
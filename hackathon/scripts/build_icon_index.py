@@ -0,0 +1,50 @@
+# scripts/build_icon_index.py
+
+"""
+Populate the known-icon index from a folder of known-good APKs.
+
+    python scripts/build_icon_index.py path/to/legit_apks/ [--index storage/icon_index.sqlite3]
+
+Each APK is analysed at the "resources" level (no dex parsing); its icon
+pHash is stored under the APK's package name.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analysis_engine.engine import analyze_apk_full  # noqa: E402
+from analysis_engine.icon_index import IconIndex, DEFAULT_INDEX_PATH  # noqa: E402
+
+
+def build_index(apk_dir: str, index_path: str = DEFAULT_INDEX_PATH) -> dict:
+    index = IconIndex(index_path)
+    added, skipped, failed = 0, 0, 0
+
+    for apk in sorted(Path(apk_dir).rglob("*.apk")):
+        result = analyze_apk_full(apk_path=str(apk), level="resources")
+        report = result.get("apk") or {}
+        icon_hash = report.get("icon_hash")
+        if not result.get("success") or not icon_hash:
+            failed += 1
+            print(f"[skip] {apk.name}: {result.get('error', 'no icon')}", file=sys.stderr)
+            continue
+
+        package = report["identity"].get("package") or apk.stem
+        meta = {"file": apk.name, "versionName": report["identity"].get("versionName")}
+        if index.add(icon_hash, package, meta) is None:
+            skipped += 1
+        else:
+            added += 1
+
+    return {"added": added, "already_indexed": skipped, "failed": failed, "total": len(index)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the known-icon pHash index")
+    parser.add_argument("apk_dir")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args()
+    print(build_index(args.apk_dir, args.index))
@@ -0,0 +1,23 @@
+# scripts/conftest.py
+"""
+Keeps every database, cache and index the tests touch out of storage/.
+The paths are read when analysis_engine / backend.confi are imported, so
+they are set here, before pytest imports any test module.
+"""
+
+import os
+import atexit
+import shutil
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="scan-test-")
+atexit.register(shutil.rmtree, _TMP, ignore_errors=True)
+
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/app.db"
+os.environ["APK_CACHE_PATH"] = os.path.join(_TMP, "apk_results.sqlite3")
+os.environ["ICON_INDEX_PATH"] = os.path.join(_TMP, "icon_index.sqlite3")
+os.environ["APK_SIMILARITY_PATH"] = os.path.join(_TMP, "apk_similarity.sqlite3")
+os.environ["JOBS_DB_PATH"] = os.path.join(_TMP, "jobs.sqlite3")
+os.environ["EVIDENCE_DIR"] = os.path.join(_TMP, "evidence_kits")
+os.environ["UPLOAD_DIR"] = os.path.join(_TMP, "uploads")
+os.environ["PLAY_CACHE_PATH"] = ""
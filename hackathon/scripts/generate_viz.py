@@ -1,6 +1,5 @@
 # scripts/generate_histogram.py
 
-import matplotlib.pyplot as plt
 import json
 from pathlib import Path
 
@@ -24,6 +23,9 @@ def generate_histogram(api_response: dict, output_path="histogram.png"):
         if not histogram or not isinstance(histogram, list):
             raise ValueError("Histogram data not found in API response")
 
+        # matplotlib is slow to import; only load it when drawing
+        import matplotlib.pyplot as plt
+
         # Draw histogram
         plt.figure(figsize=(6, 4))
         plt.bar([1, 2, 3, 4, 5], histogram)
@@ -0,0 +1,33 @@
+# scripts/import_certs.py
+
+"""
+Bulk-import signing certificate fingerprints into the reputation store.
+
+    python scripts/import_certs.py certs.csv [--batch 5000]
+
+CSV columns (header required): sha256, sha1, publisher, brand, package, verdict
+Only sha256 is mandatory; verdict is legit | malicious | unknown.
+Empty columns leave an already imported certificate's value as it is;
+brand must name a brand already in the database.
+"""
+
+import sys
+import csv
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.database.connection import init_db  # noqa: E402
+from backend.services.db_service import bulk_import_certificates  # noqa: E402
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import certificate fingerprints")
+    parser.add_argument("csv_file")
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    init_db()
+    with open(args.csv_file, newline="", encoding="utf-8") as f:
+        print(bulk_import_certificates(csv.DictReader(f), batch_size=args.batch))
@@ -0,0 +1,29 @@
+# scripts/init_db.py
+
+"""
+Create the database tables and optionally seed the brand corpus.
+
+    python scripts/init_db.py --brands brands.txt
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.database.connection import init_db  # noqa: E402
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Initialise the database")
+    parser.add_argument("--brands", help="text file with one brand name per line")
+    args = parser.parse_args()
+
+    init_db()
+    print("tables created")
+
+    if args.brands:
+        from backend.services.db_service import bulk_add_brands
+        with open(args.brands, encoding="utf-8") as f:
+            print(f"{bulk_add_brands(f)} brands added")
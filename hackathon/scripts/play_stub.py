@@ -0,0 +1,172 @@
+# scripts/play_stub.py
+
+"""
+Local stand-in for the Play Store detail page.
+
+    python scripts/play_stub.py --port 8765 -n 1000
+    PLAY_BASE_URL=http://127.0.0.1:8765 uvicorn backend.main:app
+
+Serves GET /store/apps/details?id=<appId> as an HTML page in the same
+AF_initDataCallback format as play.google.com, so google_play_scraper's
+parser (and therefore the async client) reads it unchanged. Apps come
+from scripts/synthetic.py (-n / --seed) or a JSON list of app() dicts
+(--apps); unknown ids get a 404.
+
+--latency, --error-rate and --rate-limit inject delay, 503s and 429s
+(with Retry-After) to exercise the client's retry and backoff.
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from urllib.parse import parse_qs
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# app() field -> path inside the ds:5 dataset (google_play_scraper ElementSpecs.Detail)
+_FIELD_PATHS = {
+    "title": [1, 2, 0, 0],
+    "description": [1, 2, 12, 0, 0, 1],
+    "summary": [1, 2, 73, 0, 1],
+    "installs": [1, 2, 13, 0],
+    "minInstalls": [1, 2, 13, 1],
+    "realInstalls": [1, 2, 13, 2],
+    "score": [1, 2, 51, 0, 1],
+    "ratings": [1, 2, 51, 2, 1],
+    "reviews": [1, 2, 51, 3, 1],
+    "containsAds": [1, 2, 48],
+    "developer": [1, 2, 68, 0],
+    "developerEmail": [1, 2, 69, 1, 0],
+    "developerWebsite": [1, 2, 69, 0, 5, 2],
+    "developerAddress": [1, 2, 69, 2, 0],
+    "privacyPolicy": [1, 2, 99, 0, 5, 2],
+    "genre": [1, 2, 79, 0, 0, 0],
+    "genreId": [1, 2, 79, 0, 0, 2],
+    "icon": [1, 2, 95, 0, 3, 2],
+    "released": [1, 2, 10, 0],
+    "version": [1, 2, 140, 0, 0, 0],
+}
+_HISTOGRAM_PATH = [1, 2, 51, 1]
+_PRICE_PATH = [1, 2, 57, 0, 0, 0, 0, 1, 0]
+
+
+def _put(tree: list, path: List[int], value: Any) -> None:
+    node = tree
+    for i, idx in enumerate(path):
+        while len(node) <= idx:
+            node.append(None)
+        if i == len(path) - 1:
+            node[idx] = value
+        else:
+            if not isinstance(node[idx], list):
+                node[idx] = []
+            node = node[idx]
+
+
+def render_detail_page(meta: Dict[str, Any]) -> str:
+    """An app() dict as a detail page google_play_scraper.parse_dom can read."""
+    data: list = []
+    for field, path in _FIELD_PATHS.items():
+        if meta.get(field) is not None:
+            _put(data, path, meta[field])
+    histogram = meta.get("histogram") or [0, 0, 0, 0, 0]
+    _put(data, _HISTOGRAM_PATH, [None] + [[None, n] for n in histogram])
+    _put(data, _PRICE_PATH, [int(meta.get("price") or 0) * 1000000, meta.get("currency") or "USD"])
+    if meta.get("developerId"):
+        _put(data, [1, 2, 68, 1, 4, 2], f"/store/apps/dev?id={meta['developerId']}")
+
+    blob = json.dumps(data, ensure_ascii=False)
+    return ("<!doctype html><html><head><title>stub</title></head><body>"
+            f"<script nonce=\"stub\">AF_initDataCallback({{key: 'ds:5', hash: '1', "
+            f"data:{blob}, sideChannel: {{}}}});</script>"
+            "</body></html>")
+
+
+class PlayStub:
+    """Minimal ASGI app serving the detail pages of a fixed set of apps."""
+
+    def __init__(self, apps: List[Dict[str, Any]], latency: float = 0.0,
+                 error_rate: float = 0.0, rate_limit: float = 0.0, seed: int = 0):
+        self.pages = {a["appId"]: render_detail_page(a).encode() for a in apps}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.stats = {"requests": 0, "ok": 0, "not_found": 0, "errors": 0, "throttled": 0}
+        self._rnd = random.Random(seed)
+        self._window = (0, 0)   # (second, requests in it)
+
+    def _throttled(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = int(time.monotonic())
+        second, count = self._window
+        count = count + 1 if second == now else 1
+        self._window = (now, count)
+        return count > self.rate_limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        self.stats["requests"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        status, body, headers = 200, b"", [(b"content-type", b"text/html; charset=utf-8")]
+        if scope["path"] != "/store/apps/details":
+            status = 404
+        elif self._throttled():
+            status = 429
+            headers.append((b"retry-after", b"1"))
+            self.stats["throttled"] += 1
+        elif self.error_rate and self._rnd.random() < self.error_rate:
+            status = 503
+            self.stats["errors"] += 1
+        else:
+            app_id = parse_qs(scope["query_string"].decode()).get("id", [""])[0]
+            body = self.pages.get(app_id, b"")
+            status = 200 if body else 404
+        if status == 404:
+            self.stats["not_found"] += 1
+        elif status == 200:
+            self.stats["ok"] += 1
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def load_apps(path: Optional[str], n: int, seed: int) -> List[Dict[str, Any]]:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    from scripts.synthetic import make_play_metadata
+    return make_play_metadata(n, seed=seed)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve fake Play Store detail pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-n", type=int, default=1000, help="synthetic apps to serve")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--apps", help="JSON list of app() dicts instead of synthetic apps")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/s before 429 (0: off)")
+    parser.add_argument("--list", action="store_true", help="print the served app ids and exit")
+    args = parser.parse_args()
+
+    apps = load_apps(args.apps, args.n, args.seed)
+    if args.list:
+        print("\n".join(a["appId"] for a in apps))
+        sys.exit(0)
+
+    stub = PlayStub(apps, args.latency, args.error_rate, args.rate_limit, args.seed)
+    print(f"serving {len(apps)} apps on http://{args.host}:{args.port}", file=sys.stderr)
+    uvicorn.run(stub, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,40 @@
+# scripts/rescore.py
+
+"""
+Rescore stored scans after a heuristic or weight change.
+
+    python scripts/rescore.py [--profile NAME] [--scan-id ID ...] [--batch 500]
+
+Only signals whose inputs (or version / brand corpus) changed are
+recomputed; nothing is refetched from the Play Store.
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.database.connection import init_db  # noqa: E402
+from backend.services.db_service import install_brand_index, rescore_scans  # noqa: E402
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay stored scans through the current scoring")
+    parser.add_argument("-p", "--profile", default=None,
+                        help="weight profile to use for every scan (default: each scan's own)")
+    parser.add_argument("--scan-id", type=int, action="append", dest="scan_ids")
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    init_db()
+    install_brand_index()
+
+    def progress(done, total):
+        print(f"\r{done}/{total}", end="", file=sys.stderr, flush=True)
+
+    stats = rescore_scans(profile=args.profile, scan_ids=args.scan_ids,
+                          batch_size=args.batch, progress=progress)
+    print(file=sys.stderr)
+    print(json.dumps(stats))
@@ -0,0 +1,329 @@
+# scripts/synthetic.py
+
+"""
+Synthetic inputs for benchmarks: small-but-valid APKs (binary manifest,
+dex, launcher icon, text assets, native lib) and Play Store metadata.
+Everything is generated in memory from a seed, so runs are repeatable.
+
+    from scripts.synthetic import make_apk, make_bundle, make_play_metadata, APK_SIZES
+    data = make_apk(**APK_SIZES["medium"], seed=1)
+    xapk = make_bundle(**APK_SIZES["medium"], features=3, seed=1)
+"""
+
+import io
+import json
+import zlib
+import random
+import struct
+import hashlib
+import zipfile
+from typing import List, Tuple, Dict, Any, Iterable
+
+from PIL import Image, ImageDraw
+
+
+ANDROID_NS = "http://schemas.android.com/apk/res/android"
+_ATTR_IDS = {"name": 0x01010003, "icon": 0x01010002, "label": 0x01010001,
+             "minSdkVersion": 0x0101020c, "targetSdkVersion": 0x01010270,
+             "versionCode": 0x0101021b, "versionName": 0x0101021c}
+
+# class count / methods per class / extra asset bytes
+APK_SIZES = {
+    "small": {"n_classes": 50, "methods_per_class": 5, "asset_bytes": 0},
+    "medium": {"n_classes": 2000, "methods_per_class": 8, "asset_bytes": 256 * 1024},
+    "large": {"n_classes": 20000, "methods_per_class": 10, "asset_bytes": 4 * 1024 * 1024},
+}
+
+BRANDS = ["PhonePe", "Paytm", "Google Pay", "SBI YONO", "ICICI iMobile", "HDFC Bank",
+          "PayPal", "WhatsApp", "Instagram", "Amazon", "Flipkart", "BHIM"]
+
+
+def _uleb(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        out.append(b | 0x80 if n else b)
+        if not n:
+            return bytes(out)
+
+
+# ---------------------------
+# AndroidManifest.xml (binary XML)
+# ---------------------------
+
+def _axml(package: str, label: str, permissions: Iterable[str], activities: Iterable[str],
+          split: str = None) -> bytes:
+    strings: List[str] = []
+
+    def si(s: str) -> int:
+        if s not in strings:
+            strings.append(s)
+        return strings.index(s)
+
+    attr_names = list(_ATTR_IDS)
+    for a in attr_names:
+        si(a)
+    ns_i, uri_i = si("android"), si(ANDROID_NS)
+
+    manifest_attrs = [("versionCode", 1), ("versionName", "1.0"), ("package", package)]
+    if split:
+        manifest_attrs.append(("split", split))
+    tree = ("manifest", manifest_attrs,
+            [("uses-sdk", [("minSdkVersion", 21), ("targetSdkVersion", 30)], [])] +
+            [("uses-permission", [("name", p)], []) for p in permissions] +
+            [("application", [("label", label), ("icon", 0x7F010000)],
+              [("activity", [("name", a)], []) for a in activities])])
+
+    body = bytearray(struct.pack("<HHIIIII", 0x100, 16, 24, 1, 0xFFFFFFFF, ns_i, uri_i))
+
+    def emit(node):
+        tag, attrs, kids = node
+        ab = bytearray()
+        for k, v in attrs:
+            ns = 0xFFFFFFFF if k in ("package", "split") else uri_i
+            if isinstance(v, str):
+                ab += struct.pack("<IIIHBBI", ns, si(k), si(v), 8, 0, 0x03, si(v))
+            else:
+                vtype = 0x01 if k == "icon" else 0x10
+                ab += struct.pack("<IIIHBBI", ns, si(k), 0xFFFFFFFF, 8, 0, vtype, v)
+        ext = struct.pack("<IIHHHHHH", 0xFFFFFFFF, si(tag), 20, 20, len(attrs), 0, 0, 0)
+        body.extend(struct.pack("<HHIII", 0x102, 16, 16 + len(ext) + len(ab), 1, 0xFFFFFFFF) + ext + ab)
+        for c in kids:
+            emit(c)
+        body.extend(struct.pack("<HHIIIII", 0x103, 16, 24, 1, 0xFFFFFFFF, 0xFFFFFFFF, si(tag)))
+
+    emit(tree)
+    body += struct.pack("<HHIIIII", 0x101, 16, 24, 1, 0xFFFFFFFF, ns_i, uri_i)
+
+    # string pool (UTF-16), built once every string is known
+    offsets, data = [], bytearray()
+    for s in strings:
+        offsets.append(len(data))
+        data += struct.pack("<H", len(s)) + s.encode("utf-16-le") + b"\0\0"
+    while len(data) % 4:
+        data += b"\0"
+    header = 28
+    pool = struct.pack("<HHIIIIII", 1, header, header + 4 * len(strings) + len(data), len(strings),
+                       0, 0, header + 4 * len(strings), 0)
+    pool += b"".join(struct.pack("<I", o) for o in offsets) + data
+
+    resmap = b"".join(struct.pack("<I", _ATTR_IDS[a]) for a in attr_names)
+    resmap = struct.pack("<HHI", 0x180, 8, 8 + len(resmap)) + resmap
+
+    content = pool + resmap + bytes(body)
+    return struct.pack("<HHI", 3, 8, 8 + len(content)) + content
+
+
+# ---------------------------
+# classes.dex
+# ---------------------------
+
+def _dex(classes: List[Tuple[str, List[str]]], extra_strings: Iterable[str] = ()) -> bytes:
+    """classes: [(descriptor, [method names])]; every method is a native ()V."""
+    strs = set(extra_strings) | {"V", "Ljava/lang/Object;"}
+    for c, methods in classes:
+        strs.add(c)
+        strs.update(methods)
+    strs = sorted(strs)
+    sidx = {s: i for i, s in enumerate(strs)}
+    types = sorted({"V", "Ljava/lang/Object;"} | {c for c, _ in classes}, key=lambda t: sidx[t])
+    tidx = {t: i for i, t in enumerate(types)}
+    methods = sorted({(c, m) for c, ms in classes for m in ms}, key=lambda x: (tidx[x[0]], sidx[x[1]]))
+    midx = {m: i for i, m in enumerate(methods)}
+
+    off = 0x70
+    string_ids_off = off
+    off += 4 * len(strs)
+    type_ids_off = off
+    off += 4 * len(types)
+    proto_ids_off = off
+    off += 12
+    method_ids_off = off
+    off += 8 * len(methods)
+    class_defs_off = off
+    off += 32 * len(classes)
+    data_off = off
+
+    data = bytearray()
+    str_offs = []
+    for s in strs:
+        str_offs.append(data_off + len(data))
+        data += _uleb(len(s)) + s.encode() + b"\0"
+    class_data_offs = []
+    for c, ms in classes:
+        class_data_offs.append(data_off + len(data))
+        ids = sorted(midx[(c, m)] for m in ms)
+        data += _uleb(0) + _uleb(0) + _uleb(len(ids)) + _uleb(0)
+        prev = 0
+        for i in ids:
+            data += _uleb(i - prev) + _uleb(0x0001 | 0x0008 | 0x0100) + _uleb(0)  # public static native
+            prev = i
+    while len(data) % 4:
+        data += b"\0"
+    map_off = data_off + len(data)
+    items = [(0x0000, 1, 0), (0x0001, len(strs), string_ids_off), (0x0002, len(types), type_ids_off),
+             (0x0003, 1, proto_ids_off), (0x0005, len(methods), method_ids_off),
+             (0x0006, len(classes), class_defs_off), (0x2002, len(strs), str_offs[0]),
+             (0x2000, len(classes), class_data_offs[0]), (0x1000, 1, map_off)]
+    data += struct.pack("<I", len(items)) + b"".join(struct.pack("<HHII", t, 0, n, o) for t, n, o in items)
+    file_size = data_off + len(data)
+
+    out = bytearray(0x70)
+    out += b"".join(struct.pack("<I", o) for o in str_offs)
+    out += b"".join(struct.pack("<I", sidx[t]) for t in types)
+    out += struct.pack("<III", sidx["V"], tidx["V"], 0)
+    out += b"".join(struct.pack("<HHI", tidx[c], 0, sidx[m]) for c, m in methods)
+    for i, (c, _) in enumerate(classes):
+        out += struct.pack("<8I", tidx[c], 1, tidx["Ljava/lang/Object;"], 0, 0xFFFFFFFF, 0,
+                           class_data_offs[i], 0)
+    out += data
+
+    header = bytearray(b"dex\n035\0" + b"\0" * 24)
+    header += struct.pack("<22I", file_size, 0x70, 0x12345678, 0, 0, map_off,
+                          len(strs), string_ids_off, len(types), type_ids_off, 1, proto_ids_off,
+                          0, 0, len(methods), method_ids_off, len(classes), class_defs_off,
+                          len(data), data_off, 0, 0)
+    out[:0x70] = header[:0x70]
+    out[12:32] = hashlib.sha1(out[32:]).digest()
+    out[8:12] = struct.pack("<I", zlib.adler32(bytes(out[12:])))
+    return bytes(out)
+
+
+# ---------------------------
+# Icons, APKs, Play metadata
+# ---------------------------
+
+def make_icon(seed: int = 0, size: int = 192) -> bytes:
+    rnd = random.Random(seed)
+    img = Image.new("RGB", (size, size), tuple(rnd.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(6):
+        box = sorted(rnd.randrange(size) for _ in range(2)) + sorted(rnd.randrange(size) for _ in range(2))
+        draw.ellipse((box[0], box[2], box[1], box[3]), fill=tuple(rnd.randrange(256) for _ in range(3)))
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _classes(n_classes: int, methods_per_class: int, prefix: str = "") -> List[Tuple[str, List[str]]]:
+    classes = []
+    for i in range(n_classes):
+        if i % 3 == 0:
+            desc = f"L{prefix}{chr(97 + i % 26)}/{chr(97 + (i // 26) % 26)}/c{i};"
+        else:
+            desc = f"Lcom/example/{prefix}feature{i % 40}/Class{i};"
+        classes.append((desc, [f"m{j}" for j in range(methods_per_class)]))
+    return classes
+
+
+def make_apk(n_classes: int = 50, methods_per_class: int = 5, asset_bytes: int = 0,
+             seed: int = 0, package: str = None, label: str = None) -> bytes:
+    """
+    A zip Androguard accepts as an APK (unsigned: no META-INF). Obfuscated
+    ("a/b/c") and readable packages are mixed, a few IOCs are planted in
+    the dex strings and assets.
+    """
+    rnd = random.Random(seed)
+    brand = rnd.choice(BRANDS)
+    package = package or f"com.{brand.lower().replace(' ', '')}.app{seed}"
+    label = label or brand
+
+    classes = _classes(n_classes, methods_per_class)
+    classes.append(("Ljava/lang/Class;", ["forName"]))
+    iocs = [f"https://{brand.lower().replace(' ', '-')}-kyc{seed}.xyz/login",
+            f"upi://pay?pa=refund{seed}@ybl", f"10.{seed % 250}.0.1"]
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("AndroidManifest.xml", _axml(package, label,
+                                                ["android.permission.INTERNET",
+                                                 "android.permission.READ_SMS",
+                                                 "android.permission.SYSTEM_ALERT_WINDOW"],
+                                                [".MainActivity", ".PayActivity"]))
+        z.writestr("classes.dex", _dex(classes, extra_strings=iocs))
+        z.writestr("res/mipmap-xxhdpi/ic_launcher.png", make_icon(seed))
+        z.writestr("assets/config.json",
+                   '{"api": "http://%s:8080/api", "support": "help@%s-care.in"}' % (iocs[2], brand.lower().replace(" ", "")))
+        z.writestr("lib/arm64-v8a/libnative.so", b"\x7fELF" + rnd.randbytes(4096))
+        if asset_bytes:
+            words = [b"lorem", b"ipsum", b"dolor", b"sit", b"amet", b"config.value", b"\n"]
+            text = b" ".join(rnd.choice(words) for _ in range(asset_bytes // 6))
+            z.writestr("assets/strings.txt", text[:asset_bytes])
+    return buf.getvalue()
+
+
+def make_split_apk(package: str, split: str, n_classes: int = 0, methods_per_class: int = 5,
+                   activities: Iterable[str] = (), files: Dict[str, bytes] = None) -> bytes:
+    """A config or feature split: manifest with split="...", optional dex and files."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("AndroidManifest.xml", _axml(package, "", [], activities, split=split))
+        if n_classes:
+            prefix = split.replace(".", "_") + "/"
+            z.writestr("classes.dex", _dex(_classes(n_classes, methods_per_class, prefix)))
+        for name, data in (files or {}).items():
+            z.writestr(name, data)
+    return buf.getvalue()
+
+
+def make_bundle(n_classes: int = 50, methods_per_class: int = 5, asset_bytes: int = 0,
+                features: int = 2, seed: int = 0, fmt: str = "xapk") -> bytes:
+    """
+    A split bundle: make_apk() as the base, `features` feature splits with
+    as much code as the base, plus ABI and density config splits.
+    fmt "xapk" (manifest.json + *.apk at the root) or "apks" (toc.pb +
+    splits/*.apk, as bundletool writes it).
+    """
+    rnd = random.Random(seed)
+    package = f"com.{rnd.choice(BRANDS).lower().replace(' ', '')}.app{seed}"
+    base = make_apk(n_classes, methods_per_class, asset_bytes, seed=seed, package=package)
+    splits = {"base": base}
+    for i in range(features):
+        name = f"feature{i}"
+        splits[name] = make_split_apk(package, name, n_classes, methods_per_class,
+                                      activities=[f".{name}.EntryActivity"])
+    splits["config.arm64_v8a"] = make_split_apk(
+        package, "config.arm64_v8a",
+        files={"lib/arm64-v8a/libpay.so": b"\x7fELF" + rnd.randbytes(64 * 1024)})
+    splits["config.xxhdpi"] = make_split_apk(
+        package, "config.xxhdpi", files={"res/drawable-xxhdpi/banner.png": make_icon(seed + 1, 512)})
+
+    buf = io.BytesIO()
+    # split APKs are stored, not deflated, like real bundles
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as z:
+        if fmt == "apks":
+            z.writestr("toc.pb", b"")
+            for name, data in splits.items():
+                z.writestr(f"splits/{name}-master.apk" if name == "base" or name.startswith("feature")
+                           else f"splits/base-{name[len('config.'):]}.apk", data)
+        else:
+            z.writestr("manifest.json", json.dumps({
+                "package_name": package, "version_code": "1",
+                "split_apks": [{"file": f"{n}.apk", "id": n} for n in splits]}))
+            for name, data in splits.items():
+                z.writestr(f"{name}.apk", data)
+    return buf.getvalue()
+
+
+def make_play_metadata(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Play Store app() dicts with the fields the store-only signals read."""
+    rnd = random.Random(seed)
+    apps = []
+    for i in range(n):
+        brand = rnd.choice(BRANDS)
+        fake = rnd.random() < 0.3
+        title = brand if not fake else rnd.choice([f"{brand} Pro", brand.replace("a", "а"),
+                                                   f"{brand} KYC Update", brand[:-1]])
+        installs = rnd.choice(["100+", "1,000+", "10,000+", "1,000,000+", "100,000,000+"])
+        apps.append({
+            "appId": f"com.{'fake' if fake else brand.lower().replace(' ', '')}.app{i}",
+            "title": title,
+            "installs": installs,
+            "ratings": rnd.randrange(0, 2_000_000),
+            "histogram": [rnd.randrange(0, 100_000) for _ in range(5)],
+            "developer": None if fake and rnd.random() < 0.5 else f"{brand} Ltd",
+            "developerEmail": f"support@{brand.lower().replace(' ', '')}.com",
+            "score": round(rnd.uniform(1, 5), 2),
+        })
+    return apps
@@ -0,0 +1,79 @@
+# scripts/test_apk_similarity.py
+"""
+Checks APK family assignment in the LSH similarity index.
+
+    PYTHONPATH=. python -m pytest -q scripts/test_apk_similarity.py
+"""
+
+import numpy as np
+
+from analysis_engine.apk_similarity import SimilarityIndex, NUM_PERM
+
+_rng = np.random.default_rng(5)
+
+
+def _signature():
+    return _rng.integers(0, 2 ** 32, NUM_PERM, dtype=np.uint32)
+
+
+def _variant(sig, changed=6):
+    out = sig.copy()
+    pos = _rng.choice(NUM_PERM, changed, replace=False)
+    out[pos] = _rng.integers(0, 2 ** 32, changed, dtype=np.uint32)
+    return out
+
+
+def _families():
+    # a and b share their first 40 minima only (~0.31 similar, two families);
+    # the bridge takes a's next 44 and b's last 44 (~0.66 similar to each)
+    a = _signature()
+    b = _signature()
+    b[:40] = a[:40]
+    bridge = np.concatenate([a[:84], b[84:]])
+    return a, b, bridge
+
+
+def test_unrelated_apks_get_their_own_family():
+    index = SimilarityIndex(":memory:")
+    first = index.observe("sha-1", "com.one", _signature())
+    second = index.observe("sha-2", "com.two", _signature())
+    assert first["neighbors"] == [] and second["neighbors"] == []
+    assert first["cluster"]["id"] != second["cluster"]["id"]
+
+
+def test_bridge_merges_families():
+    index = SimilarityIndex(":memory:", cluster_threshold=0.6)
+    a, b, bridge = _families()
+
+    a_ids = {index.observe(f"a{i}", "com.bank.fake", _variant(a))["cluster"]["id"] for i in range(3)}
+    b_ids = {index.observe(f"b{i}", "com.pay.fake", _variant(b))["cluster"]["id"] for i in range(2)}
+    assert len(a_ids) == 1 and len(b_ids) == 1 and a_ids != b_ids
+    (a_id,), (b_id,) = a_ids, b_ids
+    a_first_seen = index.cluster(a_id)["first_seen"]
+
+    result = index.observe("bridge", "com.bank.pay", bridge)
+    families = {n["cluster_id"] for n in result["neighbors"] if n["same_family"]}
+    assert families == {a_id, b_id}
+
+    # the larger family absorbs the smaller one
+    cluster = result["cluster"]
+    assert cluster["id"] == a_id
+    assert cluster["size"] == 6
+    assert cluster["first_seen"] == a_first_seen
+    assert index.cluster(b_id) is None
+    members = {m["sha256"] for m in index.cluster_members(a_id)}
+    assert members == {"a0", "a1", "a2", "b0", "b1", "bridge"}
+    assert [c["id"] for c in index.top_clusters()] == [a_id]
+
+    # later members of either side land in the merged family
+    assert index.observe("b9", "com.pay.fake", _variant(b))["cluster"]["id"] == a_id
+    assert index.cluster(a_id)["size"] == 7
+
+
+def test_reobserving_changes_nothing():
+    index = SimilarityIndex(":memory:")
+    sig = _signature()
+    first = index.observe("sha-1", "com.one", sig)
+    again = index.observe("sha-1", "com.one", sig)
+    assert again["cluster"] == first["cluster"]
+    assert len(index) == 1
@@ -0,0 +1,73 @@
+# scripts/test_batch_report.py
+"""
+Checks that columnar batch scoring matches analyze_store_only() row for row.
+
+    PYTHONPATH=. python -m pytest -q scripts/test_batch_report.py
+"""
+
+import random
+
+from analysis_engine.engine import analyze_store_only, analyze_store_batch
+from analysis_engine.reports.batch_report import COLUMNS
+from analysis_engine.reports.rescore import signal_value
+from analysis_engine.score_weights import get_profile
+
+PROFILES = ("default", "name_heavy")
+
+# missing, None and empty values of every column the batch path reads
+EDGE_CASES = [
+    {},
+    {c: None for c in COLUMNS},
+    {"appId": "", "title": "", "installs": "", "ratings": 0, "histogram": [], "developer": ""},
+    {"appId": "com.paytm.app", "title": "Paytm", "histogram": [0, 0, 0, 0, 0]},
+    {"appId": "com.example.x", "installs": "Free", "ratings": 12},
+    {"appId": "com.example.y", "installs": "500+", "ratings": 250000},
+    {"appId": "com.example.z", "installs": "1,000,000+", "ratings": None},
+    {"appId": None, "title": "PhonePe UPI", "developer": "Someone"},
+]
+
+
+def _catalogue(n=300, seed=21):
+    rng = random.Random(seed)
+    titles = ["Paytm", "PhonePe", "GPay Lite", "SBI YONO", "Torch", "", None]
+    installs = ["100+", "1,000+", "10,000+", "5,000,000+", "", None, "Varies"]
+    rows = []
+    for i in range(n):
+        row = {"appId": f"com.app{rng.randrange(40)}.{rng.choice(['pay', 'bank', 'x'])}",
+               "title": rng.choice(titles),
+               "installs": rng.choice(installs),
+               "ratings": rng.choice([None, 0, rng.randrange(100), rng.randrange(10 ** 6)]),
+               "histogram": rng.choice([None, [], [rng.randrange(500) for _ in range(5)]]),
+               "developer": rng.choice([None, "", "Dev Ltd"])}
+        # some rows lack keys altogether
+        for key in rng.sample(COLUMNS, rng.randrange(3)):
+            del row[key]
+        rows.append(row)
+    return rows + EDGE_CASES
+
+
+def _assert_matches(rows, batch, profile):
+    weights = get_profile(profile)
+    for i, play_data in enumerate(rows):
+        report = analyze_store_only(play_data, profile)
+        values = {name: signal_value(result) for name, result in report["signals"].items()}
+        assert {name: float(col[i]) for name, col in batch["signals"].items()} == values, play_data
+        assert float(batch["aggregate"][i]) == weights.aggregate(values), play_data
+        assert int(batch["risk_score"][i]) == report["risk_score"], play_data
+
+
+def test_batch_matches_per_app_records():
+    rows = _catalogue()
+    for profile in PROFILES:
+        batch = analyze_store_batch(rows, profile)
+        assert batch["weights_profile"] == profile
+        _assert_matches(rows, batch, profile)
+
+
+def test_batch_matches_per_app_columns():
+    rows = _catalogue(n=100, seed=4)
+    columns = {c: [r.get(c) for r in rows] for c in COLUMNS}
+    # a column left out entirely counts as missing for every row
+    del columns["developer"]
+    batch = analyze_store_batch(columns)
+    _assert_matches([{k: v for k, v in r.items() if k != "developer"} for r in rows], batch, "default")
@@ -0,0 +1,70 @@
+# scripts/test_icon_index.py
+"""
+Checks that multi-index hashing finds exactly what a linear Hamming scan finds.
+
+    PYTHONPATH=. python -m pytest -q scripts/test_icon_index.py
+"""
+
+import random
+
+from analysis_engine.icon_index import MultiIndexHash, hamming, HASH_BITS
+
+
+def _index(seed=7, n_clusters=40, per_cluster=12):
+    # clusters of near-duplicate hashes, so small radii have real hits
+    rng = random.Random(seed)
+    index, hashes = MultiIndexHash(), {}
+    for c in range(n_clusters):
+        centre = rng.getrandbits(HASH_BITS)
+        for j in range(per_cluster):
+            h = centre
+            for bit in rng.sample(range(HASH_BITS), rng.randint(0, 14)):
+                h ^= 1 << bit
+            hashes[(c, j)] = h
+            index.add(h, (c, j))
+    return index, hashes, rng
+
+
+def _queries(hashes, rng, n=30):
+    # stored hashes, lightly perturbed ones and unrelated ones
+    out = []
+    for h in rng.sample(sorted(hashes.values()), n):
+        out.append(h)
+        out.append(h ^ (1 << rng.randrange(HASH_BITS)) ^ (1 << rng.randrange(HASH_BITS)))
+    out += [rng.getrandbits(HASH_BITS) for _ in range(n)]
+    return out
+
+
+def test_within_matches_linear_scan():
+    index, hashes, rng = _index()
+    for q in _queries(hashes, rng):
+        for radius in (0, 3, 4, 7, 12, 16, 20, 24):
+            expected = sorted((hamming(q, h), i) for i, h in hashes.items() if hamming(q, h) <= radius)
+            assert sorted(index.within(q, radius)) == expected
+
+
+def test_nearest_matches_linear_scan():
+    index, hashes, rng = _index(seed=11)
+    for q in _queries(hashes, rng):
+        ranked = sorted((hamming(q, h), i) for i, h in hashes.items())
+        for k in (1, 5, 20):
+            for max_distance in (12, HASH_BITS):
+                found = index.nearest(q, k, max_distance=max_distance)
+                expected = [t for t in ranked if t[0] <= max_distance][:k]
+                # same distances; ties at the k-th distance may pick other items
+                assert [d for d, _ in found] == [d for d, _ in expected]
+                cutoff = expected[-1][0] if expected else -1
+                assert {i for d, i in found if d < cutoff} == {i for d, i in expected if d < cutoff}
+                assert all(hamming(q, hashes[i]) == d for d, i in found)
+
+
+def test_removed_items_are_not_found():
+    index, hashes, rng = _index(seed=3)
+    gone = rng.sample(sorted(hashes), 100)
+    for i in gone:
+        assert index.remove(i)
+        del hashes[i]
+    assert not index.remove(gone[0])
+    for q in _queries(hashes, rng, n=10):
+        expected = sorted((hamming(q, h), i) for i, h in hashes.items() if hamming(q, h) <= 12)
+        assert sorted(index.within(q, 12)) == expected
@@ -0,0 +1,61 @@
+# scripts/test_result_cache.py
+"""
+Checks that the APK result cache opens cache files from older schemas.
+
+    PYTHONPATH=. python -m pytest -q scripts/test_result_cache.py
+"""
+
+import sqlite3
+
+from analysis_engine.result_cache import ResultCache, SCHEMA_VERSION
+
+
+def _write_v1_cache(path):
+    # layout before analysis levels: keyed by sha256 + engine_version, no variant
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE results ("
+        " sha256 TEXT NOT NULL,"
+        " engine_version TEXT NOT NULL,"
+        " created_at REAL NOT NULL,"
+        " accessed_at REAL NOT NULL,"
+        " size INTEGER NOT NULL,"
+        " payload TEXT NOT NULL,"
+        " PRIMARY KEY (sha256, engine_version))"
+    )
+    conn.execute("CREATE INDEX idx_results_accessed ON results(accessed_at)")
+    conn.execute("CREATE TABLE counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    conn.execute("INSERT INTO counters VALUES ('hits', 7), ('misses', 3)")
+    conn.execute("INSERT INTO results VALUES ('abc', '1.0.0', 1, 1, 2, '{}')")
+    conn.commit()
+    conn.close()
+
+
+def test_old_schema_file_is_rebuilt(tmp_path):
+    path = str(tmp_path / "apk_results.sqlite3")
+    _write_v1_cache(path)
+
+    cache = ResultCache(path)
+    stats = cache.stats()
+    # old rows are dropped, the hit / miss counters survive
+    assert stats["entries"] == 0
+    assert (stats["hits"], stats["misses"]) == (7, 3)
+
+    cache.put("abc", "2.0.0", {"success": True, "apk": {"analysis_level": "manifest"}}, variant="manifest")
+    assert cache.get("abc", "2.0.0", variant="manifest")["apk"]["analysis_level"] == "manifest"
+    assert cache.get("abc", "2.0.0") is None
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(results)")]
+    assert "variant" in columns
+    conn.close()
+
+
+def test_current_schema_file_keeps_its_rows(tmp_path):
+    path = str(tmp_path / "apk_results.sqlite3")
+    ResultCache(path).put("abc", "2.0.0", {"success": True}, variant="full")
+
+    reopened = ResultCache(path)
+    assert reopened.get("abc", "2.0.0", variant="full") == {"success": True}
+    assert reopened.stats()["entries"] == 1
@@ -0,0 +1,54 @@
+# scripts/test_scan.py
+"""
+Checks that a scan stores its raw features for rescoring
+(storage paths are redirected in conftest.py).
+
+    PYTHONPATH=. python -m pytest -q scripts/test_scan.py
+"""
+
+from analysis_engine.engine import analyze_apk_full
+from backend.database.connection import SessionLocal, init_db
+from backend.database.models.scan import Scan
+from backend.services.scoring_connector import call_scoring_engine
+from scripts.synthetic import make_apk
+
+
+def test_apk_scan_stores_apk_features(tmp_path):
+    init_db()
+    path = str(tmp_path / "sample.apk")
+    with open(path, "wb") as f:
+        f.write(make_apk(n_classes=5, seed=3))
+
+    apk_result = analyze_apk_full(apk_path=path, level="resources")
+    assert apk_result["success"]
+    apk = apk_result["apk"]
+
+    report = call_scoring_engine(None, kind="apk", apk_report=apk_result)
+
+    with SessionLocal() as session:
+        scan = session.get(Scan, report["scan_id"])
+    assert scan.kind == "apk"
+    assert scan.apk_sha256 == apk["sha256"]
+    assert scan.package_name == apk["identity"]["package"]
+    stored = scan.features["apk"]
+    assert stored["identity"]["package"] == apk["identity"]["package"]
+    assert stored["certificates"] == apk["certificates"]
+    assert stored["manifest"]["permissions"] == apk["manifest"]["permissions"]
+    assert stored["icon_hash"] == apk["icon_hash"]
+    assert stored["urls_found"] == apk["urls_found"]
+    assert apk["icon_hash"] and apk["urls_found"]
+    # store features come from the APK itself, not from the analysis report
+    assert scan.features["store"] == {"appId": apk["identity"]["package"]}
+    assert {"cert_key_mismatch", "manifest_permissions", "urls"} <= set(report["signals"])
+
+
+def test_scan_stores_aggregate():
+    init_db()
+    play_data = {"appId": "com.example.app", "title": "Example", "developer": "Example Ltd",
+                 "installs": "1,000+", "ratings": 40, "histogram": [1, 2, 3, 10, 24]}
+    report = call_scoring_engine(play_data, kind="url")
+
+    with SessionLocal() as session:
+        scan = session.get(Scan, report["scan_id"])
+    assert scan.aggregate is not None
+    assert int(round(scan.aggregate * 100)) == report["risk_score"]